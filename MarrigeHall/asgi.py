@@ -2,6 +2,8 @@
 ASGI config for MarrigeHall project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with an ASGI server (e.g. ``uvicorn MarrigeHall.asgi:application``)
+for the status stream at /api/status-stream/, which holds connections open.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+import tempfile
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -32,7 +33,7 @@ ALLOWED_HOSTS = []
 # Application definition
 
 INSTALLED_APPS = [
-    'django.contrib.admin',
+    'core.apps.RoyalPalaceAdminConfig',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
@@ -50,6 +51,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.QueryProfilerMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -70,6 +72,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'core.context_processors.site_settings',
             ],
         },
     },
@@ -89,6 +92,84 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Page content caches are invalidated from model signals, so every process has
+# to share one backend in production (e.g. Redis or Memcached).
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'marrigehall',
+    }
+}
+
+
+# Query profiling (development/staging only)
+# Opt in with QUERY_PROFILER_ENABLED=1 in the environment, then run
+# `python manage.py query_report` to rank views by recorded queries.
+
+QUERY_PROFILER_ENABLED = os.environ.get('QUERY_PROFILER_ENABLED', '').lower() in ('1', 'true', 'yes')
+QUERY_PROFILE_LOG = Path(os.environ.get(
+    'QUERY_PROFILE_LOG', Path(tempfile.gettempdir()) / 'marrigehall-query-profile.jsonl'
+))
+QUERY_PROFILER_N1_THRESHOLD = 3
+QUERY_BUDGET_DEFAULT = 20
+QUERY_BUDGETS = {
+    # Cold cache; the homepage issues no queries once its sections are cached
+    'core:home': 11,
+}
+
+# Blog view counts are buffered per process and flushed every N seconds or
+# once this many hits are pending, whichever comes first.
+BLOG_VIEW_FLUSH_INTERVAL = 10
+BLOG_VIEW_FLUSH_THRESHOLD = 100
+
+# Distinguishes hosts in generated order numbers; give each host (not each
+# worker process) its own value from 0 to 63.
+ORDER_NUMBER_NODE = 0
+
+# Status stream (core.streams): seconds between database polls, shared by all
+# open streams, and between keep-alive comments on an idle stream
+STATUS_STREAM_POLL_INTERVAL = 2
+STATUS_STREAM_HEARTBEAT = 15
+
+# Venue quote rules (see bookings.pricing for the defaults)
+BOOKING_PRICING = {
+    'PER_GUEST': 500,
+    'WEEKEND_DAYS': [4, 5, 6],
+    'WEEKEND_PREMIUM': 20,
+    'SEASONS': [],
+}
+
+# Restaurant table allocation (see bookings.tables for the defaults)
+TABLE_SERVICE = {
+    'SLOT_MINUTES': 15,
+    'SITTING_MINUTES': 90,
+    'MAX_COMBINED_TABLES': 3,
+}
+
+# Kitchen queue (see restaurant.kitchen for the defaults)
+KITCHEN = {
+    'BUCKET_MINUTES': 15,
+    'STATIONS': 3,
+    'HORIZON_HOURS': 12,
+    'MAX_LEAD_MINUTES': None,
+}
+
+# Apply received payment webhooks in a background thread of the web process.
+# Turn off when running `python manage.py process_webhooks --loop` instead.
+PAYMENT_WEBHOOK_THREAD = True
+
+# Seconds the admin index figures (core.metrics) may be served from cache
+ADMIN_METRICS_TTL = 60
+
+# Admin image previews (see core.thumbnails for the defaults)
+THUMBNAILS = {
+    'SIZE': 100,
+    'QUALITY': 80,
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
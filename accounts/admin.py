@@ -6,4 +6,6 @@ class UserProfileAdmin(admin.ModelAdmin):
     list_display = ['user', 'phone_number', 'is_staff_member', 'created_at']
     list_filter = ['is_staff_member', 'created_at']
     search_fields = ['user__username', 'user__email', 'phone_number']
+    list_select_related = ['user']
+    autocomplete_fields = ['user']
     readonly_fields = ['created_at', 'updated_at']
@@ -15,5 +15,7 @@ class BlogPostAdmin(admin.ModelAdmin):
     search_fields = ['title', 'content', 'author__username']
     prepopulated_fields = {'slug': ('title',)}
     readonly_fields = ['views', 'created_at', 'updated_at']
+    list_select_related = ['author', 'category']
+    autocomplete_fields = ['author']
     list_editable = ['is_published', 'is_featured']
     date_hierarchy = 'created_at'
@@ -0,0 +1,113 @@
+import atexit
+import logging
+import threading
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+
+# ============================================================================
+# WRITE-BEHIND VIEW COUNTER
+# ============================================================================
+#
+# Page views are buffered in memory per process and written back in batches:
+# one ``UPDATE ... SET views = views + n`` per distinct n, so a flush of a
+# thousand hits over a handful of posts costs a handful of queries. The
+# increments are relative, so concurrent flushes from several processes
+# never overwrite each other. Hits still buffered when a process is killed
+# (rather than shut down) are lost, which is acceptable for a view counter.
+
+logger = logging.getLogger('blog.counters')
+
+_lock = threading.Lock()
+_pending = Counter()
+_timer = None
+# Set while a flush started by a full buffer is pending, so a burst of hits
+# over the threshold starts one flush thread rather than one per hit
+_flush_scheduled = False
+
+
+def _flush_interval():
+    return getattr(settings, 'BLOG_VIEW_FLUSH_INTERVAL', 10)
+
+
+def _flush_threshold():
+    return getattr(settings, 'BLOG_VIEW_FLUSH_THRESHOLD', 100)
+
+
+def record_view(post_id):
+    """Count one view of a post; flushed later in the background"""
+    global _timer, _flush_scheduled
+    with _lock:
+        _pending[post_id] += 1
+        full = sum(_pending.values()) >= _flush_threshold()
+        if full and not _flush_scheduled:
+            _flush_scheduled = True
+            threading.Thread(target=_flush_when_full, daemon=True).start()
+        elif not full and _timer is None and _flush_interval() > 0:
+            _timer = threading.Timer(_flush_interval(), _flush_in_background)
+            _timer.daemon = True
+            _timer.start()
+
+
+def pending_views(post_id):
+    """Views of a post recorded by this process but not yet written"""
+    with _lock:
+        return _pending[post_id]
+
+
+def flush_views():
+    """Write buffered views to the database; returns the number of hits written"""
+    global _timer
+    from .models import BlogPost
+
+    with _lock:
+        batch = dict(_pending)
+        _pending.clear()
+        if _timer is not None:
+            _timer.cancel()
+            _timer = None
+    if not batch:
+        return 0
+
+    by_count = defaultdict(list)
+    for post_id, count in batch.items():
+        by_count[count].append(post_id)
+    try:
+        with transaction.atomic():
+            for count, post_ids in by_count.items():
+                BlogPost.objects.filter(id__in=post_ids).update(views=F('views') + count)
+    except Exception:
+        # Put the hits back so the next flush retries them
+        with _lock:
+            _pending.update(batch)
+        raise
+    return sum(batch.values())
+
+
+def _flush_in_background():
+    try:
+        flush_views()
+    except Exception:
+        logger.exception('Failed to flush blog view counts')
+    finally:
+        # Worker threads open their own connection; don't leak it
+        connection.close()
+
+
+def _flush_when_full():
+    global _flush_scheduled
+    try:
+        _flush_in_background()
+    finally:
+        with _lock:
+            _flush_scheduled = False
+
+
+@atexit.register
+def _flush_at_exit():
+    try:
+        flush_views()
+    except Exception:
+        logger.exception('Dropped buffered blog view counts at exit')
@@ -0,0 +1,72 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.template import TemplateDoesNotExist
+from django.db import connection
+from django.db.models import F
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from . import counters
+from .views import post_detail
+from .models import BlogCategory, BlogPost as BlogArticle
+
+
+@override_settings(BLOG_VIEW_FLUSH_INTERVAL=0, BLOG_VIEW_FLUSH_THRESHOLD=1000)
+class BlogViewCounterTests(TestCase):
+    def setUp(self):
+        author = User.objects.create_user('author')
+        category = BlogCategory.objects.create(name='Tips', slug='tips')
+        self.posts = [
+            BlogArticle.objects.create(
+                title=f'Post {i}', slug=f'post-{i}', author=author, category=category,
+                content='...', is_published=True,
+            )
+            for i in range(3)
+        ]
+        self.addCleanup(counters.flush_views)
+
+    def test_detail_view_does_not_write(self):
+        request = RequestFactory().get('/')
+        with CaptureQueriesContext(connection) as queries:
+            try:
+                post_detail(request, self.posts[0].slug)
+            except TemplateDoesNotExist:
+                pass
+        self.assertFalse([q for q in queries if q['sql'].startswith('UPDATE')])
+        self.assertEqual(counters.pending_views(self.posts[0].id), 1)
+
+    def test_flush_batches_increments(self):
+        for post, hits in zip(self.posts, (5, 5, 2)):
+            for _ in range(hits):
+                counters.record_view(post.id)
+
+        # One UPDATE per distinct increment, inside one transaction
+        with self.assertNumQueries(4):
+            self.assertEqual(counters.flush_views(), 12)
+        self.assertEqual(
+            [post.views for post in BlogArticle.objects.order_by('id')], [5, 5, 2]
+        )
+        self.assertEqual(counters.pending_views(self.posts[0].id), 0)
+        self.assertEqual(counters.flush_views(), 0)
+
+    def test_flush_keeps_concurrent_increments(self):
+        counters.record_view(self.posts[0].id)
+        BlogArticle.objects.filter(id=self.posts[0].id).update(views=F('views') + 10)
+        counters.flush_views()
+        self.posts[0].refresh_from_db()
+        self.assertEqual(self.posts[0].views, 11)
+
+    @override_settings(BLOG_VIEW_FLUSH_THRESHOLD=2)
+    def test_full_buffer_starts_one_flush_thread(self):
+        self.addCleanup(setattr, counters, '_flush_scheduled', False)
+        with mock.patch('blog.counters.threading.Thread') as thread:
+            for _ in range(10):
+                counters.record_view(self.posts[0].id)
+        thread.assert_called_once_with(target=counters._flush_when_full, daemon=True)
+        # The flush thread closes its connection; keep the test's open
+        with mock.patch('blog.counters.connection'):
+            counters._flush_when_full()
+        self.assertFalse(counters._flush_scheduled)
+        self.posts[0].refresh_from_db()
+        self.assertEqual(self.posts[0].views, 10)
@@ -1,4 +1,6 @@
 from django.shortcuts import render, get_object_or_404
+from core.search import search
+from .counters import pending_views, record_view
 from .models import BlogCategory, BlogPost
 
 def blog_list(request):
@@ -6,9 +8,15 @@ def blog_list(request):
     posts = BlogPost.objects.filter(is_published=True).order_by('-published_at', '-created_at')
     categories = BlogCategory.objects.filter(is_active=True)
     
+    # Handle search
+    search_query = request.GET.get('search')
+    if search_query:
+        posts = search(posts, search_query)
+    
     context = {
         'posts': posts,
         'categories': categories,
+        'search_query': search_query,
     }
     return render(request, 'blog/blog_list.html', context)
 
@@ -27,9 +35,9 @@ def post_detail(request, post_slug):
     """Display detailed view of a blog post"""
     post = get_object_or_404(BlogPost, slug=post_slug, is_published=True)
     
-    # Increment view count
-    post.views += 1
-    post.save()
+    # Count the view; written to the database in batches
+    record_view(post.id)
+    post.views += pending_views(post.id)
     
     # Get related posts
     related_posts = BlogPost.objects.filter(
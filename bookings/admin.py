@@ -12,6 +12,8 @@ class BookingAdmin(admin.ModelAdmin):
     list_display = ['user', 'venue', 'event_type', 'event_date', 'status', 'total_amount']
     list_filter = ['status', 'event_type', 'event_date', 'venue']
     search_fields = ['user__username', 'user__email', 'venue__name']
+    list_select_related = ['user', 'venue']
+    autocomplete_fields = ['user']
     date_hierarchy = 'event_date'
     readonly_fields = ['created_at', 'updated_at']
 
@@ -20,4 +22,7 @@ class TableBookingAdmin(admin.ModelAdmin):
     list_display = ['user', 'table_number', 'booking_date', 'booking_time', 'status']
     list_filter = ['status', 'booking_date']
     search_fields = ['user__username', 'user__email']
+    list_select_related = ['user']
+    autocomplete_fields = ['user']
     date_hierarchy = 'booking_date'
+    filter_horizontal = ['tables']
@@ -1,10 +1,12 @@
 from django import forms
-from .models import Booking, TableBooking
+from .models import Booking, TableBooking, Venue
 
 class BookingForm(forms.ModelForm):
+    venue = forms.ModelChoiceField(queryset=Venue.objects.filter(is_available=True))
+    
     class Meta:
         model = Booking
-        fields = ['event_type', 'event_date', 'start_time', 'end_time', 'number_of_guests', 'special_requirements']
+        fields = ['venue', 'event_type', 'event_date', 'start_time', 'end_time', 'number_of_guests', 'special_requirements']
         widgets = {
             'event_date': forms.DateInput(attrs={'type': 'date'}),
             'start_time': forms.TimeInput(attrs={'type': 'time'}),
@@ -15,7 +17,7 @@ class BookingForm(forms.ModelForm):
 class TableBookingForm(forms.ModelForm):
     class Meta:
         model = TableBooking
-        fields = ['table_number', 'booking_date', 'booking_time', 'number_of_guests', 'special_requests']
+        fields = ['booking_date', 'booking_time', 'number_of_guests', 'special_requests']
         widgets = {
             'booking_date': forms.DateInput(attrs={'type': 'date'}),
             'booking_time': forms.TimeInput(attrs={'type': 'time'}),
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0003_updated_at_index'),
+        ('restaurant', '0002_updated_at_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tablebooking',
+            name='tables',
+            field=models.ManyToManyField(blank=True, help_text='Every table seated; table_number is the first of them', related_name='bookings', to='restaurant.table'),
+        ),
+        migrations.AddIndex(
+            model_name='tablebooking',
+            index=models.Index(fields=['booking_date', 'status'], name='bookings_tablebooking_date_idx'),
+        ),
+    ]
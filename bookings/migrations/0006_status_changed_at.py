@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:52
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def copy_updated_at(apps, schema_editor):
+    Booking = apps.get_model('bookings', 'Booking')
+    Booking.objects.update(status_changed_at=F('updated_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0005_status_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='status_changed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['status_changed_at'], name='bookings_booking_status_at_idx'),
+        ),
+        migrations.RunPython(copy_updated_at, migrations.RunPython.noop),
+    ]
@@ -53,10 +53,46 @@ class Booking(models.Model):
     special_requirements = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Set by save() when the status moves; QuerySet.update() leaves it alone
+    status_changed_at = models.DateTimeField(default=timezone.now)
+    
+    # Bookings in these states hold their venue slot
+    ACTIVE_STATUSES = ['pending', 'approved', 'completed']
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['venue', 'event_date', 'start_time', 'end_time'], name='bookings_booking_slot_idx'),
+            models.Index(fields=['event_date', 'venue'], name='bookings_booking_date_idx'),
+            models.Index(fields=['updated_at'], name='bookings_booking_updated_idx'),
+            # Polled by the status stream (core.streams)
+            models.Index(fields=['status_changed_at'], name='bookings_booking_status_at_idx'),
+            # Pending approvals on the admin index (core.metrics)
+            models.Index(fields=['status', 'event_date'], name='bookings_booking_status_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.venue.name} on {self.event_date}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Status as loaded, so save() can tell whether it moved
+        if 'status' in field_names:
+            instance._loaded_status = instance.status
+        return instance
+    
+    def save(self, *args, **kwargs):
+        if self.status != getattr(self, '_loaded_status', None):
+            self.status_changed_at = timezone.now()
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'status_changed_at'}
+        super().save(*args, **kwargs)
+        self._loaded_status = self.status
+    
+    def clean(self):
+        from core.availability import validate_slot
+        validate_slot(self)
+    
     def is_past_event(self):
         return self.event_date < timezone.now().date()
     
@@ -70,8 +106,13 @@ class TableBooking(models.Model):
         ('cancelled', 'Cancelled'),
     ]
     
+    # Statuses that keep a table taken
+    ACTIVE_STATUSES = ['pending', 'confirmed']
+    
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     table_number = models.IntegerField()
+    tables = models.ManyToManyField('restaurant.Table', blank=True, related_name='bookings',
+                                    help_text="Every table seated; table_number is the first of them")
     booking_date = models.DateField()
     booking_time = models.TimeField()
     number_of_guests = models.IntegerField(validators=[MinValueValidator(1), MaxValueValidator(10)])
@@ -79,5 +120,10 @@ class TableBooking(models.Model):
     special_requests = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['booking_date', 'status'], name='bookings_tablebooking_date_idx'),
+        ]
+    
     def __str__(self):
         return f"Table {self.table_number} - {self.user.username} on {self.booking_date}"
@@ -0,0 +1,193 @@
+import hashlib
+import json
+from collections import namedtuple
+from datetime import date, datetime
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.cache import get_model_versions
+from core.models import Promotion
+
+# ============================================================================
+# VENUE PRICING
+# ============================================================================
+#
+# quote = (venue base x weekend/season premiums + guests x per-guest charge)
+#         - the best active promotion for the event date
+#
+# The venue base is the day rate, or price_per_hour x duration when that is
+# cheaper. Works for core.Venue (``price``) and bookings.Venue
+# (``price_per_day``). Rules can be overridden with settings.BOOKING_PRICING.
+
+DEFAULT_RULES = {
+    'PER_GUEST': 500,
+    # Monday is 0; Friday to Sunday by default
+    'WEEKEND_DAYS': [4, 5, 6],
+    'WEEKEND_PREMIUM': 20,
+    # [first month, last month, premium percent]; ranges may wrap the year end
+    'SEASONS': [],
+}
+
+QUOTE_CACHE_PREFIX = 'bookings:quote:'
+
+CENT = Decimal('0.01')
+
+Quote = namedtuple('Quote', ['base', 'guests', 'subtotal', 'discount', 'total', 'promotion'])
+
+
+def pricing_rules():
+    return {**DEFAULT_RULES, **getattr(settings, 'BOOKING_PRICING', {})}
+
+
+def rules_version(rules):
+    return hashlib.md5(json.dumps(rules, sort_keys=True).encode()).hexdigest()[:12]
+
+
+def _money(value):
+    return value.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def venue_base(venue, hours=None):
+    """Venue hire before premiums: day rate, or hourly if that is cheaper"""
+    day_rate = getattr(venue, 'price_per_day', None)
+    if day_rate is None:
+        day_rate = venue.price
+    if hours and venue.price_per_hour:
+        return min(day_rate, venue.price_per_hour * Decimal(str(hours)))
+    return day_rate
+
+
+def booking_hours(start, end):
+    """Length of a same-day booking in hours"""
+    delta = datetime.combine(date.min, end) - datetime.combine(date.min, start)
+    return delta.total_seconds() / 3600
+
+
+def _in_season(month, first, last):
+    if first <= last:
+        return first <= month <= last
+    return month >= first or month <= last
+
+
+def date_multiplier(day, rules):
+    """Combined premium factor for a date, e.g. 1.2 for a weekend"""
+    percent = 0
+    if day.weekday() in rules['WEEKEND_DAYS']:
+        percent += rules['WEEKEND_PREMIUM']
+    for first, last, premium in rules['SEASONS']:
+        if _in_season(day.month, first, last):
+            percent += premium
+    return 1 + Decimal(percent) / 100
+
+
+def active_promotions(first_day, last_day):
+    """Active promotions overlapping a date range, fetched once per quote run"""
+    return list(Promotion.objects.filter(
+        is_active=True, start_date__lte=last_day, end_date__gte=first_day,
+    ))
+
+
+def _discount(promotion, subtotal):
+    discount = Decimal(0)
+    if promotion.discount_percentage:
+        discount = subtotal * promotion.discount_percentage / 100
+    if promotion.discount_amount:
+        discount = max(discount, promotion.discount_amount)
+    return min(discount, subtotal)
+
+
+def _best_promotion(promotions, subtotal):
+    best, best_discount = None, Decimal(0)
+    for promotion in promotions:
+        discount = _discount(promotion, subtotal)
+        if discount > best_discount:
+            best, best_discount = promotion, discount
+    return best, best_discount
+
+
+def quote(venue, day, guests, hours=None, promotions=None, rules=None):
+    """Full price breakdown for one venue, date and guest count"""
+    rules = rules or pricing_rules()
+    if promotions is None:
+        promotions = active_promotions(day, day)
+    promotions = [p for p in promotions if p.start_date <= day <= p.end_date]
+
+    base = _money(venue_base(venue, hours) * date_multiplier(day, rules))
+    guest_charge = _money(Decimal(rules['PER_GUEST']) * guests)
+    subtotal = base + guest_charge
+    promotion, discount = _best_promotion(promotions, subtotal)
+    discount = _money(discount)
+    return Quote(base, guest_charge, subtotal, discount, subtotal - discount, promotion)
+
+
+def quote_grid(venues, days, guest_counts, hours=None):
+    """Totals for every venue x date x guest count combination.
+
+    Returns ``{venue.pk: [[total for each guest count] for each date]}``.
+    Promotions are loaded in one query and everything that depends only on
+    the date (premium factor, applicable promotions) or only on the venue
+    (base rate) is computed once, so the inner loop is plain arithmetic.
+    """
+    rules = pricing_rules()
+    per_guest = Decimal(rules['PER_GUEST'])
+    promotions = active_promotions(min(days), max(days)) if days else []
+
+    by_date = [
+        (date_multiplier(day, rules), [p for p in promotions if p.start_date <= day <= p.end_date])
+        for day in days
+    ]
+    guest_charges = [_money(per_guest * guests) for guests in guest_counts]
+
+    grid = {}
+    for venue in venues:
+        base = venue_base(venue, hours)
+        rows = []
+        for multiplier, day_promotions in by_date:
+            day_base = _money(base * multiplier)
+            row = []
+            for guest_charge in guest_charges:
+                subtotal = day_base + guest_charge
+                _, discount = _best_promotion(day_promotions, subtotal)
+                row.append(subtotal - _money(discount))
+            rows.append(row)
+        grid[venue.pk] = rows
+    return grid
+
+
+def _venue_rates(venue):
+    """The venue fields a quote depends on"""
+    day_rate = getattr(venue, 'price_per_day', None)
+    if day_rate is None:
+        day_rate = venue.price
+    return f'{day_rate}/{venue.price_per_hour or ""}'
+
+
+def cached_quote_grid(venues, days, guest_counts, hours=None):
+    """``quote_grid``, cached per venue until its rates, the promotions or
+    the pricing rules change"""
+    [promotions_version] = get_model_versions([Promotion])
+    request_key = '|'.join([
+        ','.join(day.isoformat() for day in days),
+        ','.join(str(guests) for guests in guest_counts),
+        str(hours or ''),
+        rules_version(pricing_rules()),
+        str(promotions_version),
+    ])
+    # A venue's rates are part of its own key, so editing one venue
+    # leaves the others' cached rows alone
+    keys = {
+        venue.pk: f'{QUOTE_CACHE_PREFIX}{venue.pk}:'
+                  + hashlib.md5(f'{request_key}|{_venue_rates(venue)}'.encode()).hexdigest()
+        for venue in venues
+    }
+
+    cached = cache.get_many(keys.values())
+    grid = {pk: cached[key] for pk, key in keys.items() if key in cached}
+    missing = [venue for venue in venues if venue.pk not in grid]
+    if missing:
+        fresh = quote_grid(missing, days, guest_counts, hours)
+        cache.set_many({keys[pk]: rows for pk, rows in fresh.items()}, timeout=60 * 60)
+        grid.update(fresh)
+    return grid
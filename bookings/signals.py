@@ -0,0 +1,32 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from core.cache import bump_model_version
+from .models import TableBooking
+
+
+def _occupancy_changed(booking_id):
+    from .tables import booking_changed
+    transaction.on_commit(lambda: booking_changed(booking_id))
+
+
+@receiver([post_save, post_delete], sender=TableBooking)
+def update_table_occupancy(sender, instance, **kwargs):
+    """Fold a table booking change into the allocator once it is committed"""
+    _occupancy_changed(instance.pk)
+
+
+@receiver(m2m_changed, sender=TableBooking.tables.through)
+def update_table_occupancy_tables(sender, instance, action, reverse, pk_set, **kwargs):
+    """Same for a change of the tables seated, which is saved after the booking row"""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        _occupancy_changed(instance.pk)
+    elif pk_set:
+        for booking_id in pk_set:
+            _occupancy_changed(booking_id)
+    else:
+        # table.bookings.clear() does not say which bookings it touched:
+        # moving the version on makes every process reload its days
+        transaction.on_commit(lambda: bump_model_version(TableBooking))
@@ -0,0 +1,242 @@
+import threading
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from core.availability import lock_slot_day
+from core.cache import bump_model_version, get_model_versions
+from restaurant.models import Table
+from .models import TableBooking
+
+# ============================================================================
+# TABLE ALLOCATION
+# ============================================================================
+#
+# Available tables are laid out once per Table version, ordered by location
+# and number; bit i of a mask stands for the i-th table. A seating is one
+# table or a run of neighbouring tables in the same location, and every
+# possible seating is precomputed with its mask and seat count, smallest
+# first. Each day of table bookings is kept in memory as one integer per
+# service slot with the bits of the tables taken during that slot, so
+# allocating is a few ANDs over the slots of the sitting and no queries.
+#
+# Days are loaded from the database on first use and then kept current from
+# TableBooking changes made in this process; a change made elsewhere moves
+# the shared TableBooking version past ours and the days are reloaded.
+# Booking itself re-reads its day under the SlotLock for that date, so two
+# concurrent requests can never be given the same table.
+
+DEFAULT_RULES = {
+    # Granularity of the occupancy bitmap
+    'SLOT_MINUTES': 15,
+    # How long a table stays taken after the booked time
+    'SITTING_MINUTES': 90,
+    # Most neighbouring tables pushed together for one party
+    'MAX_COMBINED_TABLES': 3,
+}
+
+# SlotLock venue id under which all tables of a date are locked
+LOCK_ID = 0
+
+Seating = namedtuple('Seating', ['mask', 'seats', 'location', 'table_ids', 'table_numbers'])
+
+
+def table_rules():
+    return {**DEFAULT_RULES, **getattr(settings, 'TABLE_SERVICE', {})}
+
+
+class Layout:
+    """Bit positions of the available tables and every seating they allow"""
+
+    def __init__(self, tables, max_combined):
+        self.tables = tables
+        self.bits = {table.id: 1 << index for index, table in enumerate(tables)}
+        self.bits_by_number = {table.table_number: 1 << index for index, table in enumerate(tables)}
+
+        seatings = []
+        for start, first in enumerate(tables):
+            run = []
+            for table in tables[start:start + max_combined]:
+                if table.location != first.location:
+                    break
+                run.append(table)
+                seatings.append(Seating(
+                    mask=sum(self.bits[t.id] for t in run),
+                    seats=sum(t.capacity for t in run),
+                    location=first.location,
+                    table_ids=tuple(t.id for t in run),
+                    table_numbers=tuple(t.table_number for t in run),
+                ))
+        # Best fit first: fewest tables, then fewest seats, then lowest number
+        seatings.sort(key=lambda seating: (len(seating.table_ids), seating.seats, seating.table_numbers))
+        self.seatings = seatings
+
+    def booking_mask(self, table_ids, table_number):
+        """Bits of a booking's tables; bookings made before allocation only have a number"""
+        if table_ids:
+            return sum(self.bits.get(table_id, 0) for table_id in set(table_ids))
+        return self.bits_by_number.get(table_number, 0)
+
+
+class Day:
+    """Occupancy bitmap of one date: one mask of taken tables per slot"""
+
+    def __init__(self, slot_count):
+        self.slots = [0] * slot_count
+        # booking id -> (mask, first slot, end slot)
+        self.bookings = {}
+
+    def add(self, booking_id, mask, first, end):
+        self.bookings[booking_id] = (mask, first, end)
+        for slot in range(first, end):
+            self.slots[slot] |= mask
+
+    def remove(self, booking_id):
+        entry = self.bookings.pop(booking_id, None)
+        if entry is None:
+            return
+        _, first, end = entry
+        # Recomputed rather than cleared: legacy bookings may share a table
+        for slot in range(first, end):
+            self.slots[slot] = 0
+        for mask, other_first, other_end in self.bookings.values():
+            for slot in range(max(first, other_first), min(end, other_end)):
+                self.slots[slot] |= mask
+
+    def taken(self, first, end):
+        mask = 0
+        for slot in range(first, end):
+            mask |= self.slots[slot]
+        return mask
+
+
+_lock = threading.RLock()
+_state = {'layout_version': None, 'layout': None, 'version': None, 'days': {}}
+
+
+def _slot_range(time, rules):
+    """[first, end) slots covered by a sitting starting at ``time``; cut at midnight"""
+    slot_minutes = rules['SLOT_MINUTES']
+    slot_count = 24 * 60 // slot_minutes
+    first = (time.hour * 60 + time.minute) // slot_minutes
+    end = -(-(time.hour * 60 + time.minute + rules['SITTING_MINUTES']) // slot_minutes)
+    return first, min(end, slot_count)
+
+
+def _layout():
+    """Current layout; a new one invalidates every loaded day"""
+    rules = table_rules()
+    version = (get_model_versions([Table])[0], rules['MAX_COMBINED_TABLES'], rules['SLOT_MINUTES'])
+    if _state['layout_version'] != version:
+        tables = list(Table.objects.filter(is_available=True).order_by('location', 'table_number'))
+        _state.update(
+            layout_version=version,
+            layout=Layout(tables, rules['MAX_COMBINED_TABLES']),
+            days={},
+        )
+    return _state['layout']
+
+
+def _load_day(layout, date):
+    rules = table_rules()
+    day = Day(24 * 60 // rules['SLOT_MINUTES'])
+    bookings = list(
+        TableBooking.objects.filter(booking_date=date, status__in=TableBooking.ACTIVE_STATUSES)
+        .values_list('id', 'table_number', 'booking_time')
+    )
+    table_ids = {}
+    links = TableBooking.tables.through.objects.filter(
+        tablebooking__booking_date=date,
+        tablebooking__status__in=TableBooking.ACTIVE_STATUSES,
+    ).values_list('tablebooking_id', 'table_id')
+    for booking_id, table_id in links:
+        table_ids.setdefault(booking_id, []).append(table_id)
+    for booking_id, table_number, booking_time in bookings:
+        day.add(booking_id, layout.booking_mask(table_ids.get(booking_id), table_number),
+                *_slot_range(booking_time, rules))
+    return day
+
+
+def _day(date, fresh=False):
+    """(layout, occupancy of ``date``), loading the day if needed"""
+    with _lock:
+        layout = _layout()
+        version = get_model_versions([TableBooking])[0]
+        if _state['version'] != version:
+            _state.update(version=version, days={})
+        days = _state['days']
+        if fresh or date not in days:
+            days[date] = _load_day(layout, date)
+        return layout, days[date]
+
+
+def _pick(layout, day, time, party_size):
+    first, end = _slot_range(time, table_rules())
+    taken = day.taken(first, end)
+    for seating in layout.seatings:
+        if seating.seats >= party_size and not seating.mask & taken:
+            return seating
+    return None
+
+
+def allocate(date, time, party_size):
+    """Best free seating for a party at ``date`` ``time``, or None if none fits"""
+    layout, day = _day(date)
+    with _lock:
+        return _pick(layout, day, time, party_size)
+
+
+def book_table(booking):
+    """Assign tables to an unsaved TableBooking and save it, or raise ValidationError.
+
+    The choice is made against the date's bookings as read under the date
+    lock, so concurrent requests get different tables.
+    """
+    with transaction.atomic():
+        lock_slot_day(TableBooking, LOCK_ID, booking.booking_date)
+        layout, day = _day(booking.booking_date, fresh=True)
+        with _lock:
+            seating = _pick(layout, day, booking.booking_time, booking.number_of_guests)
+        if seating is None:
+            raise ValidationError(
+                'No table for %(guests)s is free at that time. Please choose another time.',
+                code='full',
+                params={'guests': booking.number_of_guests},
+            )
+        booking.table_number = seating.table_numbers[0]
+        booking.save()
+        booking.tables.set(seating.table_ids)
+    return seating
+
+
+def booking_changed(booking_id):
+    """Fold a committed change of one TableBooking into the loaded days"""
+    rules = table_rules()
+    with _lock:
+        expected = _state['version']
+        version = bump_model_version(TableBooking)
+        if expected is None or version != expected + 1:
+            # Another process changed bookings too; reload lazily
+            _state.update(version=None, days={})
+            return
+        _state['version'] = version
+        for day in _state['days'].values():
+            day.remove(booking_id)
+
+        booking = (
+            TableBooking.objects.filter(pk=booking_id, status__in=TableBooking.ACTIVE_STATUSES)
+            .values_list('table_number', 'booking_date', 'booking_time').first()
+        )
+        if booking is None or booking[1] not in _state['days'] or _state['layout'] is None:
+            return
+        table_number, date, booking_time = booking
+        table_ids = TableBooking.tables.through.objects.filter(
+            tablebooking_id=booking_id,
+        ).values_list('table_id', flat=True)
+        _state['days'][date].add(
+            booking_id, _state['layout'].booking_mask(list(table_ids), table_number),
+            *_slot_range(booking_time, rules),
+        )
+
@@ -0,0 +1,248 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from restaurant.models import Table
+from core.models import Promotion
+from .models import Booking as HallBooking, TableBooking, Venue as Hall
+from .pricing import quote, quote_grid
+from .tables import allocate, book_table
+
+
+class AvailabilityCalendarTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user('guest')
+        self.hall = Hall.objects.create(
+            name='Grand', venue_type='hall', capacity=500, description='...',
+            price_per_day=50000, amenities='AC',
+        )
+        for day, start, end, status in [
+            (14, '10:00', '14:00', 'approved'),
+            (14, '18:00', '22:00', 'pending'),
+            (20, '09:00', '12:00', 'cancelled'),
+        ]:
+            HallBooking.objects.create(
+                user=user, venue=self.hall, event_type='wedding', event_date=f'2030-06-{day}',
+                start_time=start, end_time=end, number_of_guests=100, total_amount=1000, status=status,
+            )
+        self.url = reverse('bookings:availability_api', args=[self.hall.pk, 2030, 6])
+
+    def test_month_lists_active_slots_by_day(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.json(), {
+            'venue': self.hall.pk,
+            'month': '2030-06',
+            'days': {'14': [['10:00', '14:00'], ['18:00', '22:00']]},
+        })
+        self.assertIn('no-cache', response['Cache-Control'])
+
+    def test_unchanged_month_revalidates_with_304(self):
+        etag = self.client.get(self.url)['ETag']
+        # Only the venue check and the month fingerprint run
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # Cancelling a booking changes the month, so the old ETag goes stale
+        booking = HallBooking.objects.get(event_date='2030-06-14', start_time='18:00')
+        booking.status = 'cancelled'
+        booking.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+        etag = response['ETag']
+        booking.delete()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_invalid_month_or_venue_is_404(self):
+        self.assertEqual(self.client.get(f'/bookings/api/availability/{self.hall.pk}/2030-13/').status_code, 404)
+        self.assertEqual(
+            self.client.get(reverse('bookings:availability_api', args=[999, 2030, 6])).status_code, 404
+        )
+
+    def test_unknown_venue_is_404_even_with_a_matching_etag(self):
+        url = reverse('bookings:availability_api', args=[999, 2030, 6])
+        etag = '"999-2030-06-0.000000-0"'
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 404)
+        self.hall.is_available = False
+        self.hall.save()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH='*').status_code, 404)
+
+
+@override_settings(BOOKING_PRICING={'PER_GUEST': 500, 'WEEKEND_DAYS': [5, 6], 'WEEKEND_PREMIUM': 20,
+                                    'SEASONS': [[11, 2, 10]]})
+class PricingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        # The venues bookings are made for, and charged by create_booking
+        self.venue = Hall.objects.create(
+            name='Grand Hall', venue_type='hall', description='...', capacity=500,
+            price_per_day=Decimal('50000'), price_per_hour=Decimal('6000'), amenities='AC',
+        )
+        self.lawn = Hall.objects.create(
+            name='Rose Lawn', venue_type='lawn', description='...', capacity=300,
+            price_per_day=Decimal('35000'), amenities='Lights',
+        )
+        self.weekday = date(2030, 6, 5)    # Wednesday
+        self.saturday = date(2030, 6, 8)
+        self.winter = date(2030, 12, 7)    # Saturday in season
+
+    def test_premiums_and_guest_charge(self):
+        self.assertEqual(quote(self.venue, self.weekday, 100).total, Decimal('100000.00'))
+        self.assertEqual(quote(self.venue, self.saturday, 100).total, Decimal('110000.00'))
+        self.assertEqual(quote(self.venue, self.winter, 100).total, Decimal('115000.00'))
+
+    def test_hourly_rate_applies_when_cheaper(self):
+        self.assertEqual(quote(self.venue, self.weekday, 0, hours=4).base, Decimal('24000.00'))
+        self.assertEqual(quote(self.venue, self.weekday, 0, hours=12).base, Decimal('50000.00'))
+        self.assertEqual(quote(self.lawn, self.weekday, 0, hours=4).base, Decimal('35000.00'))
+
+    def test_best_promotion_wins(self):
+        Promotion.objects.create(title='10%', description='...', discount_percentage=10,
+                                 start_date=date(2030, 6, 1), end_date=date(2030, 6, 6))
+        flat = Promotion.objects.create(title='Flat', description='...', discount_amount=Decimal('12000'),
+                                        start_date=date(2030, 6, 1), end_date=date(2030, 6, 30))
+        result = quote(self.venue, self.weekday, 100)
+        self.assertEqual(result.promotion, flat)
+        self.assertEqual(result.total, Decimal('88000.00'))
+        # Outside the 10% window only the flat discount applies
+        self.assertEqual(quote(self.venue, self.saturday, 100).total, Decimal('98000.00'))
+
+    def test_grid_matches_single_quotes(self):
+        Promotion.objects.create(title='5%', description='...', discount_percentage=5,
+                                 start_date=date(2030, 6, 7), end_date=date(2030, 12, 31))
+        days = [self.weekday, self.saturday, self.winter]
+        guests = [50, 250]
+        with self.assertNumQueries(1):
+            grid = quote_grid([self.venue, self.lawn], days, guests, hours=6)
+        for venue in (self.venue, self.lawn):
+            for row, day in zip(grid[venue.pk], days):
+                self.assertEqual(row, [quote(venue, day, count, hours=6).total for count in guests])
+
+    def test_api_serves_cached_grid_until_content_changes(self):
+        url = reverse('bookings:quote_api')
+        params = {'venues': f'{self.venue.pk},{self.lawn.pk}', 'start': '2030-06-05', 'days': 4,
+                  'guests': '100,200'}
+        data = self.client.get(url, params).json()
+        self.assertEqual(data['dates'], ['2030-06-05', '2030-06-06', '2030-06-07', '2030-06-08'])
+        self.assertEqual([venue['id'] for venue in data['venues']], [self.venue.pk, self.lawn.pk])
+        self.assertEqual(data['venues'][0]['totals'][0], ['100000.00', '150000.00'])
+
+        # Venues are re-read, but prices come from the cache
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(url, params).json(), data)
+
+        # Only the edited venue is priced again
+        self.venue.price_per_day = Decimal('60000')
+        self.venue.save()
+        with mock.patch('bookings.pricing.quote_grid', wraps=quote_grid) as priced:
+            data = self.client.get(url, params).json()
+        self.assertEqual([venue.pk for venue in priced.call_args.args[0]], [self.venue.pk])
+        self.assertEqual(data['venues'][0]['totals'][0], ['110000.00', '160000.00'])
+
+    def test_api_quotes_what_create_booking_charges(self):
+        user = User.objects.create_user('guest')
+        self.client.force_login(user)
+        self.client.post(reverse('bookings:create_booking'), {
+            'venue': self.venue.pk, 'event_type': 'wedding', 'event_date': '2030-06-08',
+            'start_time': '10:00', 'end_time': '14:00', 'number_of_guests': 100,
+        })
+        data = self.client.get(reverse('bookings:quote_api'), {
+            'venues': self.venue.pk, 'dates': '2030-06-08', 'guests': 100, 'hours': 4,
+        }).json()
+        self.assertEqual(Decimal(data['venues'][0]['totals'][0][0]), HallBooking.objects.get().total_amount)
+
+    def test_api_rejects_bad_input(self):
+        url = reverse('bookings:quote_api')
+        for params in ({}, {'start': 'soon'}, {'dates': '2030-06-05', 'guests': '0'},
+                       {'start': '2030-06-05', 'days': 400},
+                       {'dates': '2030-06-05', 'hours': 'nan'}, {'dates': '2030-06-05', 'hours': 'inf'}):
+            self.assertEqual(self.client.get(url, params).status_code, 400, params)
+
+
+class TableAllocationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('diner')
+        self.date = timezone.localdate() + timedelta(days=3)
+        for number, capacity, location in [
+            (1, 2, 'Ground Floor'), (2, 4, 'Ground Floor'), (3, 4, 'Ground Floor'),
+            (4, 6, 'Outdoor'), (10, 2, 'Outdoor'),
+        ]:
+            Table.objects.create(table_number=number, capacity=capacity, location=location)
+
+    def at(self, value):
+        return datetime.strptime(value, '%H:%M').time()
+
+    def book(self, at, guests):
+        booking = TableBooking(user=self.user, booking_date=self.date, booking_time=self.at(at),
+                               number_of_guests=guests)
+        with self.captureOnCommitCallbacks(execute=True):
+            seating = book_table(booking)
+        return seating.table_numbers
+
+    def test_best_fit_single_table(self):
+        self.assertEqual(allocate(self.date, self.at('19:00'), 2).table_numbers, (1,))
+        self.assertEqual(allocate(self.date, self.at('19:00'), 3).table_numbers, (2,))
+        self.assertEqual(allocate(self.date, self.at('19:00'), 5).table_numbers, (4,))
+
+    def test_large_party_gets_adjacent_tables_in_one_location(self):
+        self.assertEqual(allocate(self.date, self.at('19:00'), 8).table_numbers, (2, 3))
+        self.assertEqual(allocate(self.date, self.at('19:00'), 10).table_numbers, (1, 2, 3))
+        self.assertIsNone(allocate(self.date, self.at('19:00'), 11))
+
+    def test_bookings_take_tables_for_the_sitting(self):
+        self.assertEqual(self.book('19:00', 4), (2,))
+        self.assertEqual(self.book('19:30', 4), (3,))
+        self.assertEqual(self.book('20:00', 4), (4,))
+        with self.assertRaises(ValidationError):
+            self.book('20:15', 8)
+        # Tables 2 and 3 are free again once their 90 minute sittings end
+        self.assertEqual(allocate(self.date, self.at('21:00'), 4).table_numbers, (2,))
+        self.assertEqual(TableBooking.objects.get(table_number=2).tables.get().table_number, 2)
+
+    def test_allocation_runs_in_memory_and_follows_changes(self):
+        self.book('19:00', 6)
+        with self.assertNumQueries(0):
+            self.assertEqual(allocate(self.date, self.at('19:00'), 6).table_numbers, (1, 2))
+
+        booking = TableBooking.objects.get()
+        booking.status = 'cancelled'
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.save()
+        self.assertEqual(allocate(self.date, self.at('19:00'), 6).table_numbers, (4,))
+
+        # A booking made elsewhere with just a table number still takes it
+        with self.captureOnCommitCallbacks(execute=True):
+            TableBooking.objects.create(user=self.user, booking_date=self.date, booking_time='18:30',
+                                        number_of_guests=6, table_number=4)
+        self.assertEqual(allocate(self.date, self.at('19:00'), 6).table_numbers, (1, 2))
+
+    def test_table_changes_relayout(self):
+        self.assertEqual(allocate(self.date, self.at('12:00'), 2).table_numbers, (1,))
+        with self.captureOnCommitCallbacks(execute=True):
+            Table.objects.filter(table_number=1).get().delete()
+        self.assertEqual(allocate(self.date, self.at('12:00'), 2).table_numbers, (10,))
+
+    def test_book_table_view_and_api(self):
+        self.client.force_login(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('bookings:book_table'), {
+                'booking_date': self.date.isoformat(), 'booking_time': '19:00', 'number_of_guests': 2,
+            })
+        self.assertRedirects(response, reverse('bookings:book_table'))
+        self.assertEqual(TableBooking.objects.get().table_number, 1)
+
+        response = self.client.get(reverse('bookings:table_availability_api'),
+                                   {'date': self.date.isoformat(), 'time': '19:30', 'guests': 2})
+        self.assertEqual(response.json(), {'available': True, 'tables': [10], 'seats': 2, 'location': 'Outdoor'})
+        response = self.client.get(reverse('bookings:table_availability_api'), {'date': 'soon'})
+        self.assertEqual(response.status_code, 400)
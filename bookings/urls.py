@@ -9,7 +9,11 @@ urlpatterns = [
     path('garden-lawn/', views.garden_lawn, name='garden_lawn'),
     path('book-hall/', views.book_hall, name='book_hall'),
     path('create-booking/', views.create_booking, name='create_booking'),
+    path('book-table/', views.book_table, name='book_table'),
     path('my-bookings/', views.my_bookings, name='my_bookings'),
     path('booking/<int:booking_id>/', views.booking_detail, name='booking_detail'),
     path('booking/<int:booking_id>/cancel/', views.cancel_booking, name='cancel_booking'),
+    path('api/quote/', views.quote_api, name='quote_api'),
+    path('api/tables/', views.table_availability_api, name='table_availability_api'),
+    path('api/availability/<int:venue_id>/<int:year>-<int:month>/', views.availability_api, name='availability_api'),
 ]
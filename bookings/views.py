@@ -1,19 +1,35 @@
+import math
+from datetime import date, time, timedelta
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse
-from django.views.decorators.http import require_POST
-from .models import Booking
-from .forms import BookingForm
+from django.core.exceptions import ValidationError
+from django.http import Http404, JsonResponse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_GET, require_POST
+from .models import Booking, Venue as BookableVenue
+from .forms import BookingForm, TableBookingForm
 from core.models import Venue
+from core.availability import book_slot, month_occupancy, month_version
+from core.cache import anonymous_page_cache
+from .pricing import booking_hours, cached_quote_grid, quote
+from .tables import allocate, book_table as allocate_and_book
+
+# Largest grid the quote API will price in one request
+MAX_QUOTE_VENUES = 20
+MAX_QUOTE_DATES = 62
+MAX_QUOTE_GUEST_COUNTS = 20
 
 def venue_list(request):
     venues = Venue.objects.filter(is_active=True)
     return render(request, 'bookings/venue_list.html', {'venues': venues})
 
+@anonymous_page_cache()
 def marriage_hall(request):
     return render(request, 'bookings/marriage_hall.html')
 
+@anonymous_page_cache()
 def garden_lawn(request):
     return render(request, 'bookings/garden_lawn.html')
 
@@ -27,14 +43,65 @@ def create_booking(request):
         if form.is_valid():
             booking = form.save(commit=False)
             booking.user = request.user
-            booking.save()
-            messages.success(request, 'Booking created successfully!')
-            return redirect('bookings:my_bookings')
+            booking.total_amount = quote(
+                booking.venue, booking.event_date, booking.number_of_guests,
+                hours=booking_hours(booking.start_time, booking.end_time),
+            ).total
+            try:
+                # Re-checks the slot under a lock; a concurrent booking may have won it
+                book_slot(booking)
+            except ValidationError as error:
+                form.add_error(None, error)
+            else:
+                messages.success(request, 'Booking created successfully!')
+                return redirect('bookings:my_bookings')
     else:
         form = BookingForm()
     
     return render(request, 'bookings/create_booking.html', {'form': form})
 
+@login_required
+def book_table(request):
+    if request.method == 'POST':
+        form = TableBookingForm(request.POST)
+        if form.is_valid():
+            booking = form.save(commit=False)
+            booking.user = request.user
+            try:
+                seating = allocate_and_book(booking)
+            except ValidationError as error:
+                form.add_error(None, error)
+            else:
+                tables = ', '.join(str(number) for number in seating.table_numbers)
+                messages.success(request, f'Table booked! You are seated at table {tables} ({seating.location}).')
+                return redirect('bookings:book_table')
+    else:
+        form = TableBookingForm()
+    
+    return render(request, 'bookings/book_table.html', {'form': form})
+
+@require_GET
+def table_availability_api(request):
+    """The seating a party would get at a date and time, without booking it"""
+    try:
+        booking_date = date.fromisoformat(request.GET['date'])
+        booking_time = time.fromisoformat(request.GET['time'])
+        guests = int(request.GET.get('guests', 2))
+    except (KeyError, ValueError):
+        return JsonResponse({'error': 'Pass date=YYYY-MM-DD, time=HH:MM and guests=N'}, status=400)
+    if guests < 1:
+        return JsonResponse({'error': 'Guests must be positive'}, status=400)
+    
+    seating = allocate(booking_date, booking_time, guests)
+    if seating is None:
+        return JsonResponse({'available': False})
+    return JsonResponse({
+        'available': True,
+        'tables': seating.table_numbers,
+        'seats': seating.seats,
+        'location': seating.location,
+    })
+
 @login_required
 def my_bookings(request):
     bookings = Booking.objects.filter(user=request.user).order_by('-created_at')
@@ -53,3 +120,74 @@ def cancel_booking(request, booking_id):
     booking.save()
     messages.success(request, 'Booking cancelled successfully!')
     return redirect('bookings:my_bookings')
+
+def _valid_month(year, month):
+    return 1 <= year <= 9999 and 1 <= month <= 12
+
+def _availability_etag(request, venue_id, year, month):
+    # No ETag for what the view will 404, so If-None-Match can't turn it into a 304
+    if not _valid_month(year, month):
+        return None
+    if not BookableVenue.objects.filter(id=venue_id, is_available=True).exists():
+        return None
+    return month_version(Booking, venue_id, year, month)
+
+@require_GET
+@cache_control(public=True, no_cache=True)
+@condition(etag_func=_availability_etag)
+def availability_api(request, venue_id, year, month):
+    """Booked time slots of a venue for one month, revalidated by ETag"""
+    if not _valid_month(year, month):
+        raise Http404('Invalid month')
+    venue = get_object_or_404(BookableVenue, id=venue_id, is_available=True)
+    return JsonResponse({
+        'venue': venue.id,
+        'month': f'{year}-{month:02d}',
+        'days': month_occupancy(Booking, venue, year, month),
+    })
+
+def _quote_dates(request):
+    if request.GET.get('dates'):
+        return [date.fromisoformat(value) for value in request.GET['dates'].split(',')]
+    start = date.fromisoformat(request.GET['start'])
+    days = int(request.GET.get('days', 1))
+    if days < 1:
+        raise ValueError('days must be positive')
+    return [start + timedelta(days=offset) for offset in range(min(days, MAX_QUOTE_DATES + 1))]
+
+@require_GET
+def quote_api(request):
+    """Price every venue x date x guest count combination in one response,
+    as create_booking would charge it"""
+    try:
+        dates = _quote_dates(request)
+        guest_counts = [int(value) for value in request.GET.get('guests', '100').split(',')]
+        hours = float(request.GET['hours']) if request.GET.get('hours') else None
+        venue_ids = [int(value) for value in request.GET['venues'].split(',')] if request.GET.get('venues') else None
+    except (KeyError, ValueError):
+        return JsonResponse(
+            {'error': 'Pass dates=YYYY-MM-DD,... or start=YYYY-MM-DD&days=N, '
+                      'and optionally venues=ID,..., guests=N,... and hours=N'},
+            status=400,
+        )
+    if any(guests < 1 for guests in guest_counts) or (hours is not None and not (math.isfinite(hours) and hours > 0)):
+        return JsonResponse({'error': 'Guest counts and hours must be positive'}, status=400)
+
+    venues = BookableVenue.objects.filter(is_available=True).order_by('id')
+    if venue_ids is not None:
+        venues = venues.filter(pk__in=venue_ids)
+    venues = list(venues[:MAX_QUOTE_VENUES + 1])
+    if (len(venues) > MAX_QUOTE_VENUES or len(dates) > MAX_QUOTE_DATES
+            or len(guest_counts) > MAX_QUOTE_GUEST_COUNTS):
+        return JsonResponse({'error': 'Quote grid too large'}, status=400)
+
+    grid = cached_quote_grid(venues, dates, guest_counts, hours)
+    return JsonResponse({
+        'dates': dates,
+        'guests': guest_counts,
+        'hours': hours,
+        'venues': [
+            {'id': venue.pk, 'name': venue.name, 'totals': grid[venue.pk]}
+            for venue in venues
+        ],
+    })
@@ -1,4 +1,9 @@
+from datetime import timedelta
+
 from django.contrib import admin
+from django.db.models import Count
+from django.template.response import TemplateResponse
+from django.utils import timezone
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 from .models import (
@@ -6,8 +11,10 @@ from .models import (
     Venue, VenuePhoto, VenueVideo, Booking,
     CateringPackage, MenuCategory, MenuItem,
     Testimonial, Gallery, FAQ, BlogPost,
-    Slider, Promotion, Event
+    Slider, Promotion, Event, RollupState
 )
+from .rollups import report
+from .thumbnails import thumbnail_url
 
 # ============================================================================
 # SITE SETTINGS & GENERAL CONTENT ADMIN
@@ -47,7 +54,7 @@ class HeroSectionAdmin(admin.ModelAdmin):
     
     def image_preview(self, obj):
         if obj.background_image:
-            return format_html('<img src="{}" style="max-height: 50px; max-width: 50px;" />', obj.background_image.url)
+            return format_html('<img src="{}" style="max-height: 50px; max-width: 50px;" />', thumbnail_url(obj.background_image))
         return "No Image"
     image_preview.short_description = 'Background Image'
     
@@ -72,7 +79,7 @@ class AboutSectionAdmin(admin.ModelAdmin):
     
     def image_preview(self, obj):
         if obj.image:
-            return format_html('<img src="{}" style="max-height: 50px; max-width: 50px;" />', obj.image.url)
+            return format_html('<img src="{}" style="max-height: 50px; max-width: 50px;" />', thumbnail_url(obj.image))
         return "No Image"
     image_preview.short_description = 'Image'
     
@@ -100,7 +107,7 @@ class ServiceAdmin(admin.ModelAdmin):
     
     def image_preview(self, obj):
         if obj.image:
-            return format_html('<img src="{}" style="max-height: 50px; max-width: 50px;" />', obj.image.url)
+            return format_html('<img src="{}" style="max-height: 50px; max-width: 50px;" />', thumbnail_url(obj.image))
         return "No Image"
     image_preview.short_description = 'Image'
     
@@ -125,7 +132,7 @@ class FacilityAdmin(admin.ModelAdmin):
     
     def image_preview(self, obj):
         if obj.image:
-            return format_html('<img src="{}" style="max-height: 50px; max-width: 50px;" />', obj.image.url)
+            return format_html('<img src="{}" style="max-height: 50px; max-width: 50px;" />', thumbnail_url(obj.image))
         return "No Image"
     image_preview.short_description = 'Image'
     
@@ -173,11 +180,12 @@ class VenuePhotoAdmin(admin.ModelAdmin):
     list_display = ['venue', 'caption', 'is_primary', 'order', 'image_preview', 'created_at']
     list_filter = ['venue', 'is_primary', 'created_at']
     search_fields = ['venue__name', 'caption']
+    list_select_related = ['venue']
     list_editable = ['is_primary', 'order']
     
     def image_preview(self, obj):
         if obj.image:
-            return format_html('<img src="{}" style="max-height: 50px; max-width: 50px;" />', obj.image.url)
+            return format_html('<img src="{}" style="max-height: 50px; max-width: 50px;" />', thumbnail_url(obj.image))
         return "No Image"
     image_preview.short_description = 'Preview'
     
@@ -195,6 +203,7 @@ class VenueVideoAdmin(admin.ModelAdmin):
     list_display = ['venue', 'title', 'video_type', 'is_active', 'order', 'created_at']
     list_filter = ['venue', 'is_active', 'created_at']
     search_fields = ['venue__name', 'title', 'description']
+    list_select_related = ['venue']
     list_editable = ['is_active', 'order']
     
     def video_type(self, obj):
@@ -224,6 +233,8 @@ class BookingAdmin(admin.ModelAdmin):
     list_filter = ['status', 'event_date', 'venue', 'created_at']
     search_fields = ['user__username', 'venue__name', 'event_type']
     list_editable = ['status']
+    list_select_related = ['user', 'venue']
+    autocomplete_fields = ['user']
     readonly_fields = ['created_at', 'updated_at']
     
     fieldsets = (
@@ -272,9 +283,13 @@ class MenuCategoryAdmin(admin.ModelAdmin):
     search_fields = ['name', 'description']
     list_editable = ['is_active', 'order']
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(item_total=Count('items'))
+    
     def item_count(self, obj):
-        return obj.items.count()
+        return obj.item_total
     item_count.short_description = 'Items'
+    item_count.admin_order_field = 'item_total'
     
     fieldsets = (
         ('Category Information', {
@@ -291,10 +306,11 @@ class MenuItemAdmin(admin.ModelAdmin):
     list_filter = ['category', 'is_vegetarian', 'is_spicy', 'is_available', 'is_popular', 'created_at']
     search_fields = ['name', 'description']
     list_editable = ['price', 'is_vegetarian', 'is_spicy', 'is_available', 'is_popular', 'order']
+    list_select_related = ['category']
     
     def image_preview(self, obj):
         if obj.image:
-            return format_html('<img src="{}" style="max-height: 50px; max-width: 50px;" />', obj.image.url)
+            return format_html('<img src="{}" style="max-height: 50px; max-width: 50px;" />', thumbnail_url(obj.image))
         return "No Image"
     image_preview.short_description = 'Preview'
     
@@ -320,10 +336,11 @@ class TestimonialAdmin(admin.ModelAdmin):
     list_filter = ['rating', 'is_featured', 'is_active', 'venue', 'created_at']
     search_fields = ['author_name', 'content']
     list_editable = ['rating', 'is_featured', 'is_active']
+    list_select_related = ['venue']
     
     def image_preview(self, obj):
         if obj.image:
-            return format_html('<img src="{}" style="max-height: 50px; max-width: 50px;" />', obj.image.url)
+            return format_html('<img src="{}" style="max-height: 50px; max-width: 50px;" />', thumbnail_url(obj.image))
         return "No Image"
     image_preview.short_description = 'Author Image'
     
@@ -348,10 +365,11 @@ class GalleryAdmin(admin.ModelAdmin):
     list_filter = ['category', 'event_type', 'venue', 'is_featured', 'is_active', 'created_at']
     search_fields = ['title', 'description']
     list_editable = ['is_featured', 'is_active', 'order']
+    list_select_related = ['venue']
     
     def image_preview(self, obj):
         if obj.image:
-            return format_html('<img src="{}" style="max-height: 50px; max-width: 50px;" />', obj.image.url)
+            return format_html('<img src="{}" style="max-height: 50px; max-width: 50px;" />', thumbnail_url(obj.image))
         return "No Image"
     image_preview.short_description = 'Preview'
     
@@ -389,12 +407,14 @@ class BlogPostAdmin(admin.ModelAdmin):
     list_filter = ['is_published', 'is_featured', 'category', 'created_at']
     search_fields = ['title', 'content', 'author__username']
     list_editable = ['is_published', 'is_featured']
+    list_select_related = ['author']
+    autocomplete_fields = ['author']
     prepopulated_fields = {'slug': ('title',)}
     readonly_fields = ['created_at', 'updated_at']
     
     def featured_image_preview(self, obj):
         if obj.featured_image:
-            return format_html('<img src="{}" style="max-height: 50px; max-width: 50px;" />', obj.featured_image.url)
+            return format_html('<img src="{}" style="max-height: 50px; max-width: 50px;" />', thumbnail_url(obj.featured_image))
         return "No Image"
     featured_image_preview.short_description = 'Featured Image'
     
@@ -430,7 +450,7 @@ class SliderAdmin(admin.ModelAdmin):
     
     def image_preview(self, obj):
         if obj.image:
-            return format_html('<img src="{}" style="max-height: 50px; max-width: 50px;" />', obj.image.url)
+            return format_html('<img src="{}" style="max-height: 50px; max-width: 50px;" />', thumbnail_url(obj.image))
         return "No Image"
     image_preview.short_description = 'Preview'
     
@@ -455,7 +475,7 @@ class PromotionAdmin(admin.ModelAdmin):
     
     def image_preview(self, obj):
         if obj.image:
-            return format_html('<img src="{}" style="max-height: 50px; max-width: 50px;" />', obj.image.url)
+            return format_html('<img src="{}" style="max-height: 50px; max-width: 50px;" />', thumbnail_url(obj.image))
         return "No Image"
     image_preview.short_description = 'Preview'
     
@@ -483,10 +503,11 @@ class EventAdmin(admin.ModelAdmin):
     list_filter = ['event_date', 'venue', 'is_active', 'created_at']
     search_fields = ['title', 'description']
     list_editable = ['is_active']
+    list_select_related = ['venue']
     
     def image_preview(self, obj):
         if obj.image:
-            return format_html('<img src="{}" style="max-height: 50px; max-width: 50px;" />', obj.image.url)
+            return format_html('<img src="{}" style="max-height: 50px; max-width: 50px;" />', thumbnail_url(obj.image))
         return "No Image"
     image_preview.short_description = 'Preview'
     
@@ -519,3 +540,40 @@ admin.site.index_title = "Welcome to Royal Palace Administration"
 
 # Register models with custom admin classes
 # (All models are already registered with @admin.register decorators above)
+
+# ============================================================================
+# REPORTING ADMIN
+# ============================================================================
+
+@admin.register(RollupState)
+class ReportAdmin(admin.ModelAdmin):
+    """Revenue and occupancy dashboard, read from the daily rollups.
+
+    Keep them current with ``manage.py refresh_rollups`` every few minutes.
+    """
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        return False
+    
+    def changelist_view(self, request, extra_context=None):
+        try:
+            months = min(max(int(request.GET.get('months', 12)), 1), 120)
+        except ValueError:
+            months = 12
+        end = timezone.localdate()
+        start = (end.replace(day=1) - timedelta(days=31 * (months - 1))).replace(day=1)
+        context = {
+            **self.admin_site.each_context(request),
+            'title': 'Reports',
+            'opts': self.model._meta,
+            'months': months,
+            'report': report(start, end),
+            **(extra_context or {}),
+        }
+        return TemplateResponse(request, 'admin/core/reports.html', context)
@@ -1,6 +1,26 @@
 from django.apps import AppConfig
+from django.contrib.admin import apps as admin_apps
+from django.db.models.signals import post_migrate
+
+
+def restore_search_index(sender, using, **kwargs):
+    """Recreate FTS5 triggers dropped by SQLite table rebuilds in later migrations"""
+    from django.db import connections
+    from .search import install_search_index
+    install_search_index(connections[using])
 
 
 class CoreConfig(AppConfig):
+    default = True
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        post_migrate.connect(restore_search_index, sender=self)
+
+
+class RoyalPalaceAdminConfig(admin_apps.AdminConfig):
+    """The admin app, with the operational dashboard as its index"""
+    default = False
+    default_site = 'core.sites.RoyalPalaceAdminSite'
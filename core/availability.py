@@ -0,0 +1,182 @@
+import calendar
+import re
+from datetime import date as Date
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Count, IntegerField, Max
+
+# ============================================================================
+# VENUE AVAILABILITY
+# ============================================================================
+#
+# Works for both booking models (bookings.Booking against bookings.Venue and
+# core.Booking against core.Venue). Each table has a (venue, event_date,
+# start_time, end_time) index that answers "is this slot free" with a single
+# index seek, and an (event_date, venue) index that yields the venues busy on
+# a date without touching the rest of the table. The indexes are not partial
+# on status: the status list is a bound parameter, which SQLite will not match
+# against a partial index condition. Two slots overlap when each starts
+# before the other ends, so back-to-back bookings are fine.
+
+# How to tell whether a venue takes bookings at all
+VENUE_OPEN_FILTERS = {
+    'bookings.venue': {'is_available': True},
+    'core.venue': {'is_active': True},
+}
+
+_NUMBER = re.compile(r'\d+')
+
+
+def _venue_model(booking_model):
+    return booking_model._meta.get_field('venue').related_model
+
+
+def active_bookings(booking_model):
+    return booking_model.objects.filter(status__in=booking_model.ACTIVE_STATUSES)
+
+
+def overlapping_bookings(booking_model, venue, date, start, end):
+    """Active bookings of ``venue`` on ``date`` that overlap ``start``-``end``"""
+    return active_bookings(booking_model).filter(
+        venue=venue, event_date=date, start_time__lt=end, end_time__gt=start,
+    )
+
+
+def is_slot_free(booking_model, venue, date, start, end, exclude=None):
+    conflicts = overlapping_bookings(booking_model, venue, date, start, end)
+    if exclude is not None:
+        conflicts = conflicts.exclude(pk=exclude)
+    return not conflicts.exists()
+
+
+def day_schedule(booking_model, venue, date):
+    """Booked (start, end) intervals of a venue on a date, in start order"""
+    return list(
+        active_bookings(booking_model)
+        .filter(venue=venue, event_date=date)
+        .order_by('start_time', 'end_time')
+        .values_list('start_time', 'end_time')
+    )
+
+
+def month_bounds(year, month):
+    """First and last day of a month"""
+    return Date(year, month, 1), Date(year, month, calendar.monthrange(year, month)[1])
+
+
+def month_occupancy(booking_model, venue, year, month):
+    """Booked intervals of a venue for a whole month, keyed by day of month"""
+    days = {}
+    rows = (
+        active_bookings(booking_model)
+        .filter(venue=venue, event_date__range=month_bounds(year, month))
+        .order_by('event_date', 'start_time')
+        .values_list('event_date', 'start_time', 'end_time')
+    )
+    for event_date, start, end in rows:
+        days.setdefault(event_date.day, []).append(
+            [start.strftime('%H:%M'), end.strftime('%H:%M')]
+        )
+    return days
+
+
+def month_version(booking_model, venue, year, month):
+    """Fingerprint of a venue's bookings in a month, for use as an ETag.
+
+    Any save bumps the latest ``updated_at``; the row count catches deletes.
+    Bookings in every status count, since cancelling one frees its slot.
+    """
+    stats = booking_model.objects.filter(
+        venue=venue, event_date__range=month_bounds(year, month),
+    ).aggregate(latest=Max('updated_at'), total=Count('id'))
+    latest = stats['latest'].timestamp() if stats['latest'] else 0
+    return f'{venue}-{year}-{month:02d}-{latest:.6f}-{stats["total"]}'
+
+
+def venue_capacity(venue):
+    """Guest capacity as an int; core venues store free text like '200-500'"""
+    if isinstance(venue.capacity, int):
+        return venue.capacity
+    numbers = [int(number) for number in _NUMBER.findall(venue.capacity or '')]
+    return max(numbers) if numbers else None
+
+
+def free_venues(booking_model, date, guests, start=None, end=None):
+    """Open venues that seat ``guests`` and are free on ``date``.
+
+    With ``start`` and ``end`` only that window has to be free; without them
+    the venue must have no active booking that day.
+    """
+    venue_model = _venue_model(booking_model)
+    busy = active_bookings(booking_model).filter(event_date=date)
+    if start is not None and end is not None:
+        busy = busy.filter(start_time__lt=end, end_time__gt=start)
+
+    venues = venue_model.objects.filter(
+        **VENUE_OPEN_FILTERS[venue_model._meta.label_lower]
+    ).exclude(id__in=busy.values('venue_id'))
+
+    if isinstance(venue_model._meta.get_field('capacity'), IntegerField):
+        return list(venues.filter(capacity__gte=guests))
+    return [
+        venue for venue in venues
+        if (venue_capacity(venue) or 0) >= guests
+    ]
+
+
+def validate_slot(booking):
+    """Raise ValidationError if ``booking`` clashes with another active booking"""
+    if booking.start_time is None or booking.end_time is None:
+        return
+    if booking.end_time <= booking.start_time:
+        raise ValidationError({'end_time': 'End time must be after the start time.'})
+    if booking.venue_id is None or booking.event_date is None:
+        return
+    if booking.status not in booking.ACTIVE_STATUSES:
+        return
+
+    conflicts = overlapping_bookings(
+        type(booking), booking.venue_id, booking.event_date,
+        booking.start_time, booking.end_time,
+    )
+    if booking.pk is not None:
+        conflicts = conflicts.exclude(pk=booking.pk)
+    clash = conflicts.order_by('start_time').values_list('start_time', 'end_time').first()
+    if clash is not None:
+        raise ValidationError(
+            'This venue is already booked from %(start)s to %(end)s on that date.',
+            code='slot_taken',
+            params={'start': clash[0].strftime('%H:%M'), 'end': clash[1].strftime('%H:%M')},
+        )
+
+
+def lock_slot_day(booking_model, venue_id, date):
+    """Block other bookings of this venue and date until the transaction ends.
+
+    Takes a row lock on the matching SlotLock, creating it first if needed,
+    so bookings for different venues or dates never wait on each other. On
+    SQLite, which locks the whole database for writes, the insert already
+    serializes writers. Must be called inside ``transaction.atomic()``.
+    """
+    from .models import SlotLock
+
+    scope = booking_model._meta.label_lower
+    SlotLock.objects.bulk_create(
+        [SlotLock(scope=scope, venue_id=venue_id, date=date)], ignore_conflicts=True,
+    )
+    SlotLock.objects.select_for_update().get(scope=scope, venue_id=venue_id, date=date)
+
+
+def book_slot(booking):
+    """Save ``booking`` if its slot is still free, else raise ValidationError.
+
+    The overlap check and the insert happen under the venue/date lock, so of
+    two concurrent requests for overlapping slots exactly one is saved: the
+    one that takes the lock first. The other sees the saved booking.
+    """
+    with transaction.atomic():
+        lock_slot_day(type(booking), booking.venue_id, booking.event_date)
+        validate_slot(booking)
+        booking.save()
+    return booking
@@ -0,0 +1,205 @@
+import hashlib
+import threading
+import time
+from functools import wraps
+
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from .models import (
+    SiteSettings, HeroSection, Service, Facility, Venue,
+    CateringPackage, Testimonial, Gallery, BlogPost,
+    Slider, Promotion
+)
+
+# ============================================================================
+# SITE SETTINGS CACHE
+# ============================================================================
+
+SITE_SETTINGS_VERSION_KEY = 'core:site_settings:version'
+
+# Process-local copy of the SiteSettings row as (version, instance). The shared
+# cache only holds the version counter, so a save in any process makes every
+# other process reload the row on its next request.
+_site_settings = (None, None)
+_site_settings_lock = threading.Lock()
+
+
+def _site_settings_version():
+    version = cache.get(SITE_SETTINGS_VERSION_KEY)
+    if version is None:
+        # Seed from the clock rather than 1 so an evicted or cleared counter
+        # never comes back at a version some process already holds.
+        cache.add(SITE_SETTINGS_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(SITE_SETTINGS_VERSION_KEY)
+    return version
+
+
+def get_site_settings():
+    """Return the SiteSettings row, loading it at most once per version"""
+    global _site_settings
+    version = _site_settings_version()
+    cached_version, instance = _site_settings
+    if cached_version == version:
+        return instance
+
+    with _site_settings_lock:
+        if _site_settings[0] != version:
+            _site_settings = (version, SiteSettings.objects.first())
+        return _site_settings[1]
+
+
+def invalidate_site_settings():
+    """Bump the shared SiteSettings version so every process reloads it"""
+    try:
+        cache.incr(SITE_SETTINGS_VERSION_KEY)
+    except ValueError:
+        cache.set(SITE_SETTINGS_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+# ============================================================================
+# HOMEPAGE CONTEXT CACHE
+# ============================================================================
+
+HOME_CACHE_PREFIX = 'core:home:'
+
+# Each homepage section is materialized and cached on its own so that an admin
+# edit only throws away the sections built from the model that changed.
+HOME_SECTIONS = {
+    'hero_sections': lambda: list(HeroSection.objects.filter(is_active=True)),
+    'sliders': lambda: list(Slider.objects.filter(is_active=True)),
+    'services': lambda: list(Service.objects.filter(is_active=True)[:6]),
+    'facilities': lambda: list(Facility.objects.filter(is_active=True)[:6]),
+    'featured_venues': lambda: list(Venue.objects.filter(is_active=True, is_featured=True)[:3]),
+    'testimonials': lambda: list(Testimonial.objects.filter(is_active=True, is_featured=True)[:6]),
+    'gallery_images': lambda: list(Gallery.objects.filter(is_active=True, is_featured=True)[:8]),
+    'latest_posts': lambda: list(BlogPost.objects.filter(is_published=True)[:3]),
+    'promotions': lambda: list(Promotion.objects.filter(is_active=True)[:3]),
+    'packages': lambda: list(CateringPackage.objects.filter(is_active=True)[:3]),
+}
+
+# Which sections have to be rebuilt when a given model is saved or deleted
+HOME_SECTION_MODELS = {
+    HeroSection: ['hero_sections'],
+    Slider: ['sliders'],
+    Service: ['services'],
+    Facility: ['facilities'],
+    Venue: ['featured_venues'],
+    Testimonial: ['testimonials'],
+    Gallery: ['gallery_images'],
+    BlogPost: ['latest_posts'],
+    Promotion: ['promotions'],
+    CateringPackage: ['packages'],
+}
+
+
+def _home_key(section):
+    return HOME_CACHE_PREFIX + section
+
+
+def get_home_sections():
+    """Return every homepage section, building only the ones missing from cache"""
+    keys = {_home_key(section): section for section in HOME_SECTIONS}
+    cached = cache.get_many(keys)
+
+    sections = {}
+    missing = {}
+    for key, section in keys.items():
+        if key in cached:
+            sections[section] = cached[key]
+        else:
+            sections[section] = missing[key] = HOME_SECTIONS[section]()
+
+    if missing:
+        cache.set_many(missing, timeout=None)
+    return sections
+
+
+def invalidate_home_sections(model):
+    """Drop the cached homepage sections that are built from ``model``"""
+    sections = HOME_SECTION_MODELS.get(model, [])
+    if sections:
+        cache.delete_many([_home_key(section) for section in sections])
+
+
+# ============================================================================
+# ANONYMOUS PAGE CACHE
+# ============================================================================
+
+MODEL_VERSION_PREFIX = 'core:version:'
+PAGE_CACHE_PREFIX = 'core:page:'
+
+
+def _version_key(model):
+    return MODEL_VERSION_PREFIX + model._meta.label_lower
+
+
+def get_model_versions(models):
+    """Return the current content version of each model, seeding missing ones"""
+    keys = [_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # Clock-seeded for the same reason as the SiteSettings version
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_model_version(model):
+    """Invalidate every cached page that was rendered from ``model``; returns the new version"""
+    key = _version_key(model)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = time.time_ns()
+        cache.set(key, version, timeout=None)
+        return version
+
+
+def _page_cache_key(request, query_params, versions):
+    query = '&'.join(
+        f'{name}={value}'
+        for name in query_params
+        for value in request.GET.getlist(name)
+    )
+    raw = '|'.join([request.path, query] + [str(v) for v in versions])
+    return PAGE_CACHE_PREFIX + hashlib.md5(raw.encode()).hexdigest()
+
+
+def anonymous_page_cache(*models, query_params=(), timeout=60 * 60):
+    """Cache the full response of a content page for anonymous visitors.
+
+    The cache key is built from the path, the values of ``query_params`` and the
+    content version of ``models`` (plus SiteSettings, which every page renders),
+    so saving any of those models makes the old entries unreachable.
+    Logged-in users, non-GET requests and requests with pending messages always
+    get a freshly rendered page.
+    """
+    models = (SiteSettings,) + models
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            if (request.method not in ('GET', 'HEAD')
+                    or request.user.is_authenticated
+                    or len(get_messages(request))):
+                return view_func(request, *args, **kwargs)
+
+            key = _page_cache_key(request, query_params, get_model_versions(models))
+            response = cache.get(key)
+            if response is not None:
+                return response
+
+            response = view_func(request, *args, **kwargs)
+            # Pages that emitted a CSRF token are tied to the visitor's cookie
+            # and must never be shared.
+            if (response.status_code == 200
+                    and not response.streaming
+                    and not response.cookies
+                    and not request.META.get('CSRF_COOKIE_NEEDS_UPDATE')):
+                if hasattr(response, 'render') and callable(response.render):
+                    response.render()
+                cache.set(key, response, timeout)
+            return response
+        return _wrapped_view
+    return decorator
@@ -0,0 +1,162 @@
+import threading
+
+from django.core.cache import cache
+
+from .cache import get_model_versions
+
+# ============================================================================
+# MENU CATALOG SNAPSHOTS
+# ============================================================================
+#
+# Each menu (core's catering menu and the restaurant's) is served from one
+# prebuilt structure: active categories in display order, each with its
+# available items already reduced to plain, JSON-ready values. A snapshot is
+# built once per content version of its models, stored in the shared cache,
+# and kept in process memory until the version moves on, so a page view
+# costs a version lookup and an in-memory filter. Treat snapshots as
+# read-only; filter_catalog() returns new dicts.
+
+CATALOG_PREFIX = 'core:catalog:'
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+def _image_url(image):
+    return image.url if image else None
+
+
+def _core_models():
+    from .models import MenuCategory, MenuItem
+    return [MenuCategory, MenuItem]
+
+
+def _build_core_menu():
+    from .models import MenuCategory, MenuItem
+
+    categories = {
+        category.id: {
+            'id': category.id,
+            'name': category.name,
+            'description': category.description,
+            'icon': category.icon,
+            'items': [],
+        }
+        for category in MenuCategory.objects.filter(is_active=True)
+    }
+    items = MenuItem.objects.filter(is_available=True, category_id__in=list(categories))
+    for item in items.order_by('order', 'name'):
+        categories[item.category_id]['items'].append({
+            'id': item.id,
+            'name': item.name,
+            'description': item.description,
+            'price': str(item.price),
+            'image': _image_url(item.image),
+            'vegetarian': item.is_vegetarian,
+            'spicy': item.is_spicy,
+            'popular': item.is_popular,
+        })
+    return list(categories.values())
+
+
+def _restaurant_models():
+    from restaurant.models import Category, MenuItem
+    return [Category, MenuItem]
+
+
+def _build_restaurant_menu():
+    from restaurant.models import Category, MenuItem
+
+    categories = {
+        category.id: {
+            'id': category.id,
+            'name': category.name,
+            'description': category.description,
+            'image': _image_url(category.image),
+            'items': [],
+        }
+        for category in Category.objects.filter(is_active=True).order_by('name')
+    }
+    items = MenuItem.objects.filter(is_available=True, category_id__in=list(categories))
+    for item in items.order_by('name'):
+        categories[item.category_id]['items'].append({
+            'id': item.id,
+            'name': item.name,
+            'description': item.description,
+            'price': str(item.price),
+            'image': _image_url(item.image),
+            'food_type': item.food_type,
+            'vegetarian': item.food_type == 'veg',
+            'spicy': item.is_spicy,
+            'popular': item.is_popular,
+            'preparation_time': item.preparation_time,
+        })
+    return list(categories.values())
+
+
+# name -> (models whose changes rebuild it, builder)
+CATALOGS = {
+    'core': (_core_models, _build_core_menu),
+    'restaurant': (_restaurant_models, _build_restaurant_menu),
+}
+
+
+def get_menu_catalog(name):
+    """Current snapshot of a menu: {'version': ..., 'categories': [...]}"""
+    models, build = CATALOGS[name]
+    version = '.'.join(str(v) for v in get_model_versions(models()))
+
+    with _catalogs_lock:
+        cached = _catalogs.get(name)
+    if cached is not None and cached['version'] == version:
+        return cached
+
+    key = f'{CATALOG_PREFIX}{name}:{version}'
+    catalog = cache.get(key)
+    if catalog is None:
+        catalog = {'version': version, 'categories': build()}
+        cache.set(key, catalog, timeout=24 * 60 * 60)
+    with _catalogs_lock:
+        _catalogs[name] = catalog
+    return catalog
+
+
+def filter_catalog(catalog, category=None, vegetarian=False, spicy=False, item_ids=None):
+    """Narrow a snapshot in memory; categories left without items are dropped.
+
+    ``item_ids``, if given, keeps only those items, in the given order (e.g.
+    search rank) within each category.
+    """
+    rank = None
+    if item_ids is not None:
+        rank = {item_id: position for position, item_id in enumerate(item_ids)}
+
+    categories = []
+    for entry in catalog['categories']:
+        if category is not None and str(entry['id']) != str(category):
+            continue
+        items = [
+            item for item in entry['items']
+            if (not vegetarian or item['vegetarian'])
+            and (not spicy or item['spicy'])
+            and (rank is None or item['id'] in rank)
+        ]
+        if rank is not None:
+            items.sort(key=lambda item: rank[item['id']])
+        if items:
+            categories.append({**entry, 'items': items})
+    return {'version': catalog['version'], 'categories': categories}
+
+
+def request_filters(request):
+    """filter_catalog() arguments from a request's query string"""
+    return {
+        'category': request.GET.get('category') or None,
+        'vegetarian': bool(request.GET.get('vegetarian')),
+        'spicy': bool(request.GET.get('spicy')),
+    }
+
+
+def catalog_items(catalog):
+    """All items of a (filtered) snapshot as one flat list"""
+    return [item for entry in catalog['categories'] for item in entry['items']]
@@ -0,0 +1,6 @@
+from .cache import get_site_settings
+
+
+def site_settings(request):
+    """Expose the cached SiteSettings row to every template as ``site_settings``"""
+    return {'site_settings': get_site_settings()}
@@ -0,0 +1,236 @@
+import fnmatch
+import json
+import logging
+import platform
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from django.utils import timezone
+
+from blog.models import BlogCategory, BlogPost as BlogArticle
+from bookings.models import Booking as HallBooking, Venue as Hall
+from core.models import BlogPost, Venue
+from gallery.models import GalleryCategory, GalleryImage, GalleryVideo
+from restaurant.models import Order
+from testimonials.models import Testimonial
+
+# Named URLs that must not be driven by the benchmark (the status stream
+# never ends)
+EXCLUDED_URLS = {'accounts:logout', 'core:status_stream'}
+EXCLUDED_NAMESPACES = {'admin'}
+
+# How to find a real value for each URL keyword argument. Lookups receive the
+# benchmark user (or None) so per-user objects belong to whoever is logged in.
+SAMPLE_KWARGS = {
+    'venue_slug': lambda user: Venue.objects.filter(is_active=True).values_list('slug', flat=True).first(),
+    'blog_slug': lambda user: BlogPost.objects.filter(is_published=True).values_list('slug', flat=True).first(),
+    'post_slug': lambda user: BlogArticle.objects.filter(is_published=True).values_list('slug', flat=True).first(),
+    'category_slug': lambda user: BlogCategory.objects.filter(is_active=True).values_list('slug', flat=True).first(),
+    'category_id': lambda user: GalleryCategory.objects.filter(is_active=True).values_list('id', flat=True).first(),
+    'image_id': lambda user: GalleryImage.objects.values_list('id', flat=True).first(),
+    'video_id': lambda user: GalleryVideo.objects.values_list('id', flat=True).first(),
+    'testimonial_id': lambda user: Testimonial.objects.filter(is_approved=True).values_list('id', flat=True).first(),
+    'booking_id': lambda user: user and HallBooking.objects.filter(user=user).values_list('id', flat=True).first(),
+    'order_id': lambda user: user and Order.objects.filter(user=user).values_list('id', flat=True).first(),
+    'venue_id': lambda user: Hall.objects.filter(is_available=True).values_list('id', flat=True).first(),
+    'year': lambda user: timezone.localdate().year,
+    'month': lambda user: timezone.localdate().month,
+}
+
+
+def iter_named_urls(patterns, namespace=None):
+    """Yield (view name, keyword argument names) for every named URL pattern"""
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            child = namespace
+            if pattern.namespace:
+                child = f'{namespace}:{pattern.namespace}' if namespace else pattern.namespace
+            yield from iter_named_urls(pattern.url_patterns, child)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            name = f'{namespace}:{pattern.name}' if namespace else pattern.name
+            yield name, list(pattern.pattern.converters)
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = 'Measure p50/p95/p99 latency, queries and response size for every named URL'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50, help='Measured requests per URL and mode')
+        parser.add_argument('--warmup', type=int, default=3, help='Unmeasured requests per URL and mode')
+        parser.add_argument('--concurrency', type=int, default=1, help='Worker threads issuing requests')
+        parser.add_argument('--views', nargs='*', default=['*'], help='Glob patterns of view names to run')
+        parser.add_argument(
+            '--mode', choices=['anon', 'auth', 'both'], default='both',
+            help='Benchmark anonymous visitors, a logged-in user, or both',
+        )
+        parser.add_argument('--username', help='User to log in as (default: first superuser or user)')
+        parser.add_argument('--output', help='Write results to this JSON file')
+        parser.add_argument('--compare', help='Baseline JSON file to compare against')
+        parser.add_argument(
+            '--threshold', type=float, default=0.20,
+            help='Allowed relative p95 regression when comparing (default: 0.20)',
+        )
+        parser.add_argument(
+            '--min-delta-ms', type=float, default=1.0,
+            help='Ignore p95 regressions smaller than this many milliseconds',
+        )
+
+    def handle(self, *args, **options):
+        self.options = options
+        if options['verbosity'] < 2:
+            # 500s are already flagged in the report; keep tracebacks out of it
+            for logger_name in ('django.request', 'core.query_profiler'):
+                logging.getLogger(logger_name).disabled = True
+        user = self._bench_user(options)
+        modes = ['anon', 'auth'] if options['mode'] == 'both' else [options['mode']]
+        if 'auth' in modes and user is None:
+            self.stderr.write(self.style.WARNING('No user found; skipping logged-in runs.'))
+            modes.remove('auth')
+
+        results = {}
+        for view_name, params in iter_named_urls(get_resolver().url_patterns):
+            if view_name in EXCLUDED_URLS or view_name.split(':')[0] in EXCLUDED_NAMESPACES:
+                continue
+            if not any(fnmatch.fnmatch(view_name, pattern) for pattern in options['views']):
+                continue
+            for mode in modes:
+                mode_user = user if mode == 'auth' else None
+                url = self._reverse(view_name, params, mode_user)
+                if url is None:
+                    self.stderr.write(f'  skip {view_name} [{mode}]: no sample data for {params}')
+                    continue
+                result = self._run(url, mode_user)
+                results[f'{view_name}|{mode}'] = result
+                self._print_row(view_name, mode, result)
+
+        report = {
+            'meta': {
+                'created': timezone.now().isoformat(),
+                'requests': options['requests'],
+                'concurrency': options['concurrency'],
+                'python': platform.python_version(),
+                'django': django.get_version(),
+            },
+            'results': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(report, output, indent=2, sort_keys=True)
+            self.stdout.write(f"Wrote {len(results)} results to {options['output']}")
+        if options['compare']:
+            self._compare(results, options)
+
+    def _bench_user(self, options):
+        if options['username']:
+            try:
+                return User.objects.get(username=options['username'])
+            except User.DoesNotExist:
+                raise CommandError(f"User {options['username']!r} does not exist")
+        return (User.objects.filter(is_superuser=True).order_by('pk').first()
+                or User.objects.order_by('pk').first())
+
+    def _reverse(self, view_name, params, user):
+        kwargs = {}
+        for param in params:
+            lookup = SAMPLE_KWARGS.get(param)
+            value = lookup(user) if lookup else None
+            if value is None:
+                return None
+            kwargs[param] = value
+        return reverse(view_name, kwargs=kwargs)
+
+    def _run(self, url, user):
+        local = threading.local()
+
+        def one_request(_):
+            if not hasattr(local, 'client'):
+                # Django's test client is not thread-safe; one per worker
+                local.client = Client(raise_request_exception=False, SERVER_NAME='localhost')
+                if user is not None:
+                    local.client.force_login(user)
+            counter = QueryCounter()
+            with connection.execute_wrapper(counter):
+                started = time.perf_counter()
+                response = local.client.get(url)
+                size = len(b''.join(response.streaming_content) if response.streaming else response.content)
+                elapsed = time.perf_counter() - started
+            return elapsed, counter.count, size, response.status_code
+
+        workers = self.options['concurrency']
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(one_request, range(self.options['warmup'] * workers)))
+            samples = list(pool.map(one_request, range(self.options['requests'])))
+
+        latencies = [elapsed * 1000 for elapsed, _, _, _ in samples]
+        statuses = [status for _, _, _, status in samples]
+        return {
+            'url': url,
+            # The worst status seen, so one failed sample among many still shows
+            'status': max(statuses, key=lambda status: (not 200 <= status < 300, status)),
+            'non_2xx': sum(1 for status in statuses if not 200 <= status < 300),
+            'p50_ms': round(percentile(latencies, 50), 3),
+            'p95_ms': round(percentile(latencies, 95), 3),
+            'p99_ms': round(percentile(latencies, 99), 3),
+            'mean_ms': round(statistics.fmean(latencies), 3),
+            'queries': round(statistics.fmean(queries for _, queries, _, _ in samples), 2),
+            'bytes': round(statistics.fmean(size for _, _, size, _ in samples)),
+        }
+
+    def _print_row(self, view_name, mode, result):
+        row = (
+            f"{view_name:<36} {mode:<5} {result['status']:>3} "
+            f"p50 {result['p50_ms']:>8.2f}ms  p95 {result['p95_ms']:>8.2f}ms  p99 {result['p99_ms']:>8.2f}ms  "
+            f"{result['queries']:>6.1f} q  {result['bytes']:>8} B"
+        )
+        if result['non_2xx']:
+            row += f"  {result['non_2xx']}/{self.options['requests']} non-2xx"
+        if result['status'] >= 500:
+            row = self.style.ERROR(row)
+        elif result['non_2xx']:
+            row = self.style.WARNING(row)
+        self.stdout.write(row)
+
+    def _compare(self, results, options):
+        with open(options['compare'], encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)['results']
+
+        regressions = []
+        for key, result in results.items():
+            before = baseline.get(key)
+            if before is None:
+                continue
+            delta = result['p95_ms'] - before['p95_ms']
+            if delta > options['min_delta_ms'] and delta > before['p95_ms'] * options['threshold']:
+                regressions.append(f"{key}: p95 {before['p95_ms']:.2f}ms -> {result['p95_ms']:.2f}ms")
+            if result['queries'] > before['queries']:
+                regressions.append(f"{key}: queries {before['queries']} -> {result['queries']}")
+            if result['non_2xx'] and result['status'] != before['status']:
+                regressions.append(f"{key}: status {before['status']} -> {result['status']} "
+                                   f"({result['non_2xx']} non-2xx samples)")
+
+        if regressions:
+            raise CommandError('Performance regressions:\n  ' + '\n  '.join(regressions))
+        self.stdout.write(self.style.SUCCESS(f'No regressions against {options["compare"]}'))
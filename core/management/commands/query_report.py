@@ -0,0 +1,74 @@
+import json
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.middleware import get_query_budget
+
+
+class Command(BaseCommand):
+    help = 'Rank views by database queries recorded by QueryProfilerMiddleware'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sort', choices=['total', 'avg', 'max', 'db_time'], default='avg',
+            help='Column used to rank views (default: avg queries per request)',
+        )
+        parser.add_argument('--limit', type=int, default=25, help='Number of views to show')
+        parser.add_argument('--clear', action='store_true', help='Empty the profile log after reporting')
+        parser.add_argument(
+            '--fail-over-budget', action='store_true',
+            help='Exit with an error if any view exceeded its query budget',
+        )
+
+    def handle(self, *args, **options):
+        log_path = Path(settings.QUERY_PROFILE_LOG)
+        if not log_path.exists():
+            raise CommandError(f'No query profile found at {log_path}. Is QUERY_PROFILER_ENABLED on?')
+
+        stats = defaultdict(lambda: {
+            'requests': 0, 'total': 0, 'max': 0, 'db_time': 0.0, 'duplicates': Counter(),
+        })
+        with open(log_path, encoding='utf-8') as log:
+            for line in log:
+                record = json.loads(line)
+                view = stats[record['view']]
+                view['requests'] += 1
+                view['total'] += record['queries']
+                view['max'] = max(view['max'], record['queries'])
+                view['db_time'] += record['db_time']
+                view['duplicates'].update(record['duplicates'])
+
+        if not stats:
+            self.stdout.write('Query profile is empty.')
+            return
+
+        for view in stats.values():
+            view['avg'] = view['total'] / view['requests']
+
+        ranked = sorted(stats.items(), key=lambda item: item[1][options['sort']], reverse=True)
+        over_budget = []
+
+        self.stdout.write(
+            f"{'view':<40} {'reqs':>6} {'avg':>7} {'max':>5} {'budget':>6} {'db ms/req':>10}"
+        )
+        for name, view in ranked[:options['limit']]:
+            budget = get_query_budget(name)
+            row = (
+                f"{name:<40} {view['requests']:>6} {view['avg']:>7.1f} {view['max']:>5} "
+                f"{budget:>6} {view['db_time'] * 1000 / view['requests']:>10.2f}"
+            )
+            if view['max'] > budget:
+                over_budget.append(name)
+                row = self.style.ERROR(row)
+            self.stdout.write(row)
+            for sql, count in view['duplicates'].most_common(3):
+                self.stdout.write(self.style.WARNING(f'    N+1 suspect ({count}x): {sql[:150]}'))
+
+        if options['clear']:
+            log_path.unlink()
+
+        if over_budget and options['fail_over_budget']:
+            raise CommandError(f"Views over query budget: {', '.join(over_budget)}")
@@ -0,0 +1,28 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.rollups import refresh_rollups
+
+
+class Command(BaseCommand):
+    help = 'Fold changed bookings, payments and orders into the daily reporting rollups'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backfill', action='store_true', help='Rebuild every day from scratch')
+        parser.add_argument(
+            '--since', metavar='YYYY-MM-DD',
+            help='Rebuild this day and every later one (after bulk deletes or imports)',
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = date.fromisoformat(options['since'])
+            except ValueError:
+                raise CommandError('--since takes a date as YYYY-MM-DD')
+
+        written = refresh_rollups(full=options['backfill'], since=since)
+        for source, rows in written.items():
+            self.stdout.write(f'{source:<16} {rows:>8} rollup rows written')
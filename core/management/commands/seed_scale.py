@@ -0,0 +1,398 @@
+import random
+import time
+from datetime import date, datetime, time as dtime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from accounts.models import UserProfile
+from blog.models import BlogCategory, BlogPost as BlogArticle
+from bookings.models import Venue as BookingVenue, Booking as HallBooking, TableBooking
+from bookings.tables import table_rules
+from core.models import (
+    Venue, VenuePhoto, Booking, MenuCategory, MenuItem as CoreMenuItem,
+    Testimonial, Gallery, BlogPost,
+)
+from payments.models import Payment
+from restaurant.models import Category, MenuItem, Order, OrderItem, Table
+
+# Row counts per profile. Large is the "millions of rows" dataset the
+# benchmarks are meant to run against; small is quick enough for local work.
+PROFILES = {
+    'small': {
+        'users': 200, 'venues': 20, 'venue_photos': 200, 'core_bookings': 2_000,
+        'hall_bookings': 2_000, 'table_bookings': 1_000, 'tables': 30,
+        'menu_categories': 8, 'menu_items': 200, 'orders': 5_000,
+        'gallery': 500, 'blog_posts': 200, 'testimonials': 200,
+    },
+    'medium': {
+        'users': 5_000, 'venues': 200, 'venue_photos': 5_000, 'core_bookings': 100_000,
+        'hall_bookings': 100_000, 'table_bookings': 50_000, 'tables': 60,
+        'menu_categories': 12, 'menu_items': 1_000, 'orders': 200_000,
+        'gallery': 10_000, 'blog_posts': 5_000, 'testimonials': 5_000,
+    },
+    'large': {
+        'users': 50_000, 'venues': 2_000, 'venue_photos': 50_000, 'core_bookings': 1_000_000,
+        'hall_bookings': 1_000_000, 'table_bookings': 500_000, 'tables': 120,
+        'menu_categories': 16, 'menu_items': 5_000, 'orders': 1_000_000,
+        'gallery': 100_000, 'blog_posts': 50_000, 'testimonials': 50_000,
+    },
+}
+
+# Fixed epoch so the same seed always produces the same dataset
+EPOCH = date(2024, 1, 1)
+DATE_SPAN_DAYS = 3 * 365
+START_TIMES = [dtime(10, 0), dtime(12, 0), dtime(16, 0), dtime(18, 0), dtime(19, 30)]
+TABLE_TIMES = [dtime(h, m) for h in range(12, 23) for m in (0, 30)]
+
+
+class Command(BaseCommand):
+    help = 'Generate a large, reproducible dataset across all apps for performance testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profile', choices=PROFILES, default='small', help='Dataset size')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed (same seed, same data)')
+        parser.add_argument('--batch-size', type=int, default=5_000, help='Rows per INSERT')
+        parser.add_argument(
+            '--flush', action='store_true',
+            help='Flush the whole database before seeding',
+        )
+
+    def handle(self, *args, **options):
+        self.counts = PROFILES[options['profile']]
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self._zipf_weights = {}
+
+        if options['flush']:
+            call_command('flush', interactive=False, verbosity=0)
+        elif User.objects.exists() or Venue.objects.exists():
+            raise CommandError('Database already contains data; rerun with --flush to replace it.')
+
+        started = time.perf_counter()
+        self.users = self._step('users', self.seed_users)
+        self.venues = self._step('core venues', self.seed_core_venues)
+        self._step('core content', self.seed_core_content)
+        self._step('core bookings', self.seed_core_bookings)
+        self.hall_venues = self._step('bookings venues', self.seed_hall_venues)
+        self._step('hall bookings + payments', self.seed_hall_bookings)
+        self._step('table bookings', self.seed_table_bookings)
+        self.menu_items = self._step('restaurant menu', self.seed_restaurant_menu)
+        self._step('orders + items + payments', self.seed_orders)
+        self._step('blog', self.seed_blog)
+
+        # bulk_create bypasses the signals that keep page caches fresh
+        cache.clear()
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded profile '{options['profile']}' in {time.perf_counter() - started:.1f}s"
+        ))
+
+    # ------------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------------
+
+    def _step(self, label, func):
+        started = time.perf_counter()
+        with transaction.atomic():
+            result = func()
+        self.stdout.write(f'  {label:<28} {time.perf_counter() - started:>7.1f}s')
+        return result
+
+    def _bulk(self, model, objs):
+        """Insert ``objs`` in batches and return the saved instances"""
+        created = []
+        batch = []
+        for obj in objs:
+            batch.append(obj)
+            if len(batch) >= self.batch_size:
+                created.extend(model.objects.bulk_create(batch, batch_size=self.batch_size))
+                batch = []
+        if batch:
+            created.extend(model.objects.bulk_create(batch, batch_size=self.batch_size))
+        return created
+
+    def _skewed(self, population, k):
+        """Pick ``k`` items where earlier items are much more popular (Zipf-like)"""
+        size = len(population)
+        if size not in self._zipf_weights:
+            self._zipf_weights[size] = list(accumulate(1 / (rank + 1) for rank in range(size)))
+        return self.rng.choices(population, cum_weights=self._zipf_weights[size], k=k)
+
+    def _date(self):
+        return EPOCH + timedelta(days=self.rng.randrange(DATE_SPAN_DAYS))
+
+    def _datetime(self):
+        moment = datetime.combine(self._date(), dtime(self.rng.randrange(24), self.rng.randrange(60)))
+        return moment.replace(tzinfo=dt_timezone.utc)
+
+    def _slot(self):
+        start = self.rng.choice(START_TIMES)
+        end_hour = min(start.hour + self.rng.randint(3, 6), 23)
+        return start, dtime(end_hour, start.minute)
+
+    def _chunks(self, total):
+        for offset in range(0, total, self.batch_size):
+            yield offset, min(self.batch_size, total - offset)
+
+    # ------------------------------------------------------------------------
+    # Seeders
+    # ------------------------------------------------------------------------
+
+    def seed_users(self):
+        password = make_password('password')
+        users = self._bulk(User, (
+            User(username=f'user{i:07d}', email=f'user{i:07d}@example.com', password=password)
+            for i in range(self.counts['users'])
+        ))
+        # bulk_create skips the post_save signal that creates profiles
+        self._bulk(UserProfile, (
+            UserProfile(user=user, phone_number=f'98{self.rng.randrange(10**8):08d}')
+            for user in users
+        ))
+        return [user.pk for user in users]
+
+    def seed_core_venues(self):
+        venue_types = [choice for choice, _ in Venue.VENUE_TYPES]
+        venues = self._bulk(Venue, (
+            Venue(
+                name=f'Venue {i}', slug=f'venue-{i}', venue_type=self.rng.choice(venue_types),
+                description='Seeded venue', capacity=str(self.rng.choice([100, 250, 500, 1000, 2000])),
+                price=Decimal(self.rng.randrange(50_000, 500_000, 1_000)),
+                price_per_hour=Decimal(self.rng.randrange(5_000, 50_000, 500)),
+                features='AC, Parking, Stage', is_featured=self.rng.random() < 0.1,
+            )
+            for i in range(self.counts['venues'])
+        ))
+        venue_ids = [venue.pk for venue in venues]
+        self._bulk(VenuePhoto, (
+            VenuePhoto(
+                venue_id=venue_id, image=f'venue_photos/seed-{i}.jpg',
+                caption=f'Photo {i}', is_primary=i < len(venue_ids), order=i % 20,
+            )
+            for i, venue_id in enumerate(
+                venue_ids + self._skewed(venue_ids, self.counts['venue_photos'] - len(venue_ids))
+            )
+        ))
+        return venue_ids
+
+    def seed_core_content(self):
+        rng = self.rng
+        categories = ['wedding', 'reception', 'birthday', 'corporate', 'decor']
+        self._bulk(Gallery, (
+            Gallery(
+                title=f'Gallery {i}', image=f'gallery/seed-{i}.jpg', category=rng.choice(categories),
+                event_type=rng.choice(categories), venue_id=rng.choice(self.venues),
+                is_featured=rng.random() < 0.05, order=rng.randrange(100),
+            )
+            for i in range(self.counts['gallery'])
+        ))
+        self._bulk(Testimonial, (
+            Testimonial(
+                author_name=f'Guest {i}', content='Wonderful event.', rating=rng.choices(
+                    [5, 4, 3, 2, 1], weights=[50, 30, 12, 5, 3])[0],
+                venue_id=rng.choice(self.venues), is_featured=rng.random() < 0.05,
+                order=rng.randrange(100),
+            )
+            for i in range(self.counts['testimonials'])
+        ))
+        authors = self.users[:50]
+        self._bulk(BlogPost, (
+            BlogPost(
+                title=f'Post {i}', slug=f'post-{i}', content='Seeded content. ' * 20,
+                excerpt='Seeded excerpt', author_id=rng.choice(authors),
+                category=rng.choice(categories), tags='wedding,planning',
+                is_published=rng.random() < 0.9, published_at=self._datetime(),
+            )
+            for i in range(self.counts['blog_posts'])
+        ))
+        menu_categories = self._bulk(MenuCategory, (
+            MenuCategory(name=f'Category {i}', order=i)
+            for i in range(self.counts['menu_categories'])
+        ))
+        self._bulk(CoreMenuItem, (
+            CoreMenuItem(
+                name=f'Dish {i}', category=rng.choice(menu_categories), description='Seeded dish',
+                price=Decimal(rng.randrange(80, 1_500, 10)), is_vegetarian=rng.random() < 0.5,
+                is_spicy=rng.random() < 0.3, is_popular=rng.random() < 0.1, order=i % 50,
+            )
+            for i in range(self.counts['menu_items'])
+        ))
+
+    def seed_core_bookings(self):
+        statuses = [choice for choice, _ in Booking.STATUS_CHOICES]
+        venues = self._skewed(self.venues, self.counts['core_bookings'])
+        users = self.rng.choices(self.users, k=self.counts['core_bookings'])
+
+        def rows():
+            for venue_id, user_id in zip(venues, users):
+                start, end = self._slot()
+                yield Booking(
+                    user_id=user_id, venue_id=venue_id, event_type='Wedding',
+                    event_date=self._date(), start_time=start, end_time=end,
+                    guest_count=self.rng.randrange(50, 1_500),
+                    total_amount=Decimal(self.rng.randrange(50_000, 800_000, 1_000)),
+                    status=self.rng.choices(statuses, weights=[15, 60, 10, 15])[0],
+                )
+        self._bulk(Booking, rows())
+
+    def seed_hall_venues(self):
+        venue_types = [choice for choice, _ in BookingVenue.VENUE_TYPES]
+        venues = self._bulk(BookingVenue, (
+            BookingVenue(
+                name=f'Hall {i}', venue_type=self.rng.choice(venue_types),
+                capacity=self.rng.choice([100, 250, 500, 1000]), description='Seeded hall',
+                price_per_day=Decimal(self.rng.randrange(50_000, 500_000, 1_000)),
+                amenities='AC, Parking',
+            )
+            for i in range(max(self.counts['venues'] // 4, 5))
+        ))
+        return [venue.pk for venue in venues]
+
+    def seed_hall_bookings(self):
+        rng = self.rng
+        statuses = [choice for choice, _ in HallBooking.STATUS_CHOICES]
+        event_types = [choice for choice, _ in HallBooking.EVENT_TYPES]
+        methods = [choice for choice, _ in Payment.PAYMENT_METHODS]
+
+        # Bookings and their payments are generated chunk by chunk so that the
+        # payment FKs can use the primary keys returned by each insert.
+        for _, size in self._chunks(self.counts['hall_bookings']):
+            batch = []
+            for venue_id in self._skewed(self.hall_venues, size):
+                start, end = self._slot()
+                total = Decimal(rng.randrange(50_000, 800_000, 1_000))
+                batch.append(HallBooking(
+                    user_id=rng.choice(self.users), venue_id=venue_id,
+                    event_type=rng.choice(event_types), event_date=self._date(),
+                    start_time=start, end_time=end, number_of_guests=rng.randrange(50, 1_500),
+                    status=rng.choices(statuses, weights=[15, 60, 5, 10, 10])[0],
+                    total_amount=total, advance_payment=(total * Decimal('0.25')).quantize(Decimal('1')),
+                ))
+            bookings = HallBooking.objects.bulk_create(batch)
+            Payment.objects.bulk_create([
+                Payment(
+                    user_id=booking.user_id, booking=booking, amount=booking.advance_payment,
+                    payment_method=rng.choice(methods), transaction_id=f'SEEDB{booking.pk:010d}',
+                    status=rng.choices(['completed', 'pending', 'failed'], weights=[85, 10, 5])[0],
+                )
+                for booking in bookings if booking.status != 'rejected'
+            ])
+
+    def seed_table_bookings(self):
+        tables = self._bulk(Table, (
+            Table(
+                table_number=i + 1, capacity=self.rng.choice([2, 4, 4, 6, 8]),
+                location=self.rng.choice(['Ground Floor', 'First Floor', 'Outdoor']),
+            )
+            for i in range(self.counts['tables'])
+        ))
+        by_location = {}
+        for table in tables:
+            by_location.setdefault(table.location, []).append(table)
+
+        max_combined = table_rules()['MAX_COMBINED_TABLES']
+
+        def seating(guests):
+            """A run of neighbouring tables in one location, as the allocator seats a party"""
+            first = self.rng.choice(tables)
+            room = by_location[first.location]
+            start = room.index(first)
+            picked = []
+            for table in room[start:start + max_combined]:
+                picked.append(table)
+                if sum(t.capacity for t in picked) >= guests:
+                    break
+            return picked
+
+        Seat = TableBooking.tables.through
+        for _, size in self._chunks(self.counts['table_bookings']):
+            batch, seated = [], []
+            for _ in range(size):
+                guests = self.rng.randint(1, 10)
+                picked = seating(guests)
+                # A party too big for the run sits as many as fit
+                guests = min(guests, sum(table.capacity for table in picked))
+                seated.append(picked)
+                batch.append(TableBooking(
+                    user_id=self.rng.choice(self.users), table_number=picked[0].table_number,
+                    booking_date=self._date(), booking_time=self.rng.choice(TABLE_TIMES),
+                    number_of_guests=guests,
+                    status=self.rng.choices(['confirmed', 'pending', 'cancelled'], weights=[70, 20, 10])[0],
+                ))
+            bookings = TableBooking.objects.bulk_create(batch)
+            Seat.objects.bulk_create([
+                Seat(tablebooking_id=booking.pk, table_id=table.pk)
+                for booking, picked in zip(bookings, seated)
+                for table in picked
+            ], batch_size=self.batch_size)
+
+    def seed_restaurant_menu(self):
+        food_types = [choice for choice, _ in MenuItem.CATEGORY_CHOICES]
+        categories = self._bulk(Category, (
+            Category(name=f'Category {i}') for i in range(self.counts['menu_categories'])
+        ))
+        items = self._bulk(MenuItem, (
+            MenuItem(
+                name=f'Dish {i}', description='Seeded dish', price=Decimal(self.rng.randrange(80, 1_500, 10)),
+                category=self.rng.choice(categories), food_type=self.rng.choice(food_types),
+                is_spicy=self.rng.random() < 0.3, is_popular=self.rng.random() < 0.1,
+                preparation_time=self.rng.choice([5, 10, 15, 20, 30, 45]),
+            )
+            for i in range(self.counts['menu_items'])
+        ))
+        return [(item.pk, item.price) for item in items]
+
+    def seed_orders(self):
+        rng = self.rng
+        statuses = [choice for choice, _ in Order.STATUS_CHOICES]
+        delivery_types = [choice for choice, _ in Order.DELIVERY_CHOICES]
+        methods = [choice for choice, _ in Payment.PAYMENT_METHODS]
+
+        for offset, size in self._chunks(self.counts['orders']):
+            lines = []
+            orders = []
+            for n in range(offset, offset + size):
+                picked = self._skewed(self.menu_items, rng.randint(1, 5))
+                quantities = [rng.randint(1, 4) for _ in picked]
+                lines.append(list(zip(picked, quantities)))
+                orders.append(Order(
+                    user_id=rng.choice(self.users), order_number=f'SEED{n:010d}',
+                    total_amount=sum(price * qty for (_, price), qty in zip(picked, quantities)),
+                    delivery_type=rng.choice(delivery_types), phone_number='9800000000',
+                    status=rng.choices(statuses, weights=[5, 5, 5, 5, 70, 10])[0],
+                ))
+            orders = Order.objects.bulk_create(orders)
+            OrderItem.objects.bulk_create([
+                OrderItem(order=order, menu_item_id=item_id, quantity=qty, price=price)
+                for order, order_lines in zip(orders, lines)
+                for (item_id, price), qty in order_lines
+            ], batch_size=self.batch_size)
+            Payment.objects.bulk_create([
+                Payment(
+                    user_id=order.user_id, order=order, amount=order.total_amount,
+                    payment_method=rng.choice(methods), transaction_id=f'SEEDO{order.pk:010d}',
+                    status='refunded' if order.status == 'cancelled' else 'completed',
+                )
+                for order in orders if rng.random() < 0.8
+            ])
+
+    def seed_blog(self):
+        categories = self._bulk(BlogCategory, (
+            BlogCategory(name=f'Topic {i}', slug=f'topic-{i}') for i in range(10)
+        ))
+        authors = self.users[:50]
+        self._bulk(BlogArticle, (
+            BlogArticle(
+                title=f'Article {i}', slug=f'article-{i}', author_id=self.rng.choice(authors),
+                category=self.rng.choice(categories), content='Seeded article. ' * 30,
+                excerpt='Seeded excerpt', tags='wedding,decor', is_published=self.rng.random() < 0.9,
+                views=self.rng.randrange(10_000), published_at=self._datetime(),
+            )
+            for i in range(self.counts['blog_posts'])
+        ))
@@ -0,0 +1,126 @@
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, DecimalField, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+# ============================================================================
+# ADMIN OPERATIONAL METRICS
+# ============================================================================
+#
+# The admin landing page shows today's events, what is waiting for approval,
+# the kitchen's open orders and this month's takings. They come from a few
+# conditional aggregates (one query per table, each narrowed by an index)
+# computed at most once per ADMIN_METRICS_TTL seconds, and dropped sooner
+# by signals whenever a booking, order, payment or event changes. The cache
+# key includes the date, so the numbers never outlive the day they are for.
+
+METRICS_PREFIX = 'core:admin:metrics:'
+
+UPCOMING_DAYS = 7
+SCHEDULE_LIMIT = 20
+
+
+def _ttl():
+    return getattr(settings, 'ADMIN_METRICS_TTL', 60)
+
+
+def _key(day):
+    return f'{METRICS_PREFIX}{day.isoformat()}'
+
+
+def _booking_counts(model, today):
+    """Today's, upcoming and pending bookings of one booking model"""
+    soon = today + timedelta(days=UPCOMING_DAYS)
+    active = Q(status__in=model.ACTIVE_STATUSES)
+    return model.objects.filter(Q(event_date__range=(today, soon)) | Q(status='pending')).aggregate(
+        today=Count('id', filter=active & Q(event_date=today)),
+        upcoming=Count('id', filter=active & Q(event_date__gt=today, event_date__lte=soon)),
+        pending=Count('id', filter=Q(status='pending')),
+    )
+
+
+def _schedule(today):
+    """Everything happening today, in time order"""
+    from bookings.models import Booking as HallBooking
+    from .models import Booking, Event
+
+    entries = [
+        {'time': booking.start_time, 'title': booking.get_event_type_display(),
+         'venue': booking.venue.name, 'status': booking.get_status_display()}
+        for booking in HallBooking.objects.filter(event_date=today, status__in=HallBooking.ACTIVE_STATUSES)
+        .select_related('venue')[:SCHEDULE_LIMIT]
+    ]
+    entries += [
+        {'time': booking.start_time, 'title': booking.event_type,
+         'venue': booking.venue.name, 'status': booking.get_status_display()}
+        for booking in Booking.objects.filter(event_date=today, status__in=Booking.ACTIVE_STATUSES)
+        .select_related('venue')[:SCHEDULE_LIMIT]
+    ]
+    entries += [
+        {'time': event.event_time, 'title': event.title,
+         'venue': event.venue.name if event.venue else '', 'status': 'Event'}
+        for event in Event.objects.filter(is_active=True, event_date=today)
+        .select_related('venue')[:SCHEDULE_LIMIT]
+    ]
+    entries.sort(key=lambda entry: entry['time'])
+    return entries[:SCHEDULE_LIMIT]
+
+
+def _compute(today):
+    from bookings.models import Booking as HallBooking, TableBooking
+    from payments.models import Payment
+    from restaurant.models import Order
+    from .models import Booking
+
+    halls = _booking_counts(HallBooking, today)
+    venues = _booking_counts(Booking, today)
+    tables = TableBooking.objects.filter(Q(booking_date=today) | Q(status='pending')).aggregate(
+        today=Count('id', filter=Q(booking_date=today, status__in=TableBooking.ACTIVE_STATUSES)),
+        pending=Count('id', filter=Q(status='pending')),
+    )
+    orders = Order.objects.filter(status__in=['pending', 'confirmed', 'preparing']).aggregate(
+        pending=Count('id', filter=Q(status='pending')),
+        open=Count('id', filter=Q(status__in=['confirmed', 'preparing'])),
+    )
+    month_start = timezone.make_aware(datetime.combine(today.replace(day=1), time.min))
+    revenue = Payment.objects.filter(status='completed', payment_date__gte=month_start).aggregate(
+        total=Coalesce(Sum('amount'), Value(0), output_field=DecimalField(max_digits=14, decimal_places=2)),
+        count=Count('id'),
+    )
+    schedule = _schedule(today)
+
+    return {
+        'today': today,
+        'schedule': schedule,
+        'events_today': halls['today'] + venues['today'] + sum(1 for entry in schedule if entry['status'] == 'Event'),
+        'tables_today': tables['today'],
+        'upcoming': halls['upcoming'] + venues['upcoming'],
+        'upcoming_days': UPCOMING_DAYS,
+        'pending_halls': halls['pending'],
+        'pending_venues': venues['pending'],
+        'pending_tables': tables['pending'],
+        'pending_total': halls['pending'] + venues['pending'] + tables['pending'],
+        'orders_pending': orders['pending'],
+        'orders_open': orders['open'],
+        'revenue_month': revenue['total'],
+        'payments_month': revenue['count'],
+        'generated_at': timezone.now(),
+    }
+
+
+def operational_metrics():
+    """Admin landing page figures, from cache when fresh"""
+    today = timezone.localdate()
+    metrics = cache.get(_key(today))
+    if metrics is None:
+        metrics = _compute(today)
+        cache.set(_key(today), metrics, _ttl())
+    return metrics
+
+
+def invalidate_operational_metrics():
+    """Recompute the figures on the next admin index view"""
+    cache.delete(_key(timezone.localdate()))
@@ -0,0 +1,107 @@
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+logger = logging.getLogger('core.query_profiler')
+
+_IN_LIST = re.compile(r'IN \((%s(, )?)+\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """Normalize SQL so queries differing only in parameters compare equal"""
+    sql = _WHITESPACE.sub(' ', sql).strip()
+    return _IN_LIST.sub('IN (...)', sql)
+
+
+def get_query_budget(view_name):
+    """Return the maximum number of queries allowed for ``view_name``"""
+    budgets = getattr(settings, 'QUERY_BUDGETS', {})
+    return budgets.get(view_name, getattr(settings, 'QUERY_BUDGET_DEFAULT', 20))
+
+
+class QueryRecorder:
+    """Database execute wrapper collecting SQL fingerprints and timings"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+
+class QueryProfilerMiddleware:
+    """Record query count, DB time and repeated SQL per URL name.
+
+    Development/staging only: enabled with ``QUERY_PROFILER_ENABLED``. Each
+    request is appended as a JSON line to ``QUERY_PROFILE_LOG`` for the
+    ``query_report`` management command. Any statement executed at least
+    ``QUERY_PROFILER_N1_THRESHOLD`` times in one request is flagged as an N+1
+    suspect, and requests over their ``QUERY_BUDGETS`` entry are logged.
+    """
+
+    _write_lock = threading.Lock()
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_PROFILER_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.log_path = settings.QUERY_PROFILE_LOG
+        self.n1_threshold = getattr(settings, 'QUERY_PROFILER_N1_THRESHOLD', 3)
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            response = self.get_response(request)
+
+        match = request.resolver_match
+        view_name = match.view_name if match else request.path
+        suspects = {
+            sql: count for sql, count in recorder.fingerprints.items()
+            if count >= self.n1_threshold
+        }
+        budget = get_query_budget(view_name)
+
+        if suspects:
+            logger.warning(
+                'N+1 suspect in %s: %s',
+                view_name,
+                '; '.join(f'{count}x {sql[:120]}' for sql, count in suspects.items()),
+            )
+        if recorder.count > budget:
+            logger.warning('%s issued %d queries (budget %d)', view_name, recorder.count, budget)
+
+        response['X-Query-Count'] = str(recorder.count)
+        response['X-Query-Time'] = f'{recorder.duration * 1000:.1f}ms'
+
+        self._write({
+            'view': view_name,
+            'path': request.path,
+            'method': request.method,
+            'status': response.status_code,
+            'queries': recorder.count,
+            'db_time': recorder.duration,
+            'duplicates': suspects,
+        })
+        return response
+
+    def _write(self, record):
+        line = json.dumps(record) + '\n'
+        with self._write_lock:
+            with open(self.log_path, 'a', encoding='utf-8') as log:
+                log.write(line)
@@ -0,0 +1,91 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:58
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_aboutsection_blogpost_booking_event_herosection_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-published_at', '-created_at'], name='core_blog_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['category', '-published_at', '-created_at'], name='core_blog_cat_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['event_date', 'event_time'], name='core_event_active_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['venue', 'event_date', 'event_time'], name='core_event_venue_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='facility',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['order', 'name'], name='core_facility_active_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gallery',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['order', '-created_at'], name='core_gallery_active_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gallery',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_featured', True)), fields=['order', '-created_at'], name='core_gallery_featured_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gallery',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['category', 'order', '-created_at'], name='core_gallery_cat_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='herosection',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['order', 'created_at'], name='core_hero_active_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='menuitem',
+            index=models.Index(condition=models.Q(('is_available', True)), fields=['category', 'order', 'name'], name='core_menuitem_avail_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='promotion',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at'], name='core_promo_active_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['order', 'name'], name='core_service_active_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='slider',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['order', 'created_at'], name='core_slider_active_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='testimonial',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['order', '-created_at'], name='core_testim_active_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='testimonial',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_featured', True)), fields=['order', '-created_at'], name='core_testim_featured_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='testimonial',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['venue', 'order', '-created_at'], name='core_testim_venue_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='venue',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['name'], name='core_venue_active_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='venue',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_featured', True)), fields=['name'], name='core_venue_featured_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='venue',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['venue_type', 'name'], name='core_venue_type_name_idx'),
+        ),
+    ]
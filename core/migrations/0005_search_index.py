@@ -0,0 +1,23 @@
+from django.db import migrations
+
+from core.search import drop_search_index, install_search_index
+
+
+def create_index(apps, schema_editor):
+    install_search_index(schema_editor.connection)
+
+
+def remove_index(apps, schema_editor):
+    drop_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_listing_indexes'),
+        ('blog', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, remove_index),
+    ]
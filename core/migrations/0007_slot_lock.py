@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_booking_slot_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlotLock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(help_text='Booking model label', max_length=50)),
+                ('venue_id', models.BigIntegerField()),
+                ('date', models.DateField()),
+            ],
+            options={
+                'verbose_name': 'Slot Lock',
+                'verbose_name_plural': 'Slot Locks',
+                'constraints': [models.UniqueConstraint(fields=('scope', 'venue_id', 'date'), name='core_slotlock_unique')],
+            },
+        ),
+    ]
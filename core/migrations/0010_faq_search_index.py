@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from core.search import drop_search_index, install_search_index
+
+
+def create_index(apps, schema_editor):
+    install_search_index(schema_editor.connection)
+
+
+def remove_index(apps, schema_editor):
+    drop_search_index(schema_editor.connection, labels=['core.faq'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_status_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, remove_index),
+    ]
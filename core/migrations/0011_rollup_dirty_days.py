@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_faq_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupDirtyDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=50)),
+                ('day', models.DateField()),
+            ],
+            options={
+                'verbose_name': 'Rollup Dirty Day',
+                'verbose_name_plural': 'Rollup Dirty Days',
+                'constraints': [models.UniqueConstraint(fields=('source', 'day'), name='core_rollupdirtyday_unique')],
+            },
+        ),
+    ]
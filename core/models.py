@@ -68,6 +68,9 @@ class HeroSection(models.Model):
         ordering = ['order', 'created_at']
         verbose_name = "Hero Section"
         verbose_name_plural = "Hero Sections"
+        indexes = [
+            models.Index(fields=['order', 'created_at'], condition=models.Q(is_active=True), name='core_hero_active_order_idx'),
+        ]
     
     def __str__(self):
         return f"Hero: {self.title}"
@@ -105,6 +108,9 @@ class Service(models.Model):
         ordering = ['order', 'name']
         verbose_name = "Service"
         verbose_name_plural = "Services"
+        indexes = [
+            models.Index(fields=['order', 'name'], condition=models.Q(is_active=True), name='core_service_active_order_idx'),
+        ]
     
     def __str__(self):
         return self.name
@@ -122,6 +128,9 @@ class Facility(models.Model):
     class Meta:
         ordering = ['order', 'name']
         verbose_name_plural = "Facilities"
+        indexes = [
+            models.Index(fields=['order', 'name'], condition=models.Q(is_active=True), name='core_facility_active_order_idx'),
+        ]
     
     def __str__(self):
         return self.name
@@ -158,6 +167,11 @@ class Venue(models.Model):
         ordering = ['name']
         verbose_name = "Venue"
         verbose_name_plural = "Venues"
+        indexes = [
+            models.Index(fields=['name'], condition=models.Q(is_active=True), name='core_venue_active_name_idx'),
+            models.Index(fields=['name'], condition=models.Q(is_active=True, is_featured=True), name='core_venue_featured_name_idx'),
+            models.Index(fields=['venue_type', 'name'], condition=models.Q(is_active=True), name='core_venue_type_name_idx'),
+        ]
     
     def __str__(self):
         return self.name
@@ -226,13 +240,44 @@ class Booking(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Bookings in these states hold their venue slot
+    ACTIVE_STATUSES = ['pending', 'confirmed', 'completed']
+    
     class Meta:
         ordering = ['-created_at']
         verbose_name = "Booking"
         verbose_name_plural = "Bookings"
+        indexes = [
+            models.Index(fields=['venue', 'event_date', 'start_time', 'end_time'], name='core_booking_slot_idx'),
+            models.Index(fields=['event_date', 'venue'], name='core_booking_date_idx'),
+            # Scanned from the reporting rollups' high-water mark
+            models.Index(fields=['updated_at'], name='core_booking_updated_idx'),
+            # Pending approvals on the admin index (core.metrics)
+            models.Index(fields=['status', 'event_date'], name='core_booking_status_idx'),
+        ]
     
     def __str__(self):
         return f"Booking {self.id} - {self.user.username} - {self.venue.name}"
+    
+    def clean(self):
+        from .availability import validate_slot
+        validate_slot(self)
+
+class SlotLock(models.Model):
+    """Serializes bookings of one venue on one date (see core.availability.book_slot)"""
+    scope = models.CharField(max_length=50, help_text="Booking model label")
+    venue_id = models.BigIntegerField()
+    date = models.DateField()
+    
+    class Meta:
+        verbose_name = "Slot Lock"
+        verbose_name_plural = "Slot Locks"
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'venue_id', 'date'], name='core_slotlock_unique'),
+        ]
+    
+    def __str__(self):
+        return f"{self.scope} venue {self.venue_id} on {self.date}"
 
 # ============================================================================
 # RESTAURANT & CATERING MODELS
@@ -294,6 +339,9 @@ class MenuItem(models.Model):
         ordering = ['category', 'order', 'name']
         verbose_name = "Menu Item"
         verbose_name_plural = "Menu Items"
+        indexes = [
+            models.Index(fields=['category', 'order', 'name'], condition=models.Q(is_available=True), name='core_menuitem_avail_order_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} - ₹{self.price}"
@@ -320,6 +368,11 @@ class Testimonial(models.Model):
         ordering = ['order', '-created_at']
         verbose_name = "Testimonial"
         verbose_name_plural = "Testimonials"
+        indexes = [
+            models.Index(fields=['order', '-created_at'], condition=models.Q(is_active=True), name='core_testim_active_order_idx'),
+            models.Index(fields=['order', '-created_at'], condition=models.Q(is_active=True, is_featured=True), name='core_testim_featured_idx'),
+            models.Index(fields=['venue', 'order', '-created_at'], condition=models.Q(is_active=True), name='core_testim_venue_order_idx'),
+        ]
     
     def __str__(self):
         return f"{self.author_name} - {self.rating} stars"
@@ -341,6 +394,11 @@ class Gallery(models.Model):
         ordering = ['order', '-created_at']
         verbose_name = "Gallery Item"
         verbose_name_plural = "Gallery"
+        indexes = [
+            models.Index(fields=['order', '-created_at'], condition=models.Q(is_active=True), name='core_gallery_active_order_idx'),
+            models.Index(fields=['order', '-created_at'], condition=models.Q(is_active=True, is_featured=True), name='core_gallery_featured_idx'),
+            models.Index(fields=['category', 'order', '-created_at'], condition=models.Q(is_active=True), name='core_gallery_cat_order_idx'),
+        ]
     
     def __str__(self):
         return self.title
@@ -382,6 +440,10 @@ class BlogPost(models.Model):
         ordering = ['-published_at', '-created_at']
         verbose_name = "Blog Post"
         verbose_name_plural = "Blog Posts"
+        indexes = [
+            models.Index(fields=['-published_at', '-created_at'], condition=models.Q(is_published=True), name='core_blog_published_idx'),
+            models.Index(fields=['category', '-published_at', '-created_at'], condition=models.Q(is_published=True), name='core_blog_cat_published_idx'),
+        ]
     
     def __str__(self):
         return self.title
@@ -410,6 +472,9 @@ class Slider(models.Model):
         ordering = ['order', 'created_at']
         verbose_name = "Slider"
         verbose_name_plural = "Sliders"
+        indexes = [
+            models.Index(fields=['order', 'created_at'], condition=models.Q(is_active=True), name='core_slider_active_order_idx'),
+        ]
     
     def __str__(self):
         return self.title
@@ -430,6 +495,9 @@ class Promotion(models.Model):
         ordering = ['-created_at']
         verbose_name = "Promotion"
         verbose_name_plural = "Promotions"
+        indexes = [
+            models.Index(fields=['-created_at'], condition=models.Q(is_active=True), name='core_promo_active_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.discount_percentage}% off"
@@ -449,6 +517,117 @@ class Event(models.Model):
         ordering = ['event_date', 'event_time']
         verbose_name = "Event"
         verbose_name_plural = "Events"
+        indexes = [
+            models.Index(fields=['event_date', 'event_time'], condition=models.Q(is_active=True), name='core_event_active_date_idx'),
+            models.Index(fields=['venue', 'event_date', 'event_time'], condition=models.Q(is_active=True), name='core_event_venue_date_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.event_date}"
+
+# ============================================================================
+# REPORTING ROLLUPS
+# ============================================================================
+#
+# Daily aggregates maintained by core.rollups; reports read these instead of
+# the raw bookings, payments and orders.
+
+class BookingRollup(models.Model):
+    """Bookings per event day, venue and status"""
+    SOURCE_CHOICES = [
+        ('hall', 'Hall booking'),
+        ('venue', 'Venue booking'),
+    ]
+    
+    source = models.CharField(max_length=10, choices=SOURCE_CHOICES)
+    day = models.DateField()
+    venue_id = models.BigIntegerField()
+    venue_name = models.CharField(max_length=200)
+    status = models.CharField(max_length=20)
+    bookings = models.IntegerField(default=0)
+    guests = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    advance = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    
+    class Meta:
+        verbose_name = "Booking Rollup"
+        verbose_name_plural = "Booking Rollups"
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'day', 'venue_id', 'status'], name='core_bookingrollup_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['day'], name='core_bookingrollup_day_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.day} {self.venue_name} {self.status}: {self.bookings}"
+
+class PaymentRollup(models.Model):
+    """Payments per day, payment method and status"""
+    day = models.DateField()
+    payment_method = models.CharField(max_length=20)
+    status = models.CharField(max_length=20)
+    payments = models.IntegerField(default=0)
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    
+    class Meta:
+        verbose_name = "Payment Rollup"
+        verbose_name_plural = "Payment Rollups"
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'payment_method', 'status'], name='core_paymentrollup_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['day'], name='core_paymentrollup_day_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.day} {self.payment_method} {self.status}: {self.amount}"
+
+class OrderRollup(models.Model):
+    """Restaurant orders per day, delivery type and status"""
+    day = models.DateField()
+    delivery_type = models.CharField(max_length=20)
+    status = models.CharField(max_length=20)
+    orders = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    
+    class Meta:
+        verbose_name = "Order Rollup"
+        verbose_name_plural = "Order Rollups"
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'delivery_type', 'status'], name='core_orderrollup_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['day'], name='core_orderrollup_day_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.day} {self.delivery_type} {self.status}: {self.revenue}"
+
+class RollupState(models.Model):
+    """How far each rollup source has been folded in"""
+    source = models.CharField(max_length=50, unique=True)
+    high_water = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        # Its admin changelist is the reporting dashboard
+        verbose_name = "Report"
+        verbose_name_plural = "Reports"
+    
+    def __str__(self):
+        return f"{self.source} up to {self.high_water}"
+
+class RollupDirtyDay(models.Model):
+    """A day a row left (moved away or deleted), which the next refresh recomputes"""
+    source = models.CharField(max_length=50)
+    day = models.DateField()
+
+    class Meta:
+        verbose_name = "Rollup Dirty Day"
+        verbose_name_plural = "Rollup Dirty Days"
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'day'], name='core_rollupdirtyday_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.source} {self.day}"
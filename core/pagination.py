@@ -0,0 +1,173 @@
+from decimal import Decimal
+
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q
+
+CURSOR_SALT = 'core.pagination.cursor'
+
+
+def _dump_value(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+class KeysetPage:
+    """One page of a keyset-paginated listing"""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """Cursor pagination over a queryset's ordering.
+
+    Unlike ``django.core.paginator.Paginator`` this never issues a COUNT and
+    never uses OFFSET: each page is a range scan starting right after the last
+    row of the previous page, so page 500 costs the same as page 1. The
+    ordering is the queryset's (or the model's Meta) ordering with ``id``
+    appended as a unique tie-breaker; NULLs always sort last.
+
+    Cursors are signed, so clients can pass them back but not forge them.
+    """
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = self._resolve_ordering(queryset)
+
+    def _resolve_ordering(self, queryset):
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        names = [field.lstrip('-') for field in ordering]
+        if 'id' not in names and 'pk' not in names:
+            ordering.append('id')
+
+        resolved = []
+        for field in ordering:
+            name = field.lstrip('-')
+            if name == 'pk':
+                name = 'id'
+            model_field = queryset.model._meta.get_field(name)
+            resolved.append((model_field, field.startswith('-')))
+        return resolved
+
+    def _order_by(self, reverse):
+        order_by = []
+        for field, descending in self.ordering:
+            attname = field.attname
+            descending = descending != reverse
+            if field.null:
+                expression = F(attname).desc if descending else F(attname).asc
+                # NULLs last going forwards means NULLs first going backwards
+                nulls = {'nulls_first': True} if reverse else {'nulls_last': True}
+                order_by.append(expression(**nulls))
+            else:
+                order_by.append(f'-{attname}' if descending else attname)
+        return order_by
+
+    def _seek(self, values, reverse):
+        """Q matching rows strictly after (or before, if reverse) ``values``"""
+        condition = Q()
+        equal = Q()
+        for (field, descending), value in zip(self.ordering, values):
+            attname = field.attname
+            if value is None:
+                # NULLs sort last: nothing follows them in this column, and
+                # every non-NULL value precedes them.
+                beyond = Q(**{f'{attname}__isnull': False}) if reverse else None
+                same = Q(**{f'{attname}__isnull': True})
+            else:
+                lookup = 'gt' if descending == reverse else 'lt'
+                beyond = Q(**{f'{attname}__{lookup}': value})
+                if field.null and not reverse:
+                    beyond |= Q(**{f'{attname}__isnull': True})
+                same = Q(**{attname: value})
+            if beyond is not None:
+                condition |= equal & beyond
+            equal &= same
+        bound = self._bound(values[0], reverse)
+        return condition if bound is None else bound & condition
+
+    def _bound(self, value, reverse):
+        """Range on the first ordering column implied by ``_seek``.
+
+        The OR chain alone gives the database no range to start from, so it
+        scans the index from the top; this bound lets it seek instead.
+        """
+        field, descending = self.ordering[0]
+        attname = field.attname
+        if value is None:
+            return None if reverse else Q(**{f'{attname}__isnull': True})
+        lookup = 'gte' if descending == reverse else 'lte'
+        bound = Q(**{f'{attname}__{lookup}': value})
+        if field.null and not reverse:
+            bound |= Q(**{f'{attname}__isnull': True})
+        return bound
+
+    def _cursor(self, obj, direction):
+        values = [_dump_value(getattr(obj, field.attname)) for field, _ in self.ordering]
+        return signing.dumps({'v': values, 'd': direction}, salt=CURSOR_SALT, compress=True)
+
+    def _decode(self, cursor):
+        try:
+            payload = signing.loads(cursor, salt=CURSOR_SALT)
+        except signing.BadSignature:
+            return None, None
+        values = payload.get('v')
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            return None, None
+        try:
+            # Round-trip through each field so dates compare natively
+            values = [
+                None if value is None else field.to_python(value)
+                for (field, _), value in zip(self.ordering, values)
+            ]
+        except ValidationError:
+            return None, None
+        return values, payload.get('d')
+
+    def get_page(self, cursor=None):
+        values, direction = self._decode(cursor) if cursor else (None, None)
+        reverse = direction == 'p'
+
+        queryset = self.queryset.order_by(*self._order_by(reverse))
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, reverse))
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if reverse:
+            rows.reverse()
+
+        if not rows:
+            return KeysetPage([])
+
+        if reverse:
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, values is not None
+        return KeysetPage(
+            rows,
+            next_cursor=self._cursor(rows[-1], 'n') if has_next else None,
+            previous_cursor=self._cursor(rows[0], 'p') if has_previous else None,
+        )
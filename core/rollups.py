@@ -0,0 +1,288 @@
+from collections import namedtuple
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, IntegerField, Max, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate, TruncMonth
+from django.utils import timezone
+
+from .models import BookingRollup, OrderRollup, PaymentRollup, RollupDirtyDay, RollupState
+
+# ============================================================================
+# REPORTING ROLLUPS
+# ============================================================================
+#
+# Revenue and occupancy reports read per-day aggregates instead of raw rows.
+# Each source remembers the newest ``updated_at`` it has folded in (its high
+# water mark). A refresh finds the rows changed since then, works out which
+# days they fall on, and recomputes just those days with one GROUP BY, so
+# its cost follows the amount of change rather than the size of the tables.
+# Days are recomputed whole, which makes a refresh idempotent. It also means
+# re-reading a few seconds before the mark (for transactions that commit
+# after stamping their rows) is harmless.
+#
+# ``manage.py refresh_rollups`` does the refresh and is meant to run every
+# few minutes. A row moved to another day, or deleted, leaves its old day
+# behind where the mark cannot see it, so signals record that day as dirty
+# and the next refresh recomputes it too. Bulk ``update()``/``delete()`` and
+# raw imports send no signals: run with ``--since`` (or ``--backfill``) after
+# those.
+
+# Rows are re-read for this long before the high-water mark
+LOOKBACK = timedelta(seconds=30)
+
+# Largest number of date ranges recomputed per statement
+DAY_RANGE_CHUNK = 200
+
+MONEY = DecimalField(max_digits=14, decimal_places=2)
+
+# model: source rows; day_field / day_is_datetime: what a row's day is;
+# rollup / scope: the rollup rows it owns; group: rollup field -> source
+# field; totals: rollup field -> aggregate
+Source = namedtuple('Source', ['model', 'day_field', 'day_is_datetime', 'rollup', 'scope', 'group', 'totals'])
+
+
+def _money(field):
+    return Coalesce(Sum(field), Value(0), output_field=MONEY)
+
+
+def _count(field):
+    return Coalesce(Sum(field), Value(0), output_field=IntegerField())
+
+
+def _sources():
+    from bookings.models import Booking as HallBooking
+    from payments.models import Payment
+    from restaurant.models import Order
+    from .models import Booking
+
+    return {
+        'hall_bookings': Source(
+            HallBooking, 'event_date', False, BookingRollup, {'source': 'hall'},
+            {'venue_id': 'venue_id', 'venue_name': 'venue__name', 'status': 'status'},
+            {'bookings': Count('id'), 'guests': _count('number_of_guests'),
+             'revenue': _money('total_amount'), 'advance': _money('advance_payment')},
+        ),
+        'venue_bookings': Source(
+            Booking, 'event_date', False, BookingRollup, {'source': 'venue'},
+            {'venue_id': 'venue_id', 'venue_name': 'venue__name', 'status': 'status'},
+            {'bookings': Count('id'), 'guests': _count('guest_count'), 'revenue': _money('total_amount')},
+        ),
+        'payments': Source(
+            Payment, 'payment_date', True, PaymentRollup, {},
+            {'payment_method': 'payment_method', 'status': 'status'},
+            {'payments': Count('id'), 'amount': _money('amount')},
+        ),
+        'orders': Source(
+            Order, 'created_at', True, OrderRollup, {},
+            {'delivery_type': 'delivery_type', 'status': 'status'},
+            {'orders': Count('id'), 'revenue': _money('total_amount')},
+        ),
+    }
+
+
+def _day_expression(source):
+    return TruncDate(source.day_field) if source.day_is_datetime else F(source.day_field)
+
+
+def _day_ranges(days):
+    """Sorted runs of consecutive days as [first, last] pairs"""
+    ranges = []
+    for day in sorted(days):
+        if ranges and ranges[-1][1] + timedelta(days=1) == day:
+            ranges[-1][1] = day
+        else:
+            ranges.append([day, day])
+    return ranges
+
+
+def _range_filter(source, ranges):
+    """Q matching source rows on any of the day ranges, usable by an index;
+    a range with no last day is open-ended"""
+    query = Q()
+    for first, last in ranges:
+        if source.day_is_datetime:
+            bounds = {f'{source.day_field}__gte': timezone.make_aware(datetime.combine(first, time.min))}
+            if last is not None:
+                end = datetime.combine(last + timedelta(days=1), time.min)
+                bounds[f'{source.day_field}__lt'] = timezone.make_aware(end)
+        else:
+            bounds = {f'{source.day_field}__gte': first}
+            if last is not None:
+                bounds[f'{source.day_field}__lte'] = last
+        query |= Q(**bounds)
+    return query
+
+
+def _rollup_filter(ranges):
+    query = Q()
+    for first, last in ranges:
+        query |= Q(day__gte=first) if last is None else Q(day__range=(first, last))
+    return query
+
+
+def _build(source, rows):
+    """Rollup instances for the source rows, one per day and group"""
+    grouped = (
+        rows.annotate(rollup_day=_day_expression(source))
+        .values('rollup_day', *source.group.values())
+        .annotate(**source.totals)
+        .order_by()
+    )
+    return [
+        source.rollup(
+            day=values['rollup_day'],
+            **source.scope,
+            **{field: values[column] for field, column in source.group.items()},
+            **{field: values[field] for field in source.totals},
+        )
+        for values in grouped
+    ]
+
+
+def _recompute(source, ranges=None):
+    """Replace the rollup rows of the day ranges (every day if None); returns rows written"""
+    rollups = source.rollup.objects.filter(**source.scope)
+    rows = source.model.objects.all()
+    if ranges is None:
+        rollups.delete()
+        built = _build(source, rows)
+    else:
+        built = []
+        for start in range(0, len(ranges), DAY_RANGE_CHUNK):
+            chunk = ranges[start:start + DAY_RANGE_CHUNK]
+            rollups.filter(_rollup_filter(chunk)).delete()
+            built.extend(_build(source, rows.filter(_range_filter(source, chunk))))
+    source.rollup.objects.bulk_create(built, batch_size=500)
+    return len(built)
+
+
+def _row_day(source, value):
+    if source.day_is_datetime and value is not None:
+        return timezone.localtime(value).date() if timezone.is_aware(value) else value.date()
+    return value
+
+
+def _sources_of(model):
+    return [(name, source) for name, source in _sources().items() if source.model is model]
+
+
+def _mark_dirty(name, day):
+    RollupDirtyDay.objects.bulk_create([RollupDirtyDay(source=name, day=day)], ignore_conflicts=True)
+
+
+def mark_moved(instance):
+    """Before a source row is saved, mark the day it is moving away from"""
+    if instance._state.adding or instance.pk is None:
+        return
+    for name, source in _sources_of(type(instance)):
+        if instance._meta.get_field(source.day_field).auto_now_add:
+            continue
+        old = (source.model.objects.filter(pk=instance.pk)
+               .values_list(source.day_field, flat=True).first())
+        old_day = _row_day(source, old)
+        if old_day is not None and old_day != _row_day(source, getattr(instance, source.day_field)):
+            _mark_dirty(name, old_day)
+
+
+def mark_deleted(instance):
+    """After a source row is deleted, mark the day it was counted on"""
+    for name, source in _sources_of(type(instance)):
+        day = _row_day(source, getattr(instance, source.day_field))
+        if day is not None:
+            _mark_dirty(name, day)
+
+
+def refresh_source(name, full=False, since=None):
+    """Bring one source's rollups up to date; returns rollup rows written.
+
+    ``full`` rebuilds every day, ``since`` (a date) rebuilds that day and
+    later ones; otherwise only days with rows changed since the mark and
+    days marked dirty.
+    """
+    source = _sources()[name]
+    with transaction.atomic():
+        RollupState.objects.bulk_create([RollupState(source=name)], ignore_conflicts=True)
+        state = RollupState.objects.select_for_update().get(source=name)
+        rows = source.model.objects.all()
+        if not full and since is None and state.high_water is not None:
+            rows = rows.filter(updated_at__gte=state.high_water - LOOKBACK)
+        high_water = rows.aggregate(latest=Max('updated_at'))['latest']
+        dirty = dict(RollupDirtyDay.objects.filter(source=name).values_list('id', 'day'))
+
+        if full or state.high_water is None:
+            written = _recompute(source)
+        elif since is not None:
+            written = _recompute(source, [[since, None]] + [[day, day] for day in dirty.values() if day < since])
+        else:
+            days = set(
+                rows.annotate(rollup_day=_day_expression(source))
+                .values_list('rollup_day', flat=True).order_by().distinct()
+            )
+            days.update(dirty.values())
+            written = _recompute(source, _day_ranges(days)) if days else 0
+        if dirty:
+            RollupDirtyDay.objects.filter(id__in=dirty).delete()
+
+        if high_water is not None and (state.high_water is None or high_water > state.high_water):
+            state.high_water = high_water
+            state.save(update_fields=['high_water'])
+    return written
+
+
+def refresh_rollups(full=False, since=None):
+    """Refresh every source; returns {source: rollup rows written}"""
+    return {name: refresh_source(name, full=full, since=since) for name in _sources()}
+
+
+def report(start, end):
+    """Monthly revenue and occupancy between two dates, read from the rollups only"""
+    from bookings.models import Booking as HallBooking
+    from .models import Booking
+
+    booked = (Q(source='hall', status__in=HallBooking.ACTIVE_STATUSES)
+              | Q(source='venue', status__in=Booking.ACTIVE_STATUSES))
+    payments = PaymentRollup.objects.filter(day__range=(start, end))
+    bookings = BookingRollup.objects.filter(booked, day__range=(start, end))
+    orders = OrderRollup.objects.filter(day__range=(start, end)).exclude(status='cancelled')
+
+    months = {}
+
+    def month(row):
+        return months.setdefault(row['month'], {
+            'month': row['month'], 'collected': 0, 'refunded': 0,
+            'bookings': 0, 'booking_value': 0, 'orders': 0, 'order_value': 0,
+        })
+
+    for row in (payments.filter(status__in=['completed', 'refunded']).annotate(month=TruncMonth('day'))
+                .values('month', 'status').annotate(total=Sum('amount')).order_by()):
+        month(row)['collected' if row['status'] == 'completed' else 'refunded'] = row['total']
+    for row in (bookings.annotate(month=TruncMonth('day')).values('month')
+                .annotate(count=Sum('bookings'), value=Sum('revenue')).order_by()):
+        month(row).update(bookings=row['count'], booking_value=row['value'])
+    for row in (orders.annotate(month=TruncMonth('day')).values('month')
+                .annotate(count=Sum('orders'), value=Sum('revenue')).order_by()):
+        month(row).update(orders=row['count'], order_value=row['value'])
+
+    days = (end - start).days + 1
+    venues = [
+        {**row, 'occupancy': round(100 * row['days'] / days)}
+        for row in bookings.values('source', 'venue_id', 'venue_name')
+        .annotate(days=Count('day', distinct=True), count=Sum('bookings'), value=Sum('revenue'))
+        .order_by('-days', 'venue_name')
+    ]
+    methods = list(
+        payments.filter(status='completed').values('payment_method')
+        .annotate(count=Sum('payments'), total=Sum('amount')).order_by('-total')
+    )
+    return {
+        'start': start,
+        'end': end,
+        'months': [months[key] for key in sorted(months)],
+        'venues': venues,
+        'methods': methods,
+        'delivery': list(
+            orders.values('delivery_type').annotate(count=Sum('orders'), value=Sum('revenue')).order_by('-value')
+        ),
+        'state': list(RollupState.objects.order_by('source').values('source', 'high_water')),
+    }
@@ -0,0 +1,154 @@
+import re
+
+from django.db import connection
+from django.db.models import FloatField, Q
+from django.db.models.expressions import RawSQL
+
+# ============================================================================
+# FULL-TEXT SEARCH
+# ============================================================================
+
+_fts_available = {}
+
+# FTS5 tables (created by core migrations 0005 and 0010 on SQLite) mirroring the text
+# columns of each searchable model. Triggers keep them in sync with every
+# INSERT/UPDATE/DELETE, including bulk ones. The weights feed bm25() so that
+# a match in a title outranks one buried in the body.
+SEARCH_INDEXES = {
+    'core.menuitem': {
+        'table': 'core_menuitem_fts',
+        'columns': {'name': 10.0, 'description': 1.0},
+    },
+    'core.blogpost': {
+        'table': 'core_blogpost_fts',
+        'columns': {'title': 10.0, 'excerpt': 3.0, 'content': 1.0, 'tags': 5.0},
+    },
+    'blog.blogpost': {
+        'table': 'blog_blogpost_fts',
+        'columns': {'title': 10.0, 'excerpt': 3.0, 'content': 1.0, 'tags': 5.0},
+    },
+    'core.faq': {
+        'table': 'core_faq_fts',
+        'columns': {'question': 10.0, 'answer': 1.0, 'category': 3.0},
+    },
+}
+
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+
+
+def _content_table(label):
+    app_label, model_name = label.split('.')
+    return f'{app_label}_{model_name}'
+
+
+def fts5_supported(conn):
+    if conn.vendor != 'sqlite':
+        return False
+    with conn.cursor() as cursor:
+        try:
+            cursor.execute('CREATE VIRTUAL TABLE temp._fts5_probe USING fts5(x)')
+            cursor.execute('DROP TABLE temp._fts5_probe')
+        except Exception:
+            return False
+    return True
+
+
+def install_search_index(conn):
+    """Create any missing FTS5 tables and sync triggers, rebuilding those indexes.
+
+    Idempotent. Runs from migration 0005 and again after every migrate,
+    because SQLite table rebuilds in later migrations drop the triggers.
+    """
+    if not fts5_supported(conn):
+        return
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+        existing = {row[0] for row in cursor.fetchall()}
+        for label, index in SEARCH_INDEXES.items():
+            fts, content = index['table'], _content_table(label)
+            triggers = {f'{fts}_ai', f'{fts}_ad', f'{fts}_au'}
+            if content not in existing or (fts in existing and triggers <= existing):
+                continue
+
+            cols = ', '.join(index['columns'])
+            new_cols = ', '.join(f'new.{column}' for column in index['columns'])
+            old_cols = ', '.join(f'old.{column}' for column in index['columns'])
+            statements = [
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, content='{content}', "
+                f"content_rowid='id', tokenize='porter unicode61 remove_diacritics 2')",
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {content} BEGIN "
+                f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_cols}); END",
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {content} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_cols}); END",
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {content} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_cols}); "
+                f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_cols}); END",
+                # Re-read the content table; rows may have changed while untracked
+                f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+            ]
+            for statement in statements:
+                cursor.execute(statement)
+    _fts_available.pop(conn.alias, None)
+
+
+def drop_search_index(conn, labels=None):
+    """Drop the FTS5 tables and triggers of ``labels`` (every index if None)"""
+    if conn.vendor != 'sqlite':
+        return
+    with conn.cursor() as cursor:
+        for label, index in SEARCH_INDEXES.items():
+            if labels is not None and label not in labels:
+                continue
+            fts = index['table']
+            for suffix in ('ai', 'ad', 'au'):
+                cursor.execute(f'DROP TRIGGER IF EXISTS {fts}_{suffix}')
+            cursor.execute(f'DROP TABLE IF EXISTS {fts}')
+    _fts_available.pop(conn.alias, None)
+
+
+def fts_available(using=None):
+    """Whether the FTS5 search tables exist on this database"""
+    conn = connection if using is None else using
+    if conn.alias not in _fts_available:
+        tables = set(conn.introspection.table_names())
+        _fts_available[conn.alias] = conn.vendor == 'sqlite' and all(
+            index['table'] in tables for index in SEARCH_INDEXES.values()
+        )
+    return _fts_available[conn.alias]
+
+
+def match_expression(query):
+    """Turn free text into a safe FTS5 MATCH string (all terms, prefix match)"""
+    return ' '.join(f'"{token}"*' for token in _TOKEN.findall(query))
+
+
+def search(queryset, query):
+    """Filter ``queryset`` to rows matching ``query``, best matches first.
+
+    On SQLite this joins the model's FTS5 table and orders by BM25 rank. On
+    other backends (or before the index exists) it falls back to an
+    ``icontains`` match over the same columns in the queryset's own ordering.
+    """
+    index = SEARCH_INDEXES[queryset.model._meta.label_lower]
+    expression = match_expression(query)
+    if not expression:
+        return queryset
+
+    if not fts_available():
+        condition = Q()
+        for column in index['columns']:
+            condition |= Q(**{f'{column}__icontains': query})
+        return queryset.filter(condition)
+
+    table = index['table']
+    model_table = queryset.model._meta.db_table
+    weights = ', '.join(str(weight) for weight in index['columns'].values())
+    # One index lookup finds the matches; the rank is then read back per
+    # matching row (FTS5 looks rows up by rowid directly)
+    matches = RawSQL(f'SELECT rowid FROM {table} WHERE {table} MATCH %s', (expression,))
+    rank = RawSQL(
+        f'SELECT bm25({table}, {weights}) FROM {table} '
+        f'WHERE {table} MATCH %s AND {table}.rowid = {model_table}.id',
+        (expression,), output_field=FloatField(),
+    )
+    return queryset.filter(id__in=matches).annotate(search_rank=rank).order_by('search_rank')
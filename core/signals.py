@@ -0,0 +1,62 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+from .cache import (
+    HOME_SECTION_MODELS, bump_model_version,
+    invalidate_home_sections, invalidate_site_settings
+)
+from .metrics import invalidate_operational_metrics
+from .rollups import mark_deleted, mark_moved
+from .models import SiteSettings, Booking, Event
+
+
+@receiver([post_save, post_delete])
+def invalidate_content_cache(sender, **kwargs):
+    """Invalidate cached page content once a core content model change is committed"""
+    if sender._meta.app_label != 'core' or sender is Booking:
+        return
+
+    # Bumping before the commit would let a request in between cache the old
+    # rows under the new version, where they would stay until the next edit
+    def invalidate():
+        if sender is SiteSettings:
+            invalidate_site_settings()
+        if sender in HOME_SECTION_MODELS:
+            invalidate_home_sections(sender)
+        bump_model_version(sender)
+    transaction.on_commit(invalidate)
+
+
+def _metrics_sources():
+    from bookings.models import Booking as HallBooking, TableBooking
+    from payments.models import Payment
+    from restaurant.models import Order
+    return (Booking, Event, HallBooking, TableBooking, Order, Payment)
+
+
+@receiver([post_save, post_delete])
+def invalidate_admin_metrics(sender, **kwargs):
+    """Refresh the admin index figures after a booking, order, payment or event changes"""
+    if sender in _metrics_sources():
+        transaction.on_commit(invalidate_operational_metrics)
+
+
+def _rollup_sources():
+    from bookings.models import Booking as HallBooking
+    from payments.models import Payment
+    from restaurant.models import Order
+    return (Booking, HallBooking, Order, Payment)
+
+
+@receiver(pre_save)
+def remember_rollup_day_left(sender, instance, raw=False, **kwargs):
+    """Have the next rollup refresh recompute the day a row moves away from"""
+    if sender in _rollup_sources() and not raw:
+        mark_moved(instance)
+
+
+@receiver(post_delete)
+def remember_rollup_day_deleted(sender, instance, **kwargs):
+    """Same for the day of a deleted row"""
+    if sender in _rollup_sources():
+        mark_deleted(instance)
@@ -0,0 +1,11 @@
+from django.contrib import admin
+
+
+class RoyalPalaceAdminSite(admin.AdminSite):
+    """Admin site whose index leads with today's operational figures"""
+    index_template = 'admin/core/index.html'
+
+    def index(self, request, extra_context=None):
+        from .metrics import operational_metrics
+        context = {'metrics': operational_metrics(), **(extra_context or {})}
+        return super().index(request, context)
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+
+# ============================================================================
+# STATUS UPDATE HUB
+# ============================================================================
+#
+# Backs the server-sent events stream of order and booking status changes.
+# One hub per event loop polls the database for rows whose status changed
+# since its last look (one indexed query per model on status_changed_at,
+# whatever the number of listeners) and fans each change out to the open
+# streams of the row's owner. Saves that leave the status alone are never
+# read. The hub only runs while someone is listening, and keeps polling
+# through database errors, waiting longer after each consecutive one. Serve
+# the site with an ASGI server (e.g. ``uvicorn MarrigeHall.asgi:application``)
+# so that streams are coroutines waiting on a queue rather than threads.
+
+logger = logging.getLogger('core.streams')
+
+QUEUE_SIZE = 100
+
+# Rows are re-read for this long after their timestamp, so a transaction that
+# commits a little after it stamped status_changed_at is still picked up
+LOOKBACK = timedelta(seconds=5)
+
+# Longest wait between polls after repeated failures, in seconds
+MAX_BACKOFF = 60
+
+
+def _poll_interval():
+    return getattr(settings, 'STATUS_STREAM_POLL_INTERVAL', 2)
+
+
+def _sources():
+    from bookings.models import Booking
+    from restaurant.models import Order
+
+    return [
+        ('order', Order, 'order_number'),
+        ('booking', Booking, 'event_date'),
+    ]
+
+
+class StatusHub:
+    """Fans out status changes to per-user subscriber queues"""
+
+    def __init__(self):
+        self.subscribers = defaultdict(set)
+        self.task = None
+        self.since = None
+        # (kind, id) -> status_changed_at of rows inside the lookback
+        # window, so re-read rows are not announced twice
+        self.last_seen = {}
+
+    def subscribe(self, user_id):
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.subscribers[user_id].add(queue)
+        if self.task is None:
+            self.since = timezone.now()
+            self.task = asyncio.get_running_loop().create_task(self.run())
+        return queue
+
+    def unsubscribe(self, user_id, queue):
+        queues = self.subscribers.get(user_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self.subscribers[user_id]
+
+    async def run(self):
+        failures = 0
+        try:
+            while self.subscribers:
+                await asyncio.sleep(min(_poll_interval() * 2 ** failures, MAX_BACKOFF))
+                try:
+                    await self.poll()
+                except Exception:
+                    failures += 1
+                    logger.exception('Status poll failed (%d in a row)', failures)
+                else:
+                    failures = 0
+        finally:
+            self.task = None
+
+    async def poll(self):
+        """Look for changes once and deliver them; returns the number found"""
+        changes = await sync_to_async(self.changes)()
+        for change in changes:
+            for queue in self.subscribers.get(change['user'], ()):
+                if queue.full():
+                    # A stalled client loses its oldest update, not the newest
+                    queue.get_nowait()
+                queue.put_nowait(change)
+        return len(changes)
+
+    def changes(self):
+        """Status changes since the last poll, oldest first"""
+        changes = []
+        since = self.since - LOOKBACK
+        for kind, model, reference in _sources():
+            rows = (
+                model.objects.filter(status_changed_at__gte=since)
+                .order_by('status_changed_at')
+                .values_list('id', 'user_id', 'status', 'status_changed_at', reference)
+            )
+            for pk, user_id, status, changed_at, reference_value in rows:
+                key = (kind, pk)
+                previous = self.last_seen.get(key)
+                self.last_seen[key] = changed_at
+                self.since = max(self.since, changed_at)
+                if previous == changed_at:
+                    continue
+                changes.append({
+                    'type': kind,
+                    'id': pk,
+                    'user': user_id,
+                    'status': status,
+                    'reference': str(reference_value),
+                    'updated_at': changed_at.isoformat(),
+                })
+        horizon = self.since - LOOKBACK
+        self.last_seen = {
+            key: seen for key, seen in self.last_seen.items() if seen >= horizon
+        }
+        changes.sort(key=lambda change: change['updated_at'])
+        return changes
+
+
+_hubs = {}
+
+
+def get_hub():
+    """The hub of the running event loop"""
+    loop = asyncio.get_running_loop()
+    hub = _hubs.get(loop)
+    if hub is None:
+        for stale in [other for other in _hubs if other.is_closed()]:
+            del _hubs[stale]
+        hub = _hubs[loop] = StatusHub()
+    return hub
+
+
+def format_event(change):
+    payload = {key: value for key, value in change.items() if key != 'user'}
+    return (
+        f"id: {change['type']}-{change['id']}-{change['updated_at']}\n"
+        f"event: status\n"
+        f"data: {json.dumps(payload)}\n\n"
+    )
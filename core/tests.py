@@ -1,3 +1,1029 @@
-from django.test import TestCase
+import asyncio
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import CommandError, call_command
+from django.db import OperationalError, connection
+from django.db.models import F
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from payments.models import Payment, WebhookEvent
+from payments.webhooks import process_events
+from bookings.forms import BookingForm
+from bookings.models import Booking as HallBooking, TableBooking, Venue as Hall
+from bookings.pricing import quote
+from restaurant.models import Category as DishCategory, MenuItem as Dish, Order
+from blog.models import BlogCategory, BlogPost as BlogArticle
+from .availability import book_slot, day_schedule, free_venues, is_slot_free, overlapping_bookings
+from .cache import get_site_settings
+from .middleware import QueryRecorder
+from .pagination import KeysetPaginator
+from .rollups import refresh_rollups, report
+from .search import fts_available, search
+from .catalog import get_menu_catalog
+from .streams import StatusHub, get_hub
+from . import thumbnails
+from .models import (
+    BlogPost, Booking, Event, FAQ, Facility, Gallery, HeroSection, MenuCategory, MenuItem,
+    BookingRollup, OrderRollup, PaymentRollup, Promotion, RollupDirtyDay, Service, SiteSettings, Slider,
+    Testimonial, Venue, VenuePhoto, VenueVideo
+)
+
+
+class HomePageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Service.objects.create(name='Decoration', description='Floral decor', icon='fas fa-leaf')
+        Venue.objects.create(
+            name='Grand Hall', venue_type='marriage_hall', description='Main hall',
+            capacity='500', price=100000, features='AC, Stage', is_featured=True,
+        )
+
+    def test_home_renders_without_queries_once_cached(self):
+        self.client.get(reverse('core:home'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('core:home'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([s.name for s in response.context['services']], ['Decoration'])
+
+    def test_save_invalidates_only_affected_section(self):
+        self.client.get(reverse('core:home'))
+        with self.captureOnCommitCallbacks(execute=True):
+            Service.objects.create(name='Photography', description='Candid shoots', icon='fas fa-camera')
+
+        # Only the services section is rebuilt
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('core:home'))
+        self.assertEqual(len(response.context['services']), 2)
+
+    def test_delete_invalidates_section(self):
+        self.client.get(reverse('core:home'))
+        with self.captureOnCommitCallbacks(execute=True):
+            Venue.objects.get(name='Grand Hall').delete()
+
+        response = self.client.get(reverse('core:home'))
+        self.assertEqual(response.context['featured_venues'], [])
+
+
+class SiteSettingsCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        SiteSettings.objects.create(site_name='Royal Palace', phone='12345')
+
+    def test_settings_loaded_once_per_version(self):
+        self.client.get(reverse('core:home'))
+        with self.assertNumQueries(0):
+            self.client.get(reverse('core:home'))
+            self.assertEqual(get_site_settings().phone, '12345')
+
+    def test_save_bumps_version(self):
+        get_site_settings()
+        settings_row = SiteSettings.objects.get()
+        settings_row.phone = '67890'
+        with self.captureOnCommitCallbacks(execute=True):
+            settings_row.save()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(get_site_settings().phone, '67890')
+
+    def test_context_processor_exposes_settings(self):
+        response = self.client.get(reverse('accounts:login'))
+        self.assertEqual(response.context['site_settings'].site_name, 'Royal Palace')
+
+
+class AnonymousPageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Facility.objects.create(name='Parking', description='200 cars', icon='fas fa-car')
+
+    def test_anonymous_page_served_from_cache(self):
+        self.client.get(reverse('core:facilities'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('core:facilities'))
+        self.assertContains(response, 'Parking')
+
+    def test_model_change_bumps_version(self):
+        self.client.get(reverse('core:facilities'))
+        with self.captureOnCommitCallbacks(execute=True):
+            Facility.objects.create(name='Valet', description='Valet parking', icon='fas fa-key')
+        response = self.client.get(reverse('core:facilities'))
+        self.assertEqual(len(response.context['facilities']), 2)
+
+    def test_versions_move_only_once_committed(self):
+        self.client.get(reverse('core:facilities'))
+        with self.captureOnCommitCallbacks() as callbacks:
+            Facility.objects.create(name='Valet', description='Valet parking', icon='fas fa-key')
+            # A request before the commit is still served the cached page
+            with self.assertNumQueries(0):
+                self.client.get(reverse('core:facilities'))
+        self.assertTrue(callbacks)
+        for callback in callbacks:
+            callback()
+        response = self.client.get(reverse('core:facilities'))
+        self.assertEqual(len(response.context['facilities']), 2)
+
+    def test_logged_in_users_bypass_cache(self):
+        User.objects.create_user('guest', password='secret')
+        self.client.get(reverse('core:facilities'))
+        self.client.login(username='guest', password='secret')
+        response = self.client.get(reverse('core:facilities'))
+        self.assertIsNotNone(response.context)
+
+    def test_catering_page_lists_available_popular_items(self):
+        category = MenuCategory.objects.create(name='Mains')
+        MenuItem.objects.create(category=category, name='Dal Makhani', description='Slow cooked', price=300, is_popular=True)
+        MenuItem.objects.create(category=category, name='Biryani', description='Off today', price=400, is_popular=True, is_available=False)
+        response = self.client.get(reverse('core:catering'))
+        self.assertContains(response, 'Dal Makhani')
+        self.assertNotContains(response, 'Biryani')
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Query plan assertions are SQLite specific')
+class ListingIndexTests(TestCase):
+    """The hot listing queries must be answered from an index in order"""
+
+    def assertIndexedListing(self, queryset):
+        plan = queryset.explain()
+        self.assertIn('USING INDEX', plan, plan)
+        self.assertNotIn('TEMP B-TREE', plan, plan)
+
+    def test_listing_queries_use_indexes(self):
+        listings = [
+            HeroSection.objects.filter(is_active=True),
+            Slider.objects.filter(is_active=True),
+            Service.objects.filter(is_active=True)[:6],
+            Facility.objects.filter(is_active=True)[:6],
+            Venue.objects.filter(is_active=True),
+            Venue.objects.filter(is_active=True, is_featured=True)[:3],
+            Venue.objects.filter(venue_type='marriage_hall', is_active=True),
+            Testimonial.objects.filter(is_active=True),
+            Testimonial.objects.filter(is_active=True, is_featured=True)[:6],
+            Testimonial.objects.filter(is_active=True, venue_id=1),
+            Gallery.objects.filter(is_active=True),
+            Gallery.objects.filter(is_active=True, is_featured=True)[:8],
+            Gallery.objects.filter(is_active=True, category='wedding'),
+            BlogPost.objects.filter(is_published=True)[:3],
+            BlogPost.objects.filter(is_published=True, category='tips'),
+            Promotion.objects.filter(is_active=True)[:3],
+            Event.objects.filter(is_active=True),
+            Event.objects.filter(is_active=True, venue_id=1),
+        ]
+        for queryset in listings:
+            with self.subTest(model=queryset.model.__name__, query=str(queryset.query)):
+                self.assertIndexedListing(queryset)
+
+
+class QueryProfilerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        log_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, log_dir)
+        self.log_path = Path(log_dir) / 'profile.jsonl'
+
+    def test_profiler_is_off_unless_enabled(self):
+        with self.settings(QUERY_PROFILER_ENABLED=False, QUERY_PROFILE_LOG=self.log_path):
+            response = self.client.get(reverse('core:home'))
+        self.assertNotIn('X-Query-Count', response)
+        self.assertFalse(self.log_path.exists())
+
+    def test_profiler_records_queries_and_reports(self):
+        with self.settings(QUERY_PROFILER_ENABLED=True, QUERY_PROFILE_LOG=self.log_path):
+            response = self.client.get(reverse('core:home'))
+            self.assertEqual(response['X-Query-Count'], '11')
+
+            record = json.loads(self.log_path.read_text())
+            self.assertEqual(record['view'], 'core:home')
+            self.assertEqual(record['queries'], 11)
+
+            out = StringIO()
+            call_command('query_report', stdout=out)
+            self.assertIn('core:home', out.getvalue())
+
+    def test_repeated_statements_flagged_as_n_plus_one(self):
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            for pk in range(3):
+                list(Service.objects.filter(pk=pk))
+        self.assertEqual(list(recorder.fingerprints.values()), [3])
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        author = User.objects.create_user('author')
+        published = timezone.now()
+        for i in range(11):
+            BlogPost.objects.create(
+                title=f'Post {i}', slug=f'post-{i}', content='...', author=author,
+                is_published=True,
+                # Ties and NULLs exercise the tie-breaker and NULL handling
+                published_at=None if i % 4 == 0 else published - timedelta(days=i // 2),
+            )
+
+    def test_pages_walk_whole_listing_in_both_directions(self):
+        expected = list(
+            BlogPost.objects.order_by(F('published_at').desc(nulls_last=True), '-created_at', 'id')
+        )
+        paginator = KeysetPaginator(BlogPost.objects.filter(is_published=True), 3)
+
+        pages = [paginator.get_page()]
+        while pages[-1].has_next():
+            with self.assertNumQueries(1):
+                pages.append(paginator.get_page(pages[-1].next_cursor))
+        self.assertEqual([post for page in pages for post in page], expected)
+        self.assertFalse(pages[0].has_previous())
+
+        back = paginator.get_page(pages[-1].previous_cursor)
+        self.assertEqual(back.object_list, pages[-2].object_list)
+
+    def test_invalid_cursor_returns_first_page(self):
+        paginator = KeysetPaginator(BlogPost.objects.all(), 3)
+        self.assertEqual(
+            paginator.get_page('forged').object_list,
+            paginator.get_page().object_list,
+        )
+
+    def test_json_endpoint_follows_cursor(self):
+        first = self.client.get(reverse('core:blog_api')).json()
+        second = self.client.get(reverse('core:blog_api'), {'cursor': first['next']}).json()
+        self.assertEqual(len(first['results']), 6)
+        self.assertEqual(len(second['results']), 5)
+        self.assertIsNone(second['next'])
+        self.assertIsNotNone(second['previous'])
+
+    @skipUnless(connection.vendor == 'sqlite', 'Query plan assertions are SQLite specific')
+    def test_deep_page_seeks_the_index(self):
+        Gallery.objects.bulk_create([
+            Gallery(title=f'Photo {i}', image=f'gallery/{i}.jpg', order=i // 3) for i in range(300)
+        ])
+        paginator = KeysetPaginator(Gallery.objects.filter(is_active=True), 12)
+        page = paginator.get_page()
+        for _ in range(20):
+            page = paginator.get_page(page.next_cursor)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(len(paginator.get_page(page.next_cursor)), 12)
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + queries[0]['sql'])
+            plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+        self.assertIn('SEARCH', plan, plan)
+        self.assertNotIn('TEMP B-TREE', plan, plan)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'FTS5 search index is SQLite-only')
+class SearchIndexTests(TestCase):
+    def setUp(self):
+        author = User.objects.create_user('author')
+        self.body_match = BlogPost.objects.create(
+            title='Planning checklist', slug='checklist', author=author, is_published=True,
+            content='Do not forget the mehndi ceremony when booking the lawn.',
+        )
+        self.title_match = BlogPost.objects.create(
+            title='Mehndi night decor ideas', slug='mehndi', author=author, is_published=True,
+            content='Colours, lights and seating.',
+        )
+        category = MenuCategory.objects.create(name='Mains')
+        self.paneer = MenuItem.objects.create(
+            name='Paneer Tikka', category=category, description='Grilled cottage cheese', price=250,
+        )
+
+    def test_index_is_installed(self):
+        self.assertTrue(fts_available())
+
+    def test_title_match_ranks_first(self):
+        results = list(search(BlogPost.objects.all(), 'mehndi'))
+        self.assertEqual(results, [self.title_match, self.body_match])
+
+    def test_prefix_and_stemmed_terms_match(self):
+        self.assertEqual(list(search(MenuItem.objects.all(), 'panee')), [self.paneer])
+        self.assertEqual(list(search(BlogPost.objects.all(), 'ceremonies')), [self.body_match])
+
+    def test_index_follows_updates_and_deletes(self):
+        MenuItem.objects.filter(pk=self.paneer.pk).update(name='Malai Kofta')
+        self.assertEqual(list(search(MenuItem.objects.all(), 'paneer')), [])
+        self.assertEqual(list(search(MenuItem.objects.all(), 'kofta')), [self.paneer])
+
+        self.paneer.delete()
+        self.assertEqual(list(search(MenuItem.objects.all(), 'kofta')), [])
+
+    def test_query_syntax_is_escaped(self):
+        self.assertEqual(list(search(BlogPost.objects.all(), 'mehndi" OR NOT *')), [])
+        self.assertEqual(search(BlogPost.objects.all(), '"*').count(), 2)
+
+    def test_faqs_are_searchable(self):
+        answer = FAQ.objects.create(question='Can we bring our own caterer?', answer='Yes, for lawn bookings.')
+        question = FAQ.objects.create(question='Is there parking for the lawn?', answer='Valet parking for 200 cars.')
+        self.assertEqual(list(search(FAQ.objects.all(), 'lawn')), [question, answer])
+        self.assertEqual(list(search(FAQ.objects.all(), 'caterers')), [answer])
+        FAQ.objects.filter(pk=answer.pk).update(answer='Only our own kitchen.')
+        self.assertEqual(list(search(FAQ.objects.all(), 'lawn')), [question])
+
+    def test_faq_page_caches_each_search_apart(self):
+        cache.clear()
+        FAQ.objects.create(question='Can we bring our own caterer?', answer='Only our own kitchen.')
+        FAQ.objects.create(question='Is there parking?', answer='Valet parking for 200 cars.')
+        self.assertContains(self.client.get(reverse('core:faq')), 'caterer')
+        response = self.client.get(reverse('core:faq'), {'search': 'parking'})
+        self.assertContains(response, 'Valet parking')
+        self.assertNotContains(response, 'caterer')
+        response = self.client.get(reverse('core:faq'), {'search': 'caterer'})
+        self.assertContains(response, 'caterer')
+        self.assertNotContains(response, 'Valet parking')
+
+    def test_blog_listing_searches_index(self):
+        response = self.client.get(reverse('core:blog_api'), {'search': 'mehndi'})
+        self.assertEqual(
+            [post['slug'] for post in response.json()['results']],
+            ['mehndi', 'checklist'],
+        )
+
+
+class AvailabilityTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('guest')
+        self.date = timezone.localdate() + timedelta(days=30)
+        self.hall = Hall.objects.create(
+            name='Grand', venue_type='hall', capacity=500, description='...',
+            price_per_day=50000, amenities='AC',
+        )
+        self.lawn = Hall.objects.create(
+            name='Rose', venue_type='lawn', capacity=200, description='...',
+            price_per_day=30000, amenities='Lights',
+        )
+        self.booking = self.book(self.hall, '10:00', '14:00')
+
+    def book(self, venue, start, end, **kwargs):
+        return HallBooking.objects.create(
+            user=self.user, venue=venue, event_type='wedding', event_date=self.date,
+            start_time=start, end_time=end, number_of_guests=100, total_amount=1000, **kwargs
+        )
+
+    def form(self, start, end, venue=None):
+        return BookingForm(data={
+            'venue': (venue or self.hall).pk, 'event_type': 'wedding', 'event_date': self.date,
+            'start_time': start, 'end_time': end, 'number_of_guests': 100,
+        })
+
+    def test_overlapping_slot_is_rejected(self):
+        form = self.form('13:00', '18:00')
+        self.assertFalse(form.is_valid())
+        self.assertIn('already booked from 10:00 to 14:00', str(form.non_field_errors()))
+
+    def test_adjacent_and_other_venue_slots_are_accepted(self):
+        self.assertTrue(self.form('14:00', '18:00').is_valid())
+        self.assertTrue(self.form('10:00', '14:00', venue=self.lawn).is_valid())
+
+    def test_cancelled_booking_frees_its_slot(self):
+        self.booking.status = 'cancelled'
+        self.booking.save()
+        self.assertTrue(self.form('10:00', '14:00').is_valid())
+
+    def test_end_must_follow_start(self):
+        form = self.form('18:00', '12:00')
+        self.assertFalse(form.is_valid())
+        self.assertIn('end_time', form.errors)
+
+    def test_slot_and_venue_queries(self):
+        self.book(self.hall, '18:00', '22:00')
+        self.assertFalse(is_slot_free(HallBooking, self.hall, self.date, '09:00', '11:00'))
+        self.assertTrue(is_slot_free(HallBooking, self.hall, self.date, '14:00', '18:00'))
+        self.assertTrue(is_slot_free(
+            HallBooking, self.hall, self.date, '09:00', '11:00', exclude=self.booking.pk,
+        ))
+        self.assertEqual(len(day_schedule(HallBooking, self.hall, self.date)), 2)
+
+        self.assertEqual(free_venues(HallBooking, self.date, 100), [self.lawn])
+        self.assertEqual(free_venues(HallBooking, self.date, 300, '14:00', '18:00'), [self.hall])
+
+    def test_core_bookings_parse_text_capacity(self):
+        venue = Venue.objects.create(name='Hall', venue_type='marriage_hall', description='...',
+                                     capacity='200-500 guests', price=1000, features='AC')
+        self.assertEqual(free_venues(Booking, self.date, 400), [venue])
+        Booking.objects.create(
+            user=self.user, venue=venue, event_type='Wedding', event_date=self.date,
+            start_time='10:00', end_time='14:00', guest_count=400, total_amount=1000,
+        )
+        self.assertEqual(free_venues(Booking, self.date, 400), [])
+        self.assertEqual(free_venues(Booking, self.date, 600), [])
+
+    @skipUnless(connection.vendor == 'sqlite', 'Query plan assertions are SQLite specific')
+    def test_conflict_check_uses_slot_index(self):
+        for model in (HallBooking, Booking):
+            plan = overlapping_bookings(model, 1, self.date, '10:00', '12:00').explain()
+            self.assertIn('_booking_slot_idx', plan, plan)
+
+    def test_create_booking_view_reports_conflict(self):
+        self.client.force_login(self.user)
+        response = self.client.post(reverse('bookings:create_booking'), {
+            'venue': self.hall.pk, 'event_type': 'birthday', 'event_date': self.date,
+            'start_time': '12:00', 'end_time': '16:00', 'number_of_guests': 50,
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(HallBooking.objects.count(), 1)
+
+        response = self.client.post(reverse('bookings:create_booking'), {
+            'venue': self.hall.pk, 'event_type': 'birthday', 'event_date': self.date,
+            'start_time': '15:00', 'end_time': '19:00', 'number_of_guests': 50,
+        })
+        self.assertRedirects(response, reverse('bookings:my_bookings'), fetch_redirect_response=False)
+        booking = HallBooking.objects.get(start_time='15:00')
+        self.assertEqual(booking.total_amount, quote(self.hall, self.date, 50).total)
+
+
+class ConcurrentBookingTests(TransactionTestCase):
+    """Simultaneous submissions for one slot: exactly one may win"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('guest')
+        self.halls = [
+            Hall.objects.create(
+                name=f'Hall {i}', venue_type='hall', capacity=500, description='...',
+                price_per_day=50000, amenities='AC',
+            )
+            for i in range(2)
+        ]
+        self.date = timezone.localdate() + timedelta(days=30)
+
+    def run_concurrently(self, slots):
+        barrier = threading.Barrier(len(slots))
+        outcomes = []
+
+        def submit(venue, start, end):
+            booking = HallBooking(
+                user=self.user, venue=venue, event_type='wedding', event_date=self.date,
+                start_time=start, end_time=end, number_of_guests=100, total_amount=1000,
+            )
+            barrier.wait()
+            try:
+                for _ in range(50):
+                    try:
+                        book_slot(booking)
+                        outcomes.append('booked')
+                        return
+                    except OperationalError:
+                        # SQLite's shared in-memory test database reports lock
+                        # contention instead of waiting; retry like a client would
+                        booking.pk = None
+                        time.sleep(0.01)
+                outcomes.append('gave up')
+            except ValidationError:
+                outcomes.append('rejected')
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=submit, args=slot) for slot in slots]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return outcomes
+
+    def test_only_one_overlapping_booking_wins(self):
+        hall = self.halls[0]
+        outcomes = self.run_concurrently([
+            (hall, f'{10 + i % 3}:00', f'{14 + i % 3}:00') for i in range(8)
+        ])
+        self.assertEqual(sorted(outcomes), ['booked'] + ['rejected'] * 7)
+        self.assertEqual(HallBooking.objects.filter(venue=hall).count(), 1)
+
+    def test_different_venues_do_not_conflict(self):
+        outcomes = self.run_concurrently([
+            (hall, '10:00', '14:00') for hall in self.halls for _ in range(3)
+        ])
+        self.assertEqual(outcomes.count('booked'), 2)
+        self.assertEqual(outcomes.count('rejected'), 4)
+        for hall in self.halls:
+            self.assertEqual(HallBooking.objects.filter(venue=hall).count(), 1)
+
+
+@override_settings(STATUS_STREAM_POLL_INTERVAL=0.01)
+class StatusStreamTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('diner')
+        self.other = User.objects.create_user('neighbour')
+        self.order = Order.objects.create(user=self.user, total_amount=100, delivery_type='pickup', phone_number='1')
+        self.other_order = Order.objects.create(user=self.other, total_amount=100, delivery_type='pickup', phone_number='1')
+
+    def set_status(self, order, status):
+        order.status = status
+        order.save()
+
+    def test_hub_reports_each_status_change_once(self):
+        hub = StatusHub()
+        hub.since = timezone.now() - timedelta(minutes=1)
+        self.assertEqual([change['id'] for change in hub.changes()], [self.order.id, self.other_order.id])
+        self.assertEqual(hub.changes(), [])
+
+        self.order.special_instructions = 'No onions'
+        self.order.save()
+        self.assertEqual(hub.changes(), [])
+
+        self.set_status(self.order, 'preparing')
+        with self.assertNumQueries(2):
+            changes = hub.changes()
+        self.assertEqual(
+            [(change['type'], change['status'], change['reference']) for change in changes],
+            [('order', 'preparing', self.order.order_number)],
+        )
+
+    def test_rows_first_seen_are_announced_only_for_a_status_change(self):
+        Order.objects.update(status_changed_at=timezone.now() - timedelta(hours=1))
+        hub = StatusHub()
+        hub.since = timezone.now()
+        order = Order.objects.get(pk=self.order.pk)
+        order.special_instructions = 'Extra napkins'
+        order.save()
+        self.assertEqual(hub.changes(), [])
+        self.set_status(order, 'confirmed')
+        self.assertEqual([change['status'] for change in hub.changes()], ['confirmed'])
+
+    async def test_hub_keeps_polling_after_a_database_error(self):
+        change = {'type': 'order', 'id': 1, 'user': self.user.id, 'status': 'ready',
+                  'reference': 'X', 'updated_at': ''}
+        results = [OperationalError('database is locked'), [change]]
+
+        def changes():
+            result = results.pop(0) if results else []
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        hub = StatusHub()
+        with mock.patch.object(hub, 'changes', changes), self.assertLogs('core.streams', 'ERROR'):
+            queue = hub.subscribe(self.user.id)
+            self.assertEqual(await asyncio.wait_for(queue.get(), 2), change)
+        poller = hub.task
+        hub.unsubscribe(self.user.id, queue)
+        await asyncio.wait_for(poller, 1)
+
+    def test_stream_requires_login(self):
+        self.assertEqual(self.client.get(reverse('core:status_stream')).status_code, 401)
+
+    async def test_stream_pushes_only_own_changes(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('core:status_stream'))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        chunks = asyncio.Queue()
+
+        async def consume():
+            async for chunk in response.streaming_content:
+                await chunks.put(chunk)
+
+        # Stands in for the ASGI server, which cancels the stream on disconnect
+        consumer = asyncio.create_task(consume())
+        self.assertEqual(await asyncio.wait_for(chunks.get(), 2), b'retry: 5000\n\n')
+
+        # Seen on the hub's first poll, then only real status changes follow
+        first = await asyncio.wait_for(chunks.get(), 2)
+        self.assertIn(b'"status": "pending"', first)
+
+        await sync_to_async(self.set_status)(self.other_order, 'ready')
+        await sync_to_async(self.set_status)(self.order, 'confirmed')
+        event = await asyncio.wait_for(chunks.get(), 2)
+        self.assertIn(b'event: status', event)
+        self.assertIn(f'"id": {self.order.id}'.encode(), event)
+        self.assertIn(b'"status": "confirmed"', event)
+
+        hub = get_hub()
+        poller = hub.task
+        consumer.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await consumer
+        self.assertEqual(dict(hub.subscribers), {})
+        await asyncio.wait_for(poller, 1)
+        self.assertIsNone(hub.task)
+
+
+class MenuCatalogTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.starters = MenuCategory.objects.create(name='Starters', order=1)
+        self.mains = MenuCategory.objects.create(name='Mains', order=2)
+        self.paneer = MenuItem.objects.create(name='Paneer Tikka', category=self.starters, description='Grilled',
+                                              price=250, is_vegetarian=True, is_spicy=True)
+        MenuItem.objects.create(name='Chicken 65', category=self.starters, description='Fried', price=300,
+                                is_spicy=True)
+        MenuItem.objects.create(name='Dal Makhani', category=self.mains, description='Lentils', price=200,
+                                is_vegetarian=True)
+        MenuItem.objects.create(name='Sold out', category=self.mains, description='...', price=1,
+                                is_available=False)
+
+        dishes = DishCategory.objects.create(name='Desserts')
+        Dish.objects.create(name='Gulab Jamun', description='Sweet', price=80, category=dishes,
+                            food_type='dessert')
+
+    def names(self, response):
+        return [item['name'] for category in response.json()['categories'] for item in category['items']]
+
+    def test_snapshot_is_built_once_per_version(self):
+        with self.assertNumQueries(2):
+            catalog = get_menu_catalog('core')
+        with self.assertNumQueries(0):
+            self.assertIs(get_menu_catalog('core'), catalog)
+        self.assertEqual(
+            [(c['name'], [i['name'] for i in c['items']]) for c in catalog['categories']],
+            [('Starters', ['Chicken 65', 'Paneer Tikka']), ('Mains', ['Dal Makhani'])],
+        )
+
+    def test_menu_changes_rebuild_snapshot(self):
+        before = get_menu_catalog('core')
+        self.paneer.price = 275
+        with self.captureOnCommitCallbacks(execute=True):
+            self.paneer.save()
+        after = get_menu_catalog('core')
+        self.assertNotEqual(after['version'], before['version'])
+        self.assertEqual(after['categories'][0]['items'][1]['price'], '275.00')
+
+        restaurant = get_menu_catalog('restaurant')
+        with self.captureOnCommitCallbacks(execute=True):
+            Dish.objects.get().delete()
+        self.assertEqual(get_menu_catalog('restaurant')['categories'][0]['items'], [])
+        self.assertNotEqual(get_menu_catalog('restaurant')['version'], restaurant['version'])
+
+    def test_filters_run_against_snapshot(self):
+        url = reverse('core:menu_api')
+        get_menu_catalog('core')
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {'vegetarian': '1'})
+        self.assertEqual(self.names(response), ['Paneer Tikka', 'Dal Makhani'])
+        self.assertEqual(self.names(self.client.get(url, {'vegetarian': '1', 'spicy': '1'})), ['Paneer Tikka'])
+        self.assertEqual(self.names(self.client.get(url, {'category': self.mains.id})), ['Dal Makhani'])
+        self.assertEqual(self.names(self.client.get(url, {'search': 'lentil'})), ['Dal Makhani'])
+
+    def test_restaurant_menu_api(self):
+        response = self.client.get(reverse('restaurant:menu_api'))
+        item = response.json()['categories'][0]['items'][0]
+        self.assertEqual((item['name'], item['price'], item['vegetarian']), ('Gulab Jamun', '80.00', False))
+
+
+class ReportingRollupTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('owner', is_staff=True, is_superuser=True)
+        self.day = date(2026, 3, 14)
+        self.hall = Hall.objects.create(name='Grand Hall', venue_type='hall', capacity=500, description='...',
+                                        price_per_day=50000, amenities='AC')
+        self.lawn = Venue.objects.create(name='Lawn', venue_type='garden', description='...', capacity='300',
+                                         price=30000, features='Open air')
+        for guests in (100, 200):
+            HallBooking.objects.create(
+                user=self.user, venue=self.hall, event_type='wedding', event_date=self.day, start_time='10:00',
+                end_time='14:00', number_of_guests=guests, total_amount=50000, advance_payment=10000,
+            )
+        Booking.objects.create(user=self.user, venue=self.lawn, event_type='Party', event_date=self.day,
+                               start_time='18:00', end_time='22:00', guest_count=80, total_amount=30000)
+        Payment.objects.create(user=self.user, amount=10000, payment_method='upi', status='completed')
+        Order.objects.create(user=self.user, total_amount=450, delivery_type='pickup', phone_number='1')
+
+    def test_backfill_aggregates_per_day_and_group(self):
+        refresh_rollups()
+        hall = BookingRollup.objects.get(source='hall')
+        self.assertEqual((hall.day, hall.venue_name, hall.status, hall.bookings, hall.guests),
+                         (self.day, 'Grand Hall', 'pending', 2, 300))
+        self.assertEqual((hall.revenue, hall.advance), (Decimal('100000'), Decimal('20000')))
+        self.assertEqual(BookingRollup.objects.get(source='venue').guests, 80)
+        self.assertEqual(PaymentRollup.objects.get().amount, Decimal('10000'))
+        self.assertEqual((OrderRollup.objects.get().orders, OrderRollup.objects.get().revenue), (1, Decimal('450')))
+
+    def test_refresh_recomputes_only_changed_days(self):
+        refresh_rollups()
+        # Age every row past the high-water mark and mark the lawn's rollup,
+        # which an incremental refresh must not touch
+        old = timezone.now() - timedelta(days=1)
+        for model in (HallBooking, Booking, Payment, Order):
+            model.objects.update(updated_at=old)
+        refresh_rollups(full=True)
+        BookingRollup.objects.filter(source='venue').update(bookings=99)
+
+        booking = HallBooking.objects.first()
+        booking.status = 'approved'
+        booking.save()
+        self.assertEqual(refresh_rollups()['hall_bookings'], 2)
+        self.assertEqual(
+            dict(BookingRollup.objects.filter(source='hall').values_list('status', 'bookings')),
+            {'pending': 1, 'approved': 1},
+        )
+        self.assertEqual(BookingRollup.objects.get(source='venue').bookings, 99)
+
+        # --since rebuilds from scratch from that day on
+        call_command('refresh_rollups', since=self.day.isoformat(), stdout=StringIO())
+        self.assertEqual(BookingRollup.objects.get(source='venue').bookings, 1)
+
+    def test_refresh_recomputes_days_rows_left(self):
+        refresh_rollups()
+        old = timezone.now() - timedelta(days=1)
+        for model in (HallBooking, Booking, Payment, Order):
+            model.objects.update(updated_at=old)
+        refresh_rollups(full=True)
+
+        moved, deleted = HallBooking.objects.order_by('id')
+        moved.event_date = self.day + timedelta(days=1)
+        moved.save()
+        Booking.objects.get().delete()
+        refresh_rollups()
+        self.assertEqual(
+            list(BookingRollup.objects.filter(source='hall').order_by('day').values_list('day', 'bookings')),
+            [(self.day, 1), (self.day + timedelta(days=1), 1)],
+        )
+        self.assertFalse(BookingRollup.objects.filter(source='venue').exists())
+
+        deleted.delete()
+        refresh_rollups()
+        self.assertEqual(list(BookingRollup.objects.filter(source='hall').values_list('day', flat=True)),
+                         [self.day + timedelta(days=1)])
+        self.assertFalse(RollupDirtyDay.objects.exists())
+
+    def test_dashboard_reads_only_rollups(self):
+        refresh_rollups()
+        with CaptureQueriesContext(connection) as queries:
+            data = report(date(2026, 1, 1), date(2026, 12, 31))
+        self.assertTrue(all('rollup' in query['sql'].lower() for query in queries))
+        venues = {venue['venue_name']: venue for venue in data['venues']}
+        self.assertEqual((venues['Grand Hall']['days'], venues['Grand Hall']['count']), (1, 2))
+
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('admin:core_rollupstate_changelist'), {'months': 36})
+        self.assertContains(response, 'Grand Hall')
+
+    @override_settings(PAYMENT_WEBHOOK_THREAD=False)
+    def test_webhook_credit_reaches_the_rollup(self):
+        refresh_rollups()
+        # Age the bookings past the high-water mark's lookback
+        HallBooking.objects.update(updated_at=timezone.now() - timedelta(days=1))
+        refresh_rollups(full=True)
+        booking = HallBooking.objects.first()
+        Payment.objects.create(user=self.user, booking=booking, amount=5000, payment_method='upi',
+                               transaction_id='ref-credit')
+        WebhookEvent.objects.create(gateway='acme', event_id='e1',
+                                    payload={'status': 'completed', 'reference': 'ref-credit', 'amount': 5000})
+        process_events()
+        refresh_rollups()
+        self.assertEqual(BookingRollup.objects.get(source='hall').advance, Decimal('25000'))
+
+
+class AdminMetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('manager', is_staff=True, is_superuser=True)
+        self.today = timezone.localdate()
+        self.hall = Hall.objects.create(name='Grand Hall', venue_type='hall', capacity=500, description='...',
+                                        price_per_day=50000, amenities='AC')
+        HallBooking.objects.create(
+            user=self.user, venue=self.hall, event_type='wedding', event_date=self.today, start_time='10:00',
+            end_time='14:00', number_of_guests=200, total_amount=50000, status='approved',
+        )
+        HallBooking.objects.create(
+            user=self.user, venue=self.hall, event_type='birthday', event_date=self.today + timedelta(days=3),
+            start_time='18:00', end_time='22:00', number_of_guests=50, total_amount=20000,
+        )
+        Payment.objects.create(user=self.user, amount=10000, payment_method='upi', status='completed')
+        Order.objects.create(user=self.user, total_amount=450, delivery_type='pickup', phone_number='1')
+        self.client.force_login(self.user)
+
+    def test_index_shows_operational_figures(self):
+        response = self.client.get(reverse('admin:index'))
+        metrics = response.context['metrics']
+        self.assertEqual((metrics['events_today'], metrics['upcoming'], metrics['pending_halls']), (1, 1, 1))
+        self.assertEqual((metrics['orders_pending'], metrics['revenue_month']), (1, Decimal('10000')))
+        self.assertContains(response, 'Grand Hall')
+        self.assertContains(response, 'id="operational-metrics"')
+        self.assertIn('app_list', response.context)
+
+    def test_figures_are_cached_until_a_source_changes(self):
+        self.client.get(reverse('admin:index'))
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('admin:index'))
+        self.assertFalse(any('restaurant_order' in query['sql'] for query in queries))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Order.objects.create(user=self.user, total_amount=90, delivery_type='pickup', phone_number='2')
+        response = self.client.get(reverse('admin:index'))
+        self.assertEqual(response.context['metrics']['orders_pending'], 2)
+
+
+class AdminChangelistQueryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('owner', is_staff=True, is_superuser=True)
+        self.users = [self.user] + [User.objects.create_user(f'guest{i}') for i in range(3)]
+        self.venues = [
+            Venue.objects.create(name=f'Lawn {i}', venue_type='garden', description='...', capacity='300',
+                                 price=30000, features='Open air')
+            for i in range(3)
+        ]
+        self.hall = Hall.objects.create(name='Grand Hall', venue_type='hall', capacity=500, description='...',
+                                        price_per_day=50000, amenities='AC')
+        self.menu = MenuCategory.objects.create(name='Starters')
+        self.dishes = DishCategory.objects.create(name='Mains')
+        self.topics = BlogCategory.objects.create(name='News', slug='news')
+        self.day = date(2026, 3, 14)
+        self.client.force_login(self.user)
+        # The photo rows point at files that do not exist
+        quiet = logging.getLogger('core.thumbnails')
+        quiet.disabled = True
+        self.addCleanup(setattr, quiet, 'disabled', False)
+
+    def _rows(self, model, build, start, stop):
+        model.objects.bulk_create([build(i) for i in range(start, stop)])
+
+    def _queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_changelists_run_a_fixed_number_of_queries(self):
+        user = lambda i: self.users[i % len(self.users)]
+        venue = lambda i: self.venues[i % len(self.venues)]
+        changelists = {
+            'core_booking': (Booking, lambda i: Booking(
+                user=user(i), venue=venue(i), event_type='Party', event_date=self.day, start_time='10:00',
+                end_time='12:00', guest_count=50, total_amount=1000)),
+            'core_venuephoto': (VenuePhoto, lambda i: VenuePhoto(venue=venue(i), image=f'venue_photos/{i}.jpg')),
+            'core_venuevideo': (VenueVideo, lambda i: VenueVideo(venue=venue(i), title=f'Tour {i}')),
+            'core_menucategory': (MenuCategory, lambda i: MenuCategory(name=f'Category {i}')),
+            'core_menuitem': (MenuItem, lambda i: MenuItem(
+                name=f'Dish {i}', category=self.menu, description='...', price=100)),
+            'core_testimonial': (Testimonial, lambda i: Testimonial(
+                author_name=f'Guest {i}', content='Lovely', rating=5, venue=venue(i))),
+            'core_gallery': (Gallery, lambda i: Gallery(title=f'Photo {i}', image=f'gallery/{i}.jpg', venue=venue(i))),
+            'core_event': (Event, lambda i: Event(
+                title=f'Event {i}', description='...', event_date=self.day, event_time='18:00', venue=venue(i))),
+            'core_blogpost': (BlogPost, lambda i: BlogPost(title=f'Post {i}', slug=f'post-{i}', content='...',
+                                                           author=user(i))),
+            'bookings_booking': (HallBooking, lambda i: HallBooking(
+                user=user(i), venue=self.hall, event_type='wedding', event_date=self.day, start_time='10:00',
+                end_time='12:00', number_of_guests=50, total_amount=1000)),
+            'bookings_tablebooking': (TableBooking, lambda i: TableBooking(
+                user=user(i), table_number=1, booking_date=self.day, booking_time='19:00', number_of_guests=2)),
+            'restaurant_menuitem': (Dish, lambda i: Dish(
+                name=f'Dish {i}', description='...', price=100, category=self.dishes, food_type='veg')),
+            'restaurant_order': (Order, lambda i: Order(
+                user=user(i), order_number=f'ORD{i:05d}', total_amount=100, delivery_type='pickup', phone_number='1')),
+            'payments_payment': (Payment, lambda i: Payment(user=user(i), amount=100, payment_method='upi')),
+            'blog_blogpost': (BlogArticle, lambda i: BlogArticle(
+                title=f'Post {i}', slug=f'post-{i}', author=user(i), category=self.topics, content='...')),
+        }
+        for name, (model, build) in changelists.items():
+            with self.subTest(changelist=name):
+                url = reverse(f'admin:{name}_changelist')
+                self._rows(model, build, 0, 1)
+                # The first request also loads caches shared by every page
+                self._queries(url)
+                single = self._queries(url)
+                self._rows(model, build, 1, 100)
+                self.assertEqual(self._queries(url), single)
+
+    def test_menu_category_item_count_is_annotated(self):
+        MenuItem.objects.bulk_create([
+            MenuItem(name=f'Dish {i}', category=self.menu, description='...', price=100) for i in range(3)
+        ])
+        response = self.client.get(reverse('admin:core_menucategory_changelist'))
+        self.assertEqual(response.context['cl'].result_list[0].item_total, 3)
+
+
+class ThumbnailTests(TestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media)
+        override.enable()
+        self.addCleanup(override.disable)
+        thumbnails._known.clear()
+        thumbnails._unreadable.clear()
+        self.user = User.objects.create_user('owner', is_staff=True, is_superuser=True)
+
+    def _photo(self, title, size=(2400, 1600)):
+        output = BytesIO()
+        Image.new('RGB', size, 'white').save(output, 'JPEG')
+        photo = Gallery(title=title)
+        photo.image.save(f'{title}.jpg', ContentFile(output.getvalue()), save=True)
+        return photo
+
+    def test_changelist_previews_use_small_derivatives(self):
+        photo = self._photo('hall')
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('admin:core_gallery_changelist'))
+        url = thumbnails.thumbnail_url(photo.image)
+        self.assertIn('/thumbnails/100/gallery/hall-', url)
+        self.assertContains(response, url)
+        self.assertNotContains(response, photo.image.url + '"')
+
+        name = url[len(settings.MEDIA_URL):]
+        with default_storage.open(name) as stored, Image.open(stored) as thumbnail:
+            self.assertEqual(thumbnail.size, (100, 67))
+        self.assertLess(default_storage.size(name), default_storage.size(photo.image.name))
+
+    def test_replaced_original_gets_a_new_thumbnail(self):
+        photo = self._photo('lawn')
+        first = thumbnails.thumbnail_url(photo.image)
+        path = photo.image.path
+        os.utime(path, (time.time() + 60, time.time() + 60))
+        self.assertNotEqual(thumbnails.thumbnail_url(photo.image), first)
+
+    def test_unreadable_original_falls_back_to_its_url(self):
+        photo = Gallery.objects.create(title='missing', image='gallery/missing.jpg')
+        with self.assertLogs('core.thumbnails', 'WARNING'):
+            self.assertEqual(thumbnails.thumbnail_url(photo.image), photo.image.url)
+
+        # Remembered: no more storage calls or warnings for it
+        with mock.patch('django.core.files.storage.FileSystemStorage.get_modified_time') as stat, \
+                self.assertNoLogs('core.thumbnails'):
+            self.assertEqual(thumbnails.thumbnail_url(photo.image), photo.image.url)
+        stat.assert_not_called()
+
+
+TINY_PROFILE = {
+    'users': 60, 'venues': 8, 'venue_photos': 12, 'core_bookings': 20,
+    'hall_bookings': 20, 'table_bookings': 40, 'tables': 9,
+    'menu_categories': 2, 'menu_items': 10, 'orders': 15,
+    'gallery': 5, 'blog_posts': 5, 'testimonials': 5,
+}
+
+
+@mock.patch.dict('core.management.commands.seed_scale.PROFILES', {'tiny': TINY_PROFILE})
+class SeedScaleTests(TestCase):
+    def test_seeds_every_app_with_related_rows(self):
+        call_command('seed_scale', profile='tiny', batch_size=7, stdout=StringIO())
+        self.assertEqual(User.objects.count(), 60)
+        self.assertEqual(Booking.objects.count(), 20)
+        self.assertEqual(HallBooking.objects.count(), 20)
+        self.assertEqual(Order.objects.count(), 15)
+        self.assertEqual(BlogArticle.objects.count(), 5)
+        self.assertTrue(all(order.orderitem_set.exists() for order in Order.objects.all()))
+
+        # Table bookings are seated as the allocator would seat them
+        self.assertEqual(TableBooking.objects.count(), 40)
+        for booking in TableBooking.objects.prefetch_related('tables'):
+            tables = sorted(booking.tables.all(), key=lambda table: table.table_number)
+            self.assertTrue(tables)
+            self.assertEqual(tables[0].table_number, booking.table_number)
+            self.assertEqual(len({table.location for table in tables}), 1)
+            self.assertLessEqual(booking.number_of_guests, sum(table.capacity for table in tables))
+
+    def test_refuses_to_seed_over_data(self):
+        User.objects.create_user('existing')
+        with self.assertRaises(CommandError):
+            call_command('seed_scale', profile='tiny', stdout=StringIO())
+
+
+@override_settings(ALLOWED_HOSTS=['localhost', 'testserver'])
+class BenchCommandTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        FAQ.objects.create(question='Is there parking?', answer='Valet parking.')
+        output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output_dir)
+        self.baseline = Path(output_dir) / 'baseline.json'
+
+    def bench(self, *args, **options):
+        out = StringIO()
+        call_command('bench', *args, requests=2, warmup=0, mode='anon', verbosity=2,
+                     stdout=out, stderr=StringIO(), **options)
+        return out.getvalue()
+
+    def test_runs_urls_and_compares_to_a_baseline(self):
+        out = self.bench(views=['core:faq', 'core:facilities'], output=str(self.baseline))
+        self.assertIn('core:faq', out)
+        results = json.loads(self.baseline.read_text())['results']
+        self.assertEqual(set(results), {'core:faq|anon', 'core:facilities|anon'})
+        self.assertEqual((results['core:faq|anon']['status'], results['core:faq|anon']['non_2xx']), (200, 0))
+
+        self.assertIn('No regressions', self.bench(views=['core:faq'], compare=str(self.baseline)))
+
+        report = json.loads(self.baseline.read_text())
+        report['results']['core:faq|anon']['queries'] = -1
+        self.baseline.write_text(json.dumps(report))
+        with self.assertRaisesMessage(CommandError, 'core:faq|anon: queries -1'):
+            self.bench(views=['core:faq'], compare=str(self.baseline))
+
+    def test_any_failed_sample_is_flagged(self):
+        self.bench(views=['core:faq'], output=str(self.baseline))
+        ok = self.client.get(reverse('core:faq'))
+        failed = mock.Mock(status_code=500, streaming=False, content=b'error')
+        with mock.patch('core.management.commands.bench.Client.get', side_effect=[failed, ok]):
+            out = self.bench(views=['core:faq'], output=str(self.baseline) + '.new')
+        self.assertIn('1/2 non-2xx', out)
+        self.assertEqual(json.loads(Path(str(self.baseline) + '.new').read_text())['results']['core:faq|anon']['status'], 500)
+
+        with mock.patch('core.management.commands.bench.Client.get', side_effect=[ok, failed]):
+            with self.assertRaisesMessage(CommandError, 'core:faq|anon: status 200 -> 500'):
+                self.bench(views=['core:faq'], compare=str(self.baseline))
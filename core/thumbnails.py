@@ -0,0 +1,93 @@
+import hashlib
+import logging
+import threading
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+# ============================================================================
+# THUMBNAILS
+# ============================================================================
+#
+# Small derivatives of uploaded images, for listings that show dozens of
+# them at a few pixels wide (the admin changelists). A derivative is stored
+# next to the uploads under THUMBNAIL_DIR, named after the original's file
+# name, modified time and the thumbnail size, so replacing an image (or
+# changing the size) yields a new name and a stale thumbnail is never
+# served. It is made on first request and found with one stat afterwards;
+# this process also remembers the names it has seen, so a changelist costs
+# one stat per image. The directory is disposable: deleting it only means
+# the thumbnails are made again (by each process after its restart).
+#
+# When an original cannot be read (missing file, not an image) its own URL
+# is used instead; the process remembers that too, so a broken row is only
+# looked at (and warned about) once.
+
+logger = logging.getLogger('core.thumbnails')
+
+DEFAULT_RULES = {
+    # Longest side in pixels; twice the 50px previews, for high-DPI screens
+    'SIZE': 100,
+    'QUALITY': 80,
+}
+
+THUMBNAIL_DIR = 'thumbnails'
+
+# Sources saved as PNG to keep their transparency; the rest become JPEG
+ALPHA_SUFFIXES = {'.png', '.gif', '.webp'}
+
+_known = {}
+_unreadable = set()
+_known_lock = threading.Lock()
+
+
+def thumbnail_rules():
+    return {**DEFAULT_RULES, **getattr(settings, 'THUMBNAILS', {})}
+
+
+def thumbnail_name(name, modified, size):
+    """Storage name of the derivative of an original at one mtime and size"""
+    source = PurePosixPath(name)
+    digest = hashlib.sha1(f'{name}:{modified.timestamp()}:{size}'.encode()).hexdigest()[:12]
+    suffix = '.png' if source.suffix.lower() in ALPHA_SUFFIXES else '.jpg'
+    return str(PurePosixPath(THUMBNAIL_DIR, str(size), source.parent, f'{source.stem}-{digest}{suffix}'))
+
+
+def _render(storage, name, target, rules):
+    with storage.open(name, 'rb') as original:
+        image = ImageOps.exif_transpose(Image.open(original))
+        image.thumbnail((rules['SIZE'], rules['SIZE']))
+    output = BytesIO()
+    if target.endswith('.png'):
+        image.convert('RGBA').save(output, 'PNG', optimize=True)
+    else:
+        image.convert('RGB').save(output, 'JPEG', quality=rules['QUALITY'], optimize=True)
+    return storage.save(target, ContentFile(output.getvalue()))
+
+
+def thumbnail_url(field, rules=None):
+    """URL of a small derivative of an image field's file, made if missing"""
+    if not field:
+        return None
+    rules = rules or thumbnail_rules()
+    storage, name = field.storage, field.name
+    with _known_lock:
+        if name in _unreadable:
+            return field.url
+    try:
+        target = thumbnail_name(name, storage.get_modified_time(name), rules['SIZE'])
+        with _known_lock:
+            saved = _known.get(target)
+        if saved is None:
+            saved = target if storage.exists(target) else _render(storage, name, target, rules)
+            with _known_lock:
+                _known[target] = saved
+    except (OSError, UnidentifiedImageError, ValueError, NotImplementedError) as error:
+        logger.warning('No thumbnail for %s: %s', name, error)
+        with _known_lock:
+            _unreadable.add(name)
+        return field.url
+    return storage.url(saved)
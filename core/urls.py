@@ -17,6 +17,7 @@ urlpatterns = [
     # Restaurant & Catering
     path('catering/', views.catering, name='catering'),
     path('menu/', views.menu, name='menu'),
+    path('api/menu/', views.menu_api, name='menu_api'),
     
     # Content
     path('testimonials/', views.testimonials, name='testimonials'),
@@ -24,4 +25,12 @@ urlpatterns = [
     path('blog/<slug:blog_slug>/', views.blog_detail, name='blog_detail'),
     path('faq/', views.faq, name='faq'),
     path('events/', views.events, name='events'),
+    
+    # JSON listings (cursor paginated)
+    path('api/gallery/', views.gallery_api, name='gallery_api'),
+    path('api/testimonials/', views.testimonials_api, name='testimonials_api'),
+    path('api/blog/', views.blog_api, name='blog_api'),
+    
+    # Live order/booking status (server-sent events; needs an ASGI server)
+    path('api/status-stream/', views.status_stream, name='status_stream'),
 ]
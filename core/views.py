@@ -1,72 +1,41 @@
+import asyncio
+
+from django.conf import settings
 from django.shortcuts import render, get_object_or_404
 from django.contrib import messages
 from django.core.paginator import Paginator
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from .models import (
-    SiteSettings, HeroSection, AboutSection, Service, Facility,
-    Venue, VenuePhoto, VenueVideo, Booking,
+    AboutSection, Service, Facility,
+    Venue, VenuePhoto, VenueVideo,
     CateringPackage, MenuCategory, MenuItem,
     Testimonial, Gallery, FAQ, BlogPost,
-    Slider, Promotion, Event
+    Event
 )
+from .cache import anonymous_page_cache, get_home_sections, get_site_settings
+from .catalog import catalog_items, filter_catalog, get_menu_catalog, request_filters
+from .pagination import KeysetPage, KeysetPaginator
+from .search import search
+from .streams import format_event, get_hub
 
 def home(request):
     """Homepage with slider, sections, and highlights"""
-    # Get site settings
-    site_settings = SiteSettings.objects.first()
-    
-    # Get hero sections
-    hero_sections = HeroSection.objects.filter(is_active=True)
+    # All homepage sections come from the signal-invalidated section cache
+    sections = get_home_sections()
     
-    # Get sliders
-    sliders = Slider.objects.filter(is_active=True)
-    
-    # Get services
-    services = Service.objects.filter(is_active=True)[:6]
-    
-    # Get facilities
-    facilities = Facility.objects.filter(is_active=True)[:6]
-    
-    # Get featured venues
-    featured_venues = Venue.objects.filter(is_active=True, is_featured=True)[:3]
-    
-    # Get testimonials
-    testimonials = Testimonial.objects.filter(is_active=True, is_featured=True)[:6]
-    
-    # Get gallery images
-    gallery_images = Gallery.objects.filter(is_active=True, is_featured=True)[:8]
-    
-    # Get latest blog posts
-    latest_posts = BlogPost.objects.filter(is_published=True)[:3]
-    
-    # Get active promotions
-    promotions = Promotion.objects.filter(is_active=True)[:3]
+    context = dict(sections)
+    context['site_settings'] = get_site_settings()
     
     # Provide compatibility aliases for existing templates
-    sections = hero_sections
-    packages = CateringPackage.objects.filter(is_active=True)[:3]
-    featured_images = gallery_images
-    
-    context = {
-        'site_settings': site_settings,
-        'hero_sections': hero_sections,
-        'sections': sections,
-        'sliders': sliders,
-        'services': services,
-        'facilities': facilities,
-        'featured_venues': featured_venues,
-        'testimonials': testimonials,
-        'gallery_images': gallery_images,
-        'featured_images': featured_images,
-        'latest_posts': latest_posts,
-        'promotions': promotions,
-        'packages': packages,
-    }
+    context['sections'] = sections['hero_sections']
+    context['featured_images'] = sections['gallery_images']
     return render(request, 'core/home.html', context)
 
+@anonymous_page_cache(AboutSection, Service, Facility, Testimonial)
 def about(request):
     """About us page with history, mission, and facilities"""
     # Get site settings
-    site_settings = SiteSettings.objects.first()
+    site_settings = get_site_settings()
     
     # Get about section
     about_section = AboutSection.objects.filter(is_active=True).first()
@@ -96,7 +65,7 @@ def about(request):
 def contact(request):
     """Contact page with form, map, and contact info"""
     # Get site settings for contact info
-    site_settings = SiteSettings.objects.first()
+    site_settings = get_site_settings()
     contact_info = site_settings  # compatibility alias
     
     if request.method == 'POST':
@@ -125,7 +94,7 @@ def venues(request):
 def venue_detail(request, venue_slug):
     """Individual venue detail page"""
     # Get site settings
-    site_settings = SiteSettings.objects.first()
+    site_settings = get_site_settings()
     
     # Get venue
     venue = get_object_or_404(Venue, slug=venue_slug, is_active=True)
@@ -158,10 +127,11 @@ def venue_detail(request, venue_slug):
     }
     return render(request, 'core/venue_detail.html', context)
 
+@anonymous_page_cache(Facility, Service)
 def facilities(request):
     """Facilities page with all amenities"""
     # Get site settings
-    site_settings = SiteSettings.objects.first()
+    site_settings = get_site_settings()
     
     # Get all facilities
     facilities = Facility.objects.filter(is_active=True)
@@ -176,10 +146,11 @@ def facilities(request):
     }
     return render(request, 'core/facilities.html', context)
 
+@anonymous_page_cache(CateringPackage, MenuCategory, MenuItem)
 def catering(request):
     """Catering packages page"""
     # Get site settings
-    site_settings = SiteSettings.objects.first()
+    site_settings = get_site_settings()
     
     # Get catering packages
     packages = CateringPackage.objects.filter(is_active=True)
@@ -188,7 +159,7 @@ def catering(request):
     menu_categories = MenuCategory.objects.filter(is_active=True)
     
     # Get popular menu items
-    popular_items = MenuItem.objects.filter(is_active=True, is_popular=True)
+    popular_items = MenuItem.objects.filter(is_available=True, is_popular=True)
     
     context = {
         'site_settings': site_settings,
@@ -198,54 +169,60 @@ def catering(request):
     }
     return render(request, 'core/catering.html', context)
 
+def _filtered_menu(request):
+    """The menu snapshot narrowed by the request's filters and search"""
+    filters = request_filters(request)
+    search_query = request.GET.get('search')
+    if search_query:
+        filters['item_ids'] = list(
+            search(MenuItem.objects.filter(is_available=True), search_query).values_list('id', flat=True)
+        )
+    return filter_catalog(get_menu_catalog('core'), **filters)
+
 def menu(request):
     """Restaurant menu page"""
     # Get site settings
-    site_settings = SiteSettings.objects.first()
-    
-    # Get menu categories with items
-    categories = MenuCategory.objects.filter(is_active=True).prefetch_related('items')
-    
-    # Get all menu items
-    menu_items = MenuItem.objects.filter(is_active=True)
-    
-    # Handle filtering
-    category_id = request.GET.get('category')
-    if category_id:
-        menu_items = menu_items.filter(category_id=category_id)
-    
-    # Handle search
-    search_query = request.GET.get('search')
-    if search_query:
-        menu_items = menu_items.filter(name__icontains=search_query)
-    
-    # Handle dietary filters
-    vegetarian = request.GET.get('vegetarian')
-    if vegetarian:
-        menu_items = menu_items.filter(is_vegetarian=True)
+    site_settings = get_site_settings()
     
-    spicy = request.GET.get('spicy')
-    if spicy:
-        menu_items = menu_items.filter(is_spicy=True)
+    # Menu comes from the prebuilt catalog snapshot, filtered in memory
+    catalog = _filtered_menu(request)
     
     context = {
         'site_settings': site_settings,
-        'categories': categories,
-        'menu_items': menu_items,
-        'selected_category': category_id,
-        'search_query': search_query,
+        'categories': catalog['categories'],
+        'menu_items': catalog_items(catalog),
+        'selected_category': request.GET.get('category'),
+        'search_query': request.GET.get('search'),
     }
     return render(request, 'core/menu.html', context)
 
-def gallery(request):
-    """Photo gallery page"""
-    # Get site settings
-    site_settings = SiteSettings.objects.first()
-    
-    # Get gallery images
+def menu_api(request):
+    """Menu snapshot as JSON, with the same filters as the menu page"""
+    return JsonResponse(_filtered_menu(request))
+
+def _paginate(request, queryset, per_page):
+    """Page through a listing by cursor, or by page number for old links"""
+    page_number = request.GET.get('page')
+    # Search results are ordered by rank, which has no keyset to seek on
+    if page_number or request.GET.get('search'):
+        return Paginator(queryset, per_page).get_page(page_number)
+    return KeysetPaginator(queryset, per_page).get_page(request.GET.get('cursor'))
+
+def _cursor_json(page, serialize):
+    """JSON payload for one keyset page"""
+    return JsonResponse({
+        'results': [serialize(obj) for obj in page],
+        'next': page.next_cursor,
+        'previous': page.previous_cursor,
+    })
+
+def _image_url(image):
+    return image.url if image else None
+
+def _gallery_images(request):
+    """Active gallery images narrowed by the request's filters"""
     images = Gallery.objects.filter(is_active=True)
     
-    # Handle filtering
     category = request.GET.get('category')
     if category:
         images = images.filter(category=category)
@@ -253,11 +230,18 @@ def gallery(request):
     event_type = request.GET.get('event_type')
     if event_type:
         images = images.filter(event_type=event_type)
+    return images
+
+def gallery(request):
+    """Photo gallery page"""
+    # Get site settings
+    site_settings = get_site_settings()
+    
+    # Get gallery images
+    images = _gallery_images(request)
     
     # Pagination
-    paginator = Paginator(images, 12)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = _paginate(request, images, 12)
     
     # Get unique categories and event types for filtering
     categories = Gallery.objects.filter(is_active=True).values_list('category', flat=True).distinct()
@@ -268,20 +252,28 @@ def gallery(request):
         'page_obj': page_obj,
         'categories': categories,
         'event_types': event_types,
-        'selected_category': category,
-        'selected_event_type': event_type,
+        'selected_category': request.GET.get('category'),
+        'selected_event_type': request.GET.get('event_type'),
     }
     return render(request, 'core/gallery.html', context)
 
-def testimonials(request):
-    """Testimonials page"""
-    # Get site settings
-    site_settings = SiteSettings.objects.first()
-    
-    # Get testimonials
+def gallery_api(request):
+    """Gallery images as JSON, one cursor page at a time"""
+    page = KeysetPaginator(_gallery_images(request), 12).get_page(request.GET.get('cursor'))
+    return _cursor_json(page, lambda image: {
+        'id': image.id,
+        'title': image.title,
+        'description': image.description,
+        'image': _image_url(image.image),
+        'category': image.category,
+        'event_type': image.event_type,
+        'venue_id': image.venue_id,
+    })
+
+def _testimonial_list(request):
+    """Active testimonials narrowed by the request's filters"""
     testimonials = Testimonial.objects.filter(is_active=True)
     
-    # Handle filtering
     venue_id = request.GET.get('venue')
     if venue_id:
         testimonials = testimonials.filter(venue_id=venue_id)
@@ -289,11 +281,18 @@ def testimonials(request):
     rating = request.GET.get('rating')
     if rating:
         testimonials = testimonials.filter(rating=rating)
+    return testimonials
+
+def testimonials(request):
+    """Testimonials page"""
+    # Get site settings
+    site_settings = get_site_settings()
+    
+    # Get testimonials
+    testimonials = _testimonial_list(request)
     
     # Pagination
-    paginator = Paginator(testimonials, 9)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = _paginate(request, testimonials, 9)
     
     # Get venues for filtering
     venues = Venue.objects.filter(is_active=True)
@@ -302,33 +301,48 @@ def testimonials(request):
         'site_settings': site_settings,
         'page_obj': page_obj,
         'venues': venues,
-        'selected_venue': venue_id,
-        'selected_rating': rating,
+        'selected_venue': request.GET.get('venue'),
+        'selected_rating': request.GET.get('rating'),
     }
     return render(request, 'core/testimonials.html', context)
 
-def blog(request):
-    """Blog listing page"""
-    # Get site settings
-    site_settings = SiteSettings.objects.first()
-    
-    # Get published blog posts
+def testimonials_api(request):
+    """Testimonials as JSON, one cursor page at a time"""
+    page = KeysetPaginator(_testimonial_list(request), 9).get_page(request.GET.get('cursor'))
+    return _cursor_json(page, lambda testimonial: {
+        'id': testimonial.id,
+        'author_name': testimonial.author_name,
+        'author_title': testimonial.author_title,
+        'content': testimonial.content,
+        'rating': testimonial.rating,
+        'image': _image_url(testimonial.image),
+        'event_type': testimonial.event_type,
+        'venue_id': testimonial.venue_id,
+    })
+
+def _blog_posts(request):
+    """Published blog posts narrowed by the request's search and filters"""
     posts = BlogPost.objects.filter(is_published=True)
     
-    # Handle search
     search_query = request.GET.get('search')
     if search_query:
-        posts = posts.filter(title__icontains=search_query)
+        posts = search(posts, search_query)
     
-    # Handle category filter
     category = request.GET.get('category')
     if category:
         posts = posts.filter(category=category)
+    return posts
+
+def blog(request):
+    """Blog listing page"""
+    # Get site settings
+    site_settings = get_site_settings()
+    
+    # Get published blog posts
+    posts = _blog_posts(request)
     
     # Pagination
-    paginator = Paginator(posts, 6)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = _paginate(request, posts, 6)
     
     # Get categories for filtering
     categories = BlogPost.objects.filter(is_published=True).values_list('category', flat=True).distinct()
@@ -337,15 +351,34 @@ def blog(request):
         'site_settings': site_settings,
         'page_obj': page_obj,
         'categories': categories,
-        'search_query': search_query,
-        'selected_category': category,
+        'search_query': request.GET.get('search'),
+        'selected_category': request.GET.get('category'),
     }
     return render(request, 'core/blog.html', context)
 
+def blog_api(request):
+    """Published blog posts as JSON, one cursor page at a time"""
+    posts = _blog_posts(request)
+    if request.GET.get('search'):
+        # Ranked results: return the best matches without a cursor
+        page = KeysetPage(list(posts[:6]))
+    else:
+        page = KeysetPaginator(posts, 6).get_page(request.GET.get('cursor'))
+    return _cursor_json(page, lambda post: {
+        'id': post.id,
+        'title': post.title,
+        'slug': post.slug,
+        'excerpt': post.excerpt,
+        'featured_image': _image_url(post.featured_image),
+        'category': post.category,
+        'tags': post.tags,
+        'published_at': post.published_at,
+    })
+
 def blog_detail(request, blog_slug):
     """Individual blog post detail page"""
     # Get site settings
-    site_settings = SiteSettings.objects.first()
+    site_settings = get_site_settings()
     
     # Get blog post
     post = get_object_or_404(BlogPost, slug=blog_slug, is_published=True)
@@ -363,13 +396,17 @@ def blog_detail(request, blog_slug):
     }
     return render(request, 'core/blog_detail.html', context)
 
+@anonymous_page_cache(FAQ, query_params=('search',))
 def faq(request):
     """FAQ page"""
     # Get site settings
-    site_settings = SiteSettings.objects.first()
+    site_settings = get_site_settings()
     
-    # Get FAQs
+    # Get FAQs, best matches first when searching
     faqs = FAQ.objects.filter(is_active=True)
+    search_query = request.GET.get('search')
+    if search_query:
+        faqs = search(faqs, search_query)
     
     # Group by category
     faq_categories = {}
@@ -382,13 +419,15 @@ def faq(request):
     context = {
         'site_settings': site_settings,
         'faq_categories': faq_categories,
+        'search_query': search_query,
     }
     return render(request, 'core/faq.html', context)
 
+@anonymous_page_cache(Event, Venue, query_params=('venue',))
 def events(request):
     """Upcoming events page"""
     # Get site settings
-    site_settings = SiteSettings.objects.first()
+    site_settings = get_site_settings()
     
     # Get upcoming events
     events = Event.objects.filter(is_active=True)
@@ -408,3 +447,32 @@ def events(request):
         'selected_venue': venue_id,
     }
     return render(request, 'core/events.html', context)
+
+async def status_stream(request):
+    """Server-sent events announcing status changes of the user's orders and bookings"""
+    user = await request.auser()
+    if not user.is_authenticated:
+        return HttpResponse(status=401)
+    
+    hub = get_hub()
+    queue = hub.subscribe(user.id)
+    heartbeat = getattr(settings, 'STATUS_STREAM_HEARTBEAT', 15)
+    
+    async def events():
+        try:
+            yield 'retry: 5000\n\n'
+            while True:
+                try:
+                    change = await asyncio.wait_for(queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    # Keeps proxies from closing an idle connection
+                    yield ': keep-alive\n\n'
+                    continue
+                yield format_event(change)
+        finally:
+            hub.unsubscribe(user.id, queue)
+    
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
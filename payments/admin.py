@@ -1,11 +1,14 @@
 from django.contrib import admin
-from .models import Payment, PaymentGateway
+from .models import Payment, PaymentGateway, WebhookEvent
 
 @admin.register(Payment)
 class PaymentAdmin(admin.ModelAdmin):
     list_display = ['transaction_id', 'user', 'amount', 'payment_method', 'status', 'payment_date']
     list_filter = ['status', 'payment_method', 'payment_date']
     search_fields = ['transaction_id', 'user__username', 'user__email']
+    list_select_related = ['user']
+    autocomplete_fields = ['user']
+    raw_id_fields = ['booking', 'order']
     readonly_fields = ['payment_date']
     date_hierarchy = 'payment_date'
 
@@ -13,3 +16,10 @@ class PaymentAdmin(admin.ModelAdmin):
 class PaymentGatewayAdmin(admin.ModelAdmin):
     list_display = ['name', 'is_active']
     list_filter = ['is_active']
+
+@admin.register(WebhookEvent)
+class WebhookEventAdmin(admin.ModelAdmin):
+    list_display = ['event_id', 'gateway', 'event_type', 'status', 'received_at', 'processed_at']
+    list_filter = ['status', 'gateway', 'event_type']
+    search_fields = ['event_id']
+    readonly_fields = ['gateway', 'event_id', 'event_type', 'payload', 'received_at', 'processed_at']
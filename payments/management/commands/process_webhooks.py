@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from payments.webhooks import drain_queue
+
+
+class Command(BaseCommand):
+    help = 'Apply queued payment webhook events to payments, bookings and orders'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Events applied per transaction')
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep polling the queue instead of exiting once it is empty',
+        )
+        parser.add_argument('--interval', type=float, default=1.0, help='Seconds between polls with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            handled = drain_queue(options['batch_size'])
+            if handled:
+                self.stdout.write(f'Processed {handled} webhook event(s).')
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
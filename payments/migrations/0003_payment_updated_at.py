@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:30
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def copy_payment_date(apps, schema_editor):
+    Payment = apps.get_model('payments', 'Payment')
+    Payment.objects.update(updated_at=F('payment_date'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0004_table_allocation'),
+        ('payments', '0002_webhook_events'),
+        ('restaurant', '0003_kitchen_queue'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payment',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['updated_at'], name='payments_payment_updated_idx'),
+        ),
+        migrations.RunPython(copy_payment_date, migrations.RunPython.noop),
+    ]
@@ -29,8 +29,19 @@ class Payment(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     transaction_id = models.CharField(max_length=100, blank=True)
     payment_date = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     gateway_response = models.JSONField(null=True, blank=True)
     
+    class Meta:
+        indexes = [
+            # Webhook events are matched to payments by transaction id
+            models.Index(fields=['transaction_id'], name='payments_payment_txn_idx'),
+            # Scanned from the reporting rollups' high-water mark
+            models.Index(fields=['updated_at'], name='payments_payment_updated_idx'),
+            # Month-to-date revenue on the admin index (core.metrics)
+            models.Index(fields=['status', 'payment_date'], name='payments_payment_status_idx'),
+        ]
+    
     def __str__(self):
         return f"Payment {self.transaction_id} - {self.user.username}"
 
@@ -43,3 +54,34 @@ class PaymentGateway(models.Model):
     
     def __str__(self):
         return self.name
+
+class WebhookEvent(models.Model):
+    """A gateway webhook delivery, stored as received and queued for processing"""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('processed', 'Processed'),
+        ('ignored', 'Ignored'),
+        ('failed', 'Failed'),
+    ]
+    
+    gateway = models.CharField(max_length=50)
+    event_id = models.CharField(max_length=255)
+    event_type = models.CharField(max_length=100, blank=True)
+    payload = models.JSONField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    error = models.TextField(blank=True)
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        constraints = [
+            # Gateways redeliver events; the second copy is never stored
+            models.UniqueConstraint(fields=['gateway', 'event_id'], name='payments_webhook_event_unique'),
+        ]
+        indexes = [
+            # The worker's queue scan
+            models.Index(fields=['status', 'id'], name='payments_webhook_queue_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.gateway} {self.event_type} {self.event_id}"
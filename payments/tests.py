@@ -0,0 +1,127 @@
+import hashlib
+import hmac
+import json
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from bookings.models import Booking as HallBooking, Venue as Hall
+from restaurant.models import Order
+from .models import Payment, PaymentGateway, WebhookEvent
+from .webhooks import process_events
+
+
+@override_settings(PAYMENT_WEBHOOK_THREAD=False)
+class PaymentWebhookTests(TestCase):
+    def setUp(self):
+        PaymentGateway.objects.create(name='Razorpay', secret_key='rzp-secret')
+        PaymentGateway.objects.create(name='Stripe', secret_key='stripe-secret')
+        self.user = User.objects.create_user('payer')
+        hall = Hall.objects.create(name='Hall', venue_type='hall', capacity=500, description='...',
+                                   price_per_day=50000, amenities='AC')
+        self.booking = HallBooking.objects.create(
+            user=self.user, venue=hall, event_type='wedding', event_date=timezone.localdate() + timedelta(days=9),
+            start_time='10:00', end_time='14:00', number_of_guests=100, total_amount=50000,
+        )
+        self.order = Order.objects.create(user=self.user, total_amount=500, delivery_type='pickup', phone_number='1')
+        self.deposit = Payment.objects.create(user=self.user, booking=self.booking, amount=10000,
+                                              payment_method='razorpay', transaction_id='ref-deposit')
+        self.meal = Payment.objects.create(user=self.user, order=self.order, amount=500,
+                                           payment_method='stripe', transaction_id='ref-meal')
+        self.url = reverse('payments:payment_webhook', args=['razorpay'])
+
+    def razorpay(self, event_id, event, reference, payment_id='pay_1', secret='rzp-secret', amount=1000000):
+        entity = {'id': payment_id, 'amount': amount, 'notes': {'reference': reference}}
+        if event.startswith('refund'):
+            entity = {'id': 'rfnd_1', 'payment_id': payment_id, 'amount': amount, 'notes': {}}
+        body = json.dumps({'event': event, 'payload': {event.split('.')[0]: {'entity': entity}}}).encode()
+        signature = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+        return self.client.post(self.url, body, content_type='application/json',
+                                HTTP_X_RAZORPAY_SIGNATURE=signature, HTTP_X_RAZORPAY_EVENT_ID=event_id)
+
+    def test_receiving_is_constant_time_and_idempotent(self):
+        # gateway secret, insert
+        with self.assertNumQueries(2):
+            response = self.razorpay('evt_1', 'payment.captured', 'ref-deposit')
+        self.assertEqual(response.json(), {'status': 'received'})
+        self.razorpay('evt_1', 'payment.captured', 'ref-deposit')
+        self.assertEqual(WebhookEvent.objects.count(), 1)
+        self.assertEqual(Payment.objects.get(pk=self.deposit.pk).status, 'pending')
+
+        self.assertEqual(self.razorpay('evt_2', 'payment.captured', 'ref-deposit', secret='wrong').status_code, 400)
+        self.assertEqual(self.client.post(reverse('payments:payment_webhook', args=['nope']), '{}',
+                                          content_type='application/json').status_code, 404)
+
+    def test_worker_applies_events_in_order_once(self):
+        self.razorpay('evt_1', 'payment.authorized', 'ref-deposit')
+        self.razorpay('evt_2', 'payment.captured', 'ref-deposit')
+        # A redelivery under a new id, and an event for a payment we never made
+        self.razorpay('evt_3', 'payment.captured', 'ref-deposit')
+        self.razorpay('evt_4', 'payment.captured', 'ref-unknown', payment_id='pay_9')
+        self.assertEqual(process_events(), 4)
+
+        deposit = Payment.objects.get(pk=self.deposit.pk)
+        self.assertEqual((deposit.status, deposit.transaction_id), ('completed', 'pay_1'))
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.advance_payment, Decimal('10000'))
+        self.assertEqual(
+            dict(WebhookEvent.objects.values_list('event_id', 'status')),
+            {'evt_1': 'processed', 'evt_2': 'processed', 'evt_3': 'processed', 'evt_4': 'ignored'},
+        )
+        self.assertEqual(process_events(), 0)
+
+        # Refunds reference the gateway's payment id and debit what was refunded
+        self.razorpay('evt_5', 'refund.processed', None, amount=400000)
+        process_events()
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.advance_payment, Decimal('6000'))
+        self.assertEqual(Payment.objects.get(pk=self.deposit.pk).status, 'refunded')
+
+    def test_stripe_payment_confirms_order(self):
+        body = json.dumps({'id': 'evt_s1', 'type': 'payment_intent.succeeded',
+                           'data': {'object': {'id': 'pi_1', 'amount_received': 50000,
+                                               'metadata': {'reference': 'ref-meal'}}}}).encode()
+        timestamp = str(int(time.time()))
+        signature = hmac.new(b'stripe-secret', timestamp.encode() + b'.' + body, hashlib.sha256).hexdigest()
+        response = self.client.post(reverse('payments:payment_webhook', args=['stripe']), body,
+                                    content_type='application/json',
+                                    HTTP_STRIPE_SIGNATURE=f't={timestamp},v1={signature}')
+        self.assertEqual(response.status_code, 200)
+        process_events()
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, 'confirmed')
+        self.assertEqual(Payment.objects.get(pk=self.meal.pk).transaction_id, 'pi_1')
+
+    def test_capture_of_another_amount_fails(self):
+        self.razorpay('evt_1', 'payment.captured', 'ref-deposit', amount=100)
+        self.razorpay('evt_2', 'payment.captured', 'ref-deposit', amount=None)
+        process_events()
+        self.assertEqual(Payment.objects.get(pk=self.deposit.pk).status, 'pending')
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.advance_payment, Decimal('0'))
+        events = WebhookEvent.objects.order_by('event_id')
+        self.assertEqual([event.status for event in events], ['failed', 'failed'])
+        self.assertIn('Captured 1', events[0].error)
+
+    def test_payment_amount_is_what_is_owed(self):
+        self.client.force_login(self.user)
+        self.client.post(reverse('payments:process_payment'),
+                         {'booking_id': self.booking.pk, 'amount': '1', 'payment_method': 'upi'})
+        self.assertEqual(Payment.objects.latest('id').amount, Decimal('50000'))
+
+    def test_malformed_generic_event_fails_without_blocking_the_queue(self):
+        for event_id, payload in [('g1', {'status': ['completed'], 'reference': 'ref-meal'}),
+                                  ('g2', {'status': 'completed', 'reference': {'id': 'ref-meal'}}),
+                                  ('g3', {'status': 'completed', 'reference': 'ref-meal', 'amount': '500'})]:
+            WebhookEvent.objects.create(gateway='acme', event_id=event_id, payload=payload)
+        self.assertEqual(process_events(), 3)
+        self.assertEqual(
+            dict(WebhookEvent.objects.values_list('event_id', 'status')),
+            {'g1': 'failed', 'g2': 'failed', 'g3': 'processed'},
+        )
+        self.assertEqual(Payment.objects.get(pk=self.meal.pk).status, 'completed')
@@ -1,24 +1,50 @@
-from django.shortcuts import render, redirect
+import json
+import uuid
+
+from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.db import transaction
 from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from bookings.models import Booking
+from restaurant.models import Order
 from .models import Payment, PaymentGateway
+from .webhooks import event_identity, receive_event, schedule_processing, signature_ok
 
 @login_required
 def process_payment(request):
     """Process payment for booking or order"""
     if request.method == 'POST':
-        amount = request.POST.get('amount')
         payment_method = request.POST.get('payment_method')
         booking_id = request.POST.get('booking_id')
         order_id = request.POST.get('order_id')
+        booking = get_object_or_404(Booking, id=booking_id, user=request.user) if booking_id else None
+        order = get_object_or_404(Order, id=order_id, user=request.user) if order_id else None
+        
+        # The amount is what is owed, never what the client says; webhooks
+        # are checked against it
+        if booking:
+            amount = booking.total_amount - booking.advance_payment
+        elif order:
+            amount = order.total_amount
+        else:
+            amount = 0
+        if amount <= 0:
+            messages.error(request, 'There is nothing to pay.')
+            return redirect('payments:payment_failed')
         
-        # Create payment record
+        # Create payment record; the reference is passed to the gateway so
+        # its webhooks can be matched back to this payment
         payment = Payment.objects.create(
             user=request.user,
+            booking=booking,
+            order=order,
             amount=amount,
             payment_method=payment_method,
-            status='pending'
+            status='pending',
+            transaction_id=uuid.uuid4().hex,
         )
         
         # Redirect to payment gateway
@@ -36,7 +62,28 @@ def payment_failed(request):
     messages.error(request, 'Payment failed. Please try again.')
     return render(request, 'payments/payment_failed.html')
 
-def payment_webhook(request):
-    """Handle payment gateway webhooks"""
-    # Process webhook data from payment gateway
-    return JsonResponse({'status': 'success'})
+@csrf_exempt
+@require_POST
+def payment_webhook(request, gateway):
+    """Handle payment gateway webhooks: verify, queue and acknowledge"""
+    gateway = gateway.lower()
+    secret = (
+        PaymentGateway.objects.filter(name__iexact=gateway, is_active=True)
+        .values_list('secret_key', flat=True).first()
+    )
+    if secret is None:
+        return JsonResponse({'status': 'unknown gateway'}, status=404)
+    if not signature_ok(gateway, request, secret):
+        return JsonResponse({'status': 'invalid signature'}, status=400)
+    try:
+        payload = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({'status': 'invalid payload'}, status=400)
+    if not isinstance(payload, dict):
+        return JsonResponse({'status': 'invalid payload'}, status=400)
+    
+    event_id, event_type = event_identity(gateway, request, payload)
+    receive_event(gateway, event_id, event_type, payload)
+    # Processed after the response, never while the gateway waits
+    transaction.on_commit(schedule_processing)
+    return JsonResponse({'status': 'received'})
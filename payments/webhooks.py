@@ -0,0 +1,352 @@
+import hashlib
+import hmac
+import logging
+import threading
+import time
+from collections import namedtuple
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from bookings.models import Booking
+from .models import Payment, WebhookEvent
+
+# ============================================================================
+# PAYMENT WEBHOOKS
+# ============================================================================
+#
+# Receiving a webhook only checks its signature and inserts the raw event,
+# keyed by (gateway, event id), with ON CONFLICT DO NOTHING: a redelivered
+# event is a no-op and the gateway is answered in constant time whatever
+# the state of the queue. A worker drains queued events in batches, oldest
+# first. Each batch runs in one transaction and costs a handful of queries:
+# the events, the payments they reference, one bulk update each for payments
+# and events, one update per booking credited, and one save per order whose
+# status moves (saved one by one so the kitchen queue and status stream
+# see it).
+#
+# Payment statuses only move forward (see TRANSITIONS), so an event that
+# arrives late or twice under different ids changes nothing. A capture must
+# be for the payment's amount, which the server set from what was owed; any
+# other amount fails the event. A booking is credited when its payment
+# completes and debited by the amount refunded. A paid order is confirmed;
+# a refunded one is cancelled.
+
+logger = logging.getLogger('payments.webhooks')
+
+# Stripe signatures older than this are rejected (replay protection)
+SIGNATURE_TOLERANCE = 5 * 60
+
+TRANSITIONS = {
+    'pending': {'processing', 'completed', 'failed'},
+    'processing': {'completed', 'failed'},
+    'failed': {'processing', 'completed'},
+    'completed': {'refunded'},
+    'refunded': set(),
+}
+
+# Gateway event type -> Payment status
+EVENT_STATUSES = {
+    'razorpay': {
+        'payment.authorized': 'processing',
+        'payment.captured': 'completed',
+        'order.paid': 'completed',
+        'payment.failed': 'failed',
+        'refund.created': 'refunded',
+        'refund.processed': 'refunded',
+    },
+    'stripe': {
+        'payment_intent.processing': 'processing',
+        'payment_intent.succeeded': 'completed',
+        'checkout.session.completed': 'completed',
+        'payment_intent.payment_failed': 'failed',
+        'charge.refunded': 'refunded',
+    },
+}
+
+# Field of a Stripe event's object holding the amount (in paise) it moved;
+# Razorpay entities always call it ``amount`` (in paise too), generic
+# gateways ``amount`` (in rupees)
+STRIPE_AMOUNTS = {
+    'payment_intent.succeeded': 'amount_received',
+    'checkout.session.completed': 'amount_total',
+    'charge.refunded': 'amount_refunded',
+}
+
+# What an event says about a payment: the ids it may be stored under
+# (the gateway's and ours), its new status, the amount it captured or
+# refunded (None if not given) and the gateway's record of it
+Change = namedtuple('Change', ['references', 'status', 'amount', 'record'])
+
+
+class InvalidEvent(ValueError):
+    pass
+
+
+def _razorpay_signature_ok(request, secret):
+    expected = hmac.new(secret.encode(), request.body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, request.headers.get('X-Razorpay-Signature', ''))
+
+
+def _stripe_signature_ok(request, secret):
+    parts = [part.split('=', 1) for part in request.headers.get('Stripe-Signature', '').split(',')]
+    parts = [part for part in parts if len(part) == 2]
+    timestamp = next((value for key, value in parts if key == 't'), '')
+    if not timestamp.isdigit() or abs(time.time() - int(timestamp)) > SIGNATURE_TOLERANCE:
+        return False
+    expected = hmac.new(secret.encode(), timestamp.encode() + b'.' + request.body, hashlib.sha256).hexdigest()
+    return any(hmac.compare_digest(expected, value) for key, value in parts if key == 'v1')
+
+
+def _generic_signature_ok(request, secret):
+    expected = hmac.new(secret.encode(), request.body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, request.headers.get('X-Webhook-Signature', ''))
+
+
+def signature_ok(gateway, request, secret):
+    """Whether the request was signed with the gateway's secret"""
+    if not secret:
+        return False
+    check = {
+        'razorpay': _razorpay_signature_ok,
+        'stripe': _stripe_signature_ok,
+    }.get(gateway, _generic_signature_ok)
+    return check(request, secret)
+
+
+def event_identity(gateway, request, payload):
+    """(event id, event type) of a delivery; the body hash if it has no id"""
+    if gateway == 'razorpay':
+        event_id = request.headers.get('X-Razorpay-Event-Id')
+        event_type = payload.get('event')
+    else:
+        event_id = payload.get('id')
+        event_type = payload.get('type')
+    if not event_id:
+        event_id = hashlib.sha256(request.body).hexdigest()
+    return str(event_id)[:255], str(event_type or '')[:100]
+
+
+def receive_event(gateway, event_id, event_type, payload):
+    """Queue an event; a redelivery of one already received is dropped"""
+    WebhookEvent.objects.bulk_create(
+        [WebhookEvent(gateway=gateway, event_id=event_id, event_type=event_type, payload=payload)],
+        ignore_conflicts=True,
+    )
+
+
+def _razorpay_change(event_type, payload):
+    entities = payload.get('payload') or {}
+    # Refund events carry the payment too; the amount is the refund's
+    if event_type.startswith('refund.'):
+        entity = (entities.get('refund') or entities.get('payment') or {}).get('entity') or {}
+    else:
+        entity = (entities.get('payment') or entities.get('refund') or {}).get('entity') or {}
+    notes = entity.get('notes') or {}
+    references = [entity.get('payment_id'), entity.get('id'), notes.get('reference')]
+    return references, entity
+
+
+def _stripe_change(event_type, payload):
+    entity = (payload.get('data') or {}).get('object') or {}
+    metadata = entity.get('metadata') or {}
+    references = [entity.get('payment_intent'), entity.get('id'), metadata.get('reference'),
+                  entity.get('client_reference_id')]
+    return references, entity
+
+
+def _generic_change(event_type, payload):
+    references = [payload.get('transaction_id'), payload.get('reference')]
+    return references, payload
+
+
+def _event_amount(gateway, event_type, record):
+    """Amount in rupees an event's record reports, None if it has none"""
+    field = STRIPE_AMOUNTS.get(event_type) if gateway == 'stripe' else 'amount'
+    value = record.get(field) if field else None
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise InvalidEvent('Amount is not a number')
+    try:
+        amount = Decimal(str(value))
+    except InvalidOperation:
+        raise InvalidEvent('Amount is not a number')
+    return amount / 100 if gateway in EVENT_STATUSES else amount
+
+
+def parse_event(event):
+    """The Change an event describes, None if it is not about a payment"""
+    if not isinstance(event.payload, dict):
+        raise InvalidEvent('Payload is not an object')
+    if event.gateway in EVENT_STATUSES:
+        status = EVENT_STATUSES[event.gateway].get(event.event_type)
+        parser = _razorpay_change if event.gateway == 'razorpay' else _stripe_change
+    else:
+        status = event.payload.get('status')
+        parser = _generic_change
+    if status is None:
+        return None
+    if not isinstance(status, str) or status not in TRANSITIONS:
+        raise InvalidEvent(f'Unknown payment status {status!r}')
+    references, record = parser(event.event_type, event.payload)
+    references = [reference for reference in references if reference]
+    if any(isinstance(reference, bool) or not isinstance(reference, (str, int)) for reference in references):
+        raise InvalidEvent('Payment reference is not a string')
+    references = [str(reference) for reference in references]
+    if not references:
+        raise InvalidEvent('Event does not reference a payment')
+    return Change(references, status, _event_amount(event.gateway, event.event_type, record), record)
+
+
+def _apply(payment, change, credits, orders):
+    """Move one payment; records the booking credit and order status it causes.
+
+    Raises InvalidEvent, leaving the payment alone, if the amount captured
+    is not the payment's or the amount refunded is more than it.
+    """
+    previous = payment.status
+    if change.status == previous or change.status not in TRANSITIONS[previous]:
+        return False
+    if change.status == 'completed' and change.amount != payment.amount:
+        raise InvalidEvent(f'Captured {change.amount} of a payment of {payment.amount}')
+    if change.status == 'refunded' and (change.amount is None or not 0 < change.amount <= payment.amount):
+        raise InvalidEvent(f'Refunded {change.amount} of a payment of {payment.amount}')
+    payment.status = change.status
+    payment.transaction_id = change.references[0][:100]
+    payment.gateway_response = change.record
+
+    if payment.booking_id:
+        if change.status == 'completed':
+            credits[payment.booking_id] = credits.get(payment.booking_id, 0) + payment.amount
+        elif change.status == 'refunded':
+            credits[payment.booking_id] = credits.get(payment.booking_id, 0) - change.amount
+    if payment.order_id:
+        if change.status == 'completed':
+            orders[payment.order_id] = ('pending', 'confirmed')
+        elif change.status == 'refunded':
+            orders[payment.order_id] = (None, 'cancelled')
+    return True
+
+
+def process_events(batch_size=100):
+    """Apply up to ``batch_size`` queued events; returns how many were handled"""
+    now = timezone.now()
+    with transaction.atomic():
+        queue = WebhookEvent.objects.filter(status='queued').order_by('id')
+        if connection.features.has_select_for_update_skip_locked:
+            # Parallel workers take different batches
+            queue = queue.select_for_update(skip_locked=True)
+        events = list(queue[:batch_size])
+        if not events:
+            return 0
+
+        changes = {}
+        for event in events:
+            try:
+                changes[event.pk] = parse_event(event)
+            except InvalidEvent as error:
+                event.status, event.error = 'failed', str(error)
+            except (AttributeError, TypeError) as error:
+                # A payload of unexpected shape must not block the queue
+                event.status, event.error = 'failed', f'Malformed payload: {error}'
+
+        references = {reference for change in changes.values() if change for reference in change.references}
+        payments = {}
+        for payment in Payment.objects.filter(transaction_id__in=references).select_related('order'):
+            payments[payment.transaction_id] = payment
+
+        moved, credits, orders = {}, {}, {}
+        for event in events:
+            if event.status == 'failed':
+                continue
+            change = changes[event.pk]
+            payment = change and next(
+                (payments[reference] for reference in change.references if reference in payments), None,
+            )
+            if payment is None:
+                event.status, event.error = 'ignored', '' if change is None else 'No matching payment'
+                continue
+            try:
+                applied = _apply(payment, change, credits, orders)
+            except InvalidEvent as error:
+                event.status, event.error = 'failed', str(error)
+                continue
+            if applied:
+                moved[payment.pk] = payment
+                # Later events in the batch may use the gateway's id
+                payments[payment.transaction_id] = payment
+            event.status = 'processed'
+
+        for payment in moved.values():
+            # bulk_update() skips auto_now
+            payment.updated_at = now
+        Payment.objects.bulk_update(moved.values(), ['status', 'transaction_id', 'gateway_response', 'updated_at'])
+        for booking_id, amount in credits.items():
+            if amount:
+                # update() skips auto_now too; the rollups follow updated_at
+                Booking.objects.filter(pk=booking_id).update(
+                    advance_payment=F('advance_payment') + amount, updated_at=now,
+                )
+        for payment in moved.values():
+            if payment.order_id in orders:
+                required, status = orders.pop(payment.order_id)
+                order = payment.order
+                if (required is None or order.status == required) and order.status not in ('delivered', status):
+                    order.status = status
+                    order.save(update_fields=['status', 'updated_at'])
+
+        for event in events:
+            event.processed_at = now
+        WebhookEvent.objects.bulk_update(events, ['status', 'error', 'processed_at'])
+    return len(events)
+
+
+def drain_queue(batch_size=100):
+    """Process batches until the queue is empty; returns the events handled"""
+    total = 0
+    while True:
+        handled = process_events(batch_size)
+        total += handled
+        if handled < batch_size:
+            return total
+
+
+_worker = None
+_worker_lock = threading.Lock()
+# Set when events arrive while the worker is draining
+_rerun = threading.Event()
+
+
+def _work_in_background():
+    global _worker
+    try:
+        while True:
+            try:
+                drain_queue()
+            except Exception:
+                logger.exception('Failed to process payment webhooks')
+            with _worker_lock:
+                if not _rerun.is_set():
+                    _worker = None
+                    return
+                _rerun.clear()
+    finally:
+        # Worker threads open their own connection; don't leak it
+        connection.close()
+
+
+def schedule_processing():
+    """Drain the queue in a background thread of this process, one at a time"""
+    global _worker
+    if not getattr(settings, 'PAYMENT_WEBHOOK_THREAD', True):
+        return
+    with _worker_lock:
+        if _worker is not None:
+            _rerun.set()
+            return
+        _worker = threading.Thread(target=_work_in_background, daemon=True)
+        _worker.start()
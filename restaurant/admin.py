@@ -4,6 +4,7 @@ from .models import Category, MenuItem, Order, OrderItem, Table
 class OrderItemInline(admin.TabularInline):
     model = OrderItem
     extra = 1
+    raw_id_fields = ['menu_item']
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
@@ -17,13 +18,16 @@ class MenuItemAdmin(admin.ModelAdmin):
     list_filter = ['category', 'food_type', 'is_available', 'is_popular', 'is_spicy']
     search_fields = ['name', 'description']
     list_editable = ['is_available', 'is_popular']
+    list_select_related = ['category']
 
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
-    list_display = ['order_number', 'user', 'total_amount', 'delivery_type', 'status', 'created_at']
+    list_display = ['order_number', 'user', 'total_amount', 'delivery_type', 'status', 'ready_at', 'created_at']
     list_filter = ['status', 'delivery_type', 'created_at']
     search_fields = ['order_number', 'user__username', 'user__email']
-    readonly_fields = ['order_number', 'created_at', 'updated_at']
+    list_select_related = ['user']
+    autocomplete_fields = ['user']
+    readonly_fields = ['order_number', 'prep_minutes', 'ready_at', 'created_at', 'updated_at']
     inlines = [OrderItemInline]
     date_hierarchy = 'created_at'
 
@@ -1,11 +1,23 @@
 from django import forms
 from .models import Order
+from .orders import parse_cart
 
 class OrderForm(forms.ModelForm):
+    cart = forms.CharField(widget=forms.HiddenInput, help_text="JSON list of {id, quantity} lines")
+    
     class Meta:
         model = Order
-        fields = ['delivery_address', 'phone_number', 'special_instructions']
+        fields = ['delivery_type', 'delivery_address', 'phone_number', 'special_instructions']
         widgets = {
             'delivery_address': forms.Textarea(attrs={'rows': 3}),
             'special_instructions': forms.Textarea(attrs={'rows': 3}),
         }
+    
+    def clean_cart(self):
+        return parse_cart(self.cleaned_data['cart'])
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        if cleaned_data.get('delivery_type') == 'delivery' and not cleaned_data.get('delivery_address'):
+            self.add_error('delivery_address', 'A delivery address is required for home delivery.')
+        return cleaned_data
@@ -0,0 +1,197 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import F, Max, Sum
+from django.utils import timezone
+
+from .models import KitchenSlot, Order, OrderItem
+
+# ============================================================================
+# KITCHEN QUEUE
+# ============================================================================
+#
+# An order's work is the sum of preparation_time x quantity of its lines, in
+# cook-minutes; the kitchen gets through STATIONS x BUCKET_MINUTES of them
+# per bucket. Every open (confirmed or preparing) order is booked into the
+# bucket it is promised to be ready by, and KitchenSlot keeps the running
+# total per bucket. The totals move by the order's work when its status
+# enters or leaves the open set, in the same transaction as the status
+# change, so nothing ever rescans the orders. Status changes must go
+# through Order.save() (not QuerySet.update()) for the signals to see them.
+#
+# An order is promised the earliest bucket, after its longest dish is
+# cooked, such that the work booked up to every bucket from there on (plus
+# any overdue work) still fits in the kitchen's capacity up to it. Earlier
+# promises therefore hold. Concurrent confirmations can overbook a bucket
+# slightly; the estimate corrects itself as orders close.
+
+DEFAULT_RULES = {
+    'BUCKET_MINUTES': 15,
+    # Dishes the kitchen can cook at once
+    'STATIONS': 3,
+    # How far ahead orders are scheduled
+    'HORIZON_HOURS': 12,
+    # Refuse orders that could not be ready sooner than this (None: never)
+    'MAX_LEAD_MINUTES': None,
+}
+
+OPEN_STATUSES = ['confirmed', 'preparing']
+
+
+def kitchen_rules():
+    return {**DEFAULT_RULES, **getattr(settings, 'KITCHEN', {})}
+
+
+def bucket_start(moment, rules=None):
+    rules = rules or kitchen_rules()
+    size = rules['BUCKET_MINUTES'] * 60
+    epoch = int(moment.timestamp())
+    return moment - timedelta(seconds=epoch % size, microseconds=moment.microsecond)
+
+
+def line_work(lines):
+    """(cook-minutes, longest single dish) of (preparation_time, quantity) pairs"""
+    lines = list(lines)
+    work = sum(minutes * quantity for minutes, quantity in lines)
+    return work, max((minutes for minutes, _ in lines), default=0)
+
+
+def order_work(order):
+    """(cook-minutes, longest single dish) of a saved order's items"""
+    totals = OrderItem.objects.filter(order=order).aggregate(
+        work=Sum(F('quantity') * F('menu_item__preparation_time')),
+        lead=Max('menu_item__preparation_time'),
+    )
+    return totals['work'] or 0, totals['lead'] or 0
+
+
+def _schedule(rules, now):
+    """(first bucket, its slack series) over the horizon"""
+    size = timedelta(minutes=rules['BUCKET_MINUTES'])
+    capacity = rules['STATIONS'] * rules['BUCKET_MINUTES']
+    first = bucket_start(now, rules)
+    count = rules['HORIZON_HOURS'] * 60 // rules['BUCKET_MINUTES']
+
+    overdue = KitchenSlot.objects.filter(start__lt=first, load_minutes__gt=0).aggregate(
+        total=Sum('load_minutes'),
+    )['total'] or 0
+    booked = dict(
+        KitchenSlot.objects.filter(start__gte=first, start__lt=first + size * count)
+        .values_list('start', 'load_minutes')
+    )
+
+    slack = []
+    cumulative = overdue
+    for index in range(count):
+        cumulative += booked.get(first + size * index, 0)
+        slack.append(capacity * (index + 1) - cumulative)
+    return first, slack
+
+
+def estimate_ready(work, lead, now=None):
+    """(time the work can be ready by, its bucket start) without booking it"""
+    rules = kitchen_rules()
+    now = now or timezone.now()
+    size = timedelta(minutes=rules['BUCKET_MINUTES'])
+    first, slack = _schedule(rules, now)
+
+    earliest = max(0, int((bucket_start(now + timedelta(minutes=lead), rules) - first) / size))
+    # Smallest slack from each bucket to the end of the horizon
+    chosen = max(len(slack), earliest)
+    lowest = None
+    for index in range(len(slack) - 1, earliest - 1, -1):
+        lowest = slack[index] if lowest is None else min(lowest, slack[index])
+        if lowest >= work:
+            chosen = index
+    start = first + size * chosen
+    return start + size, start
+
+
+def check_lead_time(work, lead):
+    """Estimated ready time of new work, or ValidationError if the kitchen is too busy"""
+    rules = kitchen_rules()
+    now = timezone.now()
+    ready_at, _ = estimate_ready(work, lead, now)
+    limit = rules['MAX_LEAD_MINUTES']
+    if limit is not None and ready_at - now > timedelta(minutes=limit):
+        raise ValidationError(
+            'The kitchen is fully booked right now. Please try again a little later.',
+            code='kitchen_busy',
+        )
+    return ready_at
+
+
+def _add_load(start, minutes, orders):
+    KitchenSlot.objects.bulk_create([KitchenSlot(start=start)], ignore_conflicts=True)
+    KitchenSlot.objects.filter(start=start).update(
+        load_minutes=F('load_minutes') + minutes, orders=F('orders') + orders,
+    )
+
+
+def enqueue(order):
+    """Book an order that just opened into the queue and set its ready time"""
+    work, lead = order_work(order)
+    ready_at, start = estimate_ready(work, lead)
+    _add_load(start, work, 1)
+    order.prep_minutes = work
+    order.ready_at = ready_at
+    Order.objects.filter(pk=order.pk).update(prep_minutes=work, ready_at=ready_at)
+
+
+def release(order):
+    """Take a closed (or deleted) order's work back off its bucket"""
+    if order.ready_at is None:
+        return
+    start = order.ready_at - timedelta(minutes=kitchen_rules()['BUCKET_MINUTES'])
+    KitchenSlot.objects.filter(start=start).update(
+        load_minutes=F('load_minutes') - order.prep_minutes, orders=F('orders') - 1,
+    )
+
+
+def status_changed(order, previous):
+    """Move an order's work in or out of the queue after a status change"""
+    was_open = previous in OPEN_STATUSES
+    is_open = order.status in OPEN_STATUSES
+    if is_open and not was_open:
+        enqueue(order)
+    elif was_open and not is_open:
+        release(order)
+
+
+def kitchen_load(hours=None):
+    """Booked vs available cook-minutes per bucket, from now on (staff dashboard)"""
+    rules = kitchen_rules()
+    now = timezone.now()
+    size = timedelta(minutes=rules['BUCKET_MINUTES'])
+    capacity = rules['STATIONS'] * rules['BUCKET_MINUTES']
+    first = bucket_start(now, rules)
+    count = (hours or rules['HORIZON_HOURS']) * 60 // rules['BUCKET_MINUTES']
+
+    overdue = KitchenSlot.objects.filter(start__lt=first, load_minutes__gt=0).aggregate(
+        minutes=Sum('load_minutes'), orders=Sum('orders'),
+    )
+    slots = {
+        start: (minutes, orders)
+        for start, minutes, orders in KitchenSlot.objects.filter(
+            start__gte=first, start__lt=first + size * count,
+        ).values_list('start', 'load_minutes', 'orders')
+    }
+    buckets = []
+    for index in range(count):
+        start = first + size * index
+        minutes, orders = slots.get(start, (0, 0))
+        buckets.append({
+            'start': start,
+            'load_minutes': minutes,
+            'orders': orders,
+            'percent': round(100 * minutes / capacity) if capacity else 0,
+        })
+    return {
+        'capacity': capacity,
+        'overdue_minutes': overdue['minutes'] or 0,
+        'overdue_orders': overdue['orders'] or 0,
+        'open_orders': (overdue['orders'] or 0) + sum(bucket['orders'] for bucket in buckets),
+        'next_ready_at': estimate_ready(0, 0, now)[0],
+        'buckets': buckets,
+    }
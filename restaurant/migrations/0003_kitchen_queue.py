@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0002_updated_at_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KitchenSlot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start', models.DateTimeField(unique=True)),
+                ('load_minutes', models.IntegerField(default=0)),
+                ('orders', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['start'],
+            },
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='prep_minutes',
+            field=models.PositiveIntegerField(default=0, help_text='Cook-minutes booked in the kitchen queue'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='ready_at',
+            field=models.DateTimeField(blank=True, help_text='Estimated ready time', null=True),
+        ),
+    ]
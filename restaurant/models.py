@@ -1,6 +1,8 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator
+from django.utils import timezone
+from .numbering import next_order_number
 
 class Category(models.Model):
     name = models.CharField(max_length=100)
@@ -65,17 +67,41 @@ class Order(models.Model):
     phone_number = models.CharField(max_length=15)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     special_instructions = models.TextField(blank=True)
+    prep_minutes = models.PositiveIntegerField(default=0, help_text="Cook-minutes booked in the kitchen queue")
+    ready_at = models.DateTimeField(null=True, blank=True, help_text="Estimated ready time")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Set by save() when the status moves; QuerySet.update() leaves it alone
+    status_changed_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        indexes = [
+            # Followed by the reporting rollups (core.rollups)
+            models.Index(fields=['updated_at'], name='restaurant_order_updated_idx'),
+            # Polled by the status stream (core.streams)
+            models.Index(fields=['status_changed_at'], name='restaurant_order_status_at_idx'),
+            # Open orders on the admin index (core.metrics)
+            models.Index(fields=['status'], name='restaurant_order_status_idx'),
+        ]
     
     def __str__(self):
         return f"Order #{self.order_number} - {self.user.username}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Status as loaded, so the kitchen queue can tell what a save changed
+        if 'status' in field_names:
+            instance._loaded_status = instance.status
+        return instance
+    
     def save(self, *args, **kwargs):
         if not self.order_number:
-            import random
-            import string
-            self.order_number = ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
+            self.order_number = next_order_number()
+        if self.status != getattr(self, '_loaded_status', None):
+            self.status_changed_at = timezone.now()
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'status_changed_at'}
         super().save(*args, **kwargs)
 
 class OrderItem(models.Model):
@@ -96,3 +122,15 @@ class Table(models.Model):
     
     def __str__(self):
         return f"Table {self.table_number} ({self.capacity} seats)"
+
+class KitchenSlot(models.Model):
+    """Cook-minutes of open orders due in one time bucket (see restaurant.kitchen)"""
+    start = models.DateTimeField(unique=True)
+    load_minutes = models.IntegerField(default=0)
+    orders = models.IntegerField(default=0)
+    
+    class Meta:
+        ordering = ['start']
+    
+    def __str__(self):
+        return f"{self.start:%Y-%m-%d %H:%M}: {self.load_minutes} min"
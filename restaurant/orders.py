@@ -0,0 +1,86 @@
+import json
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .kitchen import check_lead_time, line_work
+from .models import MenuItem, OrderItem
+
+# ============================================================================
+# CART TO ORDER
+# ============================================================================
+#
+# A cart is a list of {"id": <MenuItem id>, "quantity": n,
+# "special_instructions": "..."} lines. Placing it costs the same handful of
+# queries however many lines it has: one in_bulk() for the prices, one
+# INSERT for the order and one bulk INSERT for its items, all in a single
+# transaction so an order never exists without its items or total. The
+# order also gets the kitchen's current ready-time estimate for its dishes.
+
+MAX_CART_LINES = 100
+MAX_LINE_QUANTITY = 500
+
+
+def parse_cart(raw):
+    """Validate a cart (JSON text or decoded list) into {item id: (quantity, instructions)}"""
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except ValueError:
+            raise ValidationError('The cart is not valid JSON.', code='invalid')
+    if not isinstance(raw, list) or not raw:
+        raise ValidationError('The cart is empty.', code='empty')
+    if len(raw) > MAX_CART_LINES:
+        raise ValidationError(f'A cart can hold at most {MAX_CART_LINES} lines.', code='too_large')
+
+    lines = {}
+    for line in raw:
+        try:
+            item_id = int(line['id'])
+            quantity = int(line.get('quantity', 1))
+        except (KeyError, TypeError, ValueError):
+            raise ValidationError('Each cart line needs a menu item id and a quantity.', code='invalid')
+        instructions = str(line.get('special_instructions') or '')
+        # The same dish added twice becomes one line
+        previous_quantity, previous_instructions = lines.get(item_id, (0, ''))
+        quantity += previous_quantity
+        if not 1 <= quantity <= MAX_LINE_QUANTITY:
+            raise ValidationError(f'Quantities must be between 1 and {MAX_LINE_QUANTITY}.', code='quantity')
+        lines[item_id] = (quantity, '; '.join(filter(None, [previous_instructions, instructions])))
+    return lines
+
+
+def create_order(order, lines):
+    """Save an unsaved ``order`` with its items and total; returns the order.
+
+    ``lines`` is the output of ``parse_cart``. Prices are snapshotted from
+    the menu at the moment the order is placed. Raises ValidationError if
+    an item is unavailable or the kitchen is too busy.
+    """
+    with transaction.atomic():
+        menu_items = MenuItem.objects.filter(is_available=True).in_bulk(list(lines))
+        unavailable = sorted(set(lines) - set(menu_items))
+        if unavailable:
+            raise ValidationError(
+                'Some items are no longer available: %(ids)s.',
+                code='unavailable',
+                params={'ids': ', '.join(str(item_id) for item_id in unavailable)},
+            )
+
+        items = [
+            OrderItem(
+                menu_item=menu_items[item_id], quantity=quantity,
+                price=menu_items[item_id].price, special_instructions=instructions,
+            )
+            for item_id, (quantity, instructions) in lines.items()
+        ]
+        order.total_amount = sum((item.price * item.quantity for item in items), Decimal('0.00'))
+        order.ready_at = check_lead_time(*line_work(
+            (item.menu_item.preparation_time, item.quantity) for item in items
+        ))
+        order.save()
+        for item in items:
+            item.order = order
+        OrderItem.objects.bulk_create(items)
+    return order
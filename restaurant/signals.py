@@ -0,0 +1,45 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+from core.cache import bump_model_version
+from . import kitchen
+from .models import Category, MenuItem, Order, Table
+
+
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=MenuItem)
+def invalidate_menu_catalog(sender, **kwargs):
+    """Rebuild the restaurant menu snapshot once a menu change is committed"""
+    transaction.on_commit(lambda: bump_model_version(sender))
+
+
+@receiver([post_save, post_delete], sender=Table)
+def invalidate_table_layout(sender, **kwargs):
+    """Make the table allocator lay the tables out again once committed"""
+    transaction.on_commit(lambda: bump_model_version(sender))
+
+
+@receiver(pre_save, sender=Order)
+def remember_order_status(sender, instance, **kwargs):
+    """Know the stored status of orders that were not loaded with it"""
+    if not hasattr(instance, '_loaded_status'):
+        if instance._state.adding:
+            instance._loaded_status = None
+        else:
+            instance._loaded_status = (
+                Order.objects.filter(pk=instance.pk).values_list('status', flat=True).first()
+            )
+
+
+@receiver(post_save, sender=Order)
+def update_kitchen_queue(sender, instance, **kwargs):
+    """Book or release the order's kitchen time when it opens or closes"""
+    kitchen.status_changed(instance, instance._loaded_status)
+    instance._loaded_status = instance.status
+
+
+@receiver(post_delete, sender=Order)
+def release_kitchen_time(sender, instance, **kwargs):
+    """Deleted open orders give their kitchen time back"""
+    if getattr(instance, '_loaded_status', instance.status) in kitchen.OPEN_STATUSES:
+        kitchen.release(instance)
@@ -0,0 +1,225 @@
+import json
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import kitchen, numbering
+from .models import Category as DishCategory, KitchenSlot, MenuItem as Dish, Order, OrderItem
+
+
+class OrderNumberTests(TestCase):
+    def test_numbers_are_unique_and_ordered_across_threads(self):
+        results = {}
+
+        def generate(worker):
+            results[worker] = [numbering.next_order_number() for _ in range(5000)]
+
+        threads = [threading.Thread(target=generate, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        numbers = [number for batch in results.values() for number in batch]
+        self.assertEqual(len(set(numbers)), len(numbers))
+        self.assertTrue(all(len(number) == numbering.WIDTH for number in numbers))
+        for batch in results.values():
+            self.assertEqual(batch, sorted(batch))
+
+    def test_clock_step_back_keeps_numbers_increasing(self):
+        first = numbering.next_order_number()
+        with mock.patch('restaurant.numbering.time.time', return_value=time.time() - 60):
+            later = [numbering.next_order_number() for _ in range(600)]
+        self.assertEqual(later, sorted(later))
+        self.assertLess(first, later[0])
+
+    def test_order_gets_number_on_save(self):
+        user = User.objects.create_user('diner')
+        orders = [
+            Order.objects.create(user=user, total_amount=100, delivery_type='pickup', phone_number='1')
+            for _ in range(3)
+        ]
+        numbers = [order.order_number for order in orders]
+        self.assertEqual(numbers, sorted(numbers))
+        self.assertEqual(len(set(numbers)), 3)
+
+
+class CartOrderTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('diner', password='secret')
+        category = DishCategory.objects.create(name='Mains')
+        self.dishes = [
+            Dish.objects.create(name=f'Dish {i}', description='...', price=Decimal(100 + i),
+                                category=category, food_type='veg')
+            for i in range(30)
+        ]
+        self.client.force_login(self.user)
+        self.url = reverse('restaurant:place_order')
+
+    def post_json(self, payload):
+        return self.client.post(self.url, json.dumps(payload), content_type='application/json')
+
+    def test_large_order_costs_constant_queries(self):
+        cart = [{'id': dish.id, 'quantity': 2} for dish in self.dishes]
+        # session + user, savepoint, in_bulk, kitchen overdue + slots,
+        # order insert, items insert, release
+        with self.assertNumQueries(9):
+            response = self.post_json({'cart': cart, 'delivery_type': 'pickup', 'phone_number': '9999999999'})
+        self.assertEqual(response.status_code, 201, response.content)
+
+        order = Order.objects.get(order_number=response.json()['order_number'])
+        self.assertEqual(order.orderitem_set.count(), 30)
+        self.assertEqual(order.total_amount, sum(2 * dish.price for dish in self.dishes))
+
+    def test_prices_are_snapshotted(self):
+        dish = self.dishes[0]
+        self.post_json({'cart': [{'id': dish.id, 'quantity': 1}, {'id': dish.id, 'quantity': 2}],
+                        'delivery_type': 'pickup', 'phone_number': '1'})
+        Dish.objects.filter(pk=dish.pk).update(price=999)
+        item = OrderItem.objects.get()
+        self.assertEqual((item.quantity, item.price), (3, Decimal('100.00')))
+
+    def test_unavailable_items_reject_whole_order(self):
+        self.dishes[1].is_available = False
+        self.dishes[1].save()
+        response = self.post_json({'cart': [{'id': self.dishes[0].id}, {'id': self.dishes[1].id}],
+                                   'delivery_type': 'pickup', 'phone_number': '1'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('no longer available', response.json()['errors']['cart'][0])
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(OrderItem.objects.exists())
+
+    def test_invalid_carts_are_rejected(self):
+        for cart in ([], 'nonsense', [{'quantity': 1}], [{'id': self.dishes[0].id, 'quantity': 0}]):
+            response = self.post_json({'cart': cart, 'delivery_type': 'pickup', 'phone_number': '1'})
+            self.assertEqual(response.status_code, 400, cart)
+        self.assertFalse(Order.objects.exists())
+
+    def test_form_post_redirects(self):
+        response = self.client.post(self.url, {
+            'cart': json.dumps([{'id': self.dishes[0].id, 'quantity': 1}]),
+            'delivery_type': 'delivery', 'delivery_address': '1 Main St', 'phone_number': '1',
+        })
+        self.assertRedirects(response, reverse('restaurant:my_orders'), fetch_redirect_response=False)
+        self.assertEqual(Order.objects.get().total_amount, Decimal('100.00'))
+
+    def test_order_page_submission_places_order(self):
+        page = self.client.get(self.url)
+        self.assertContains(page, f'name="items[{self.dishes[0].id}]"')
+        self.assertContains(page, 'name="delivery_type"')
+
+        # Exactly what place_order.html posts
+        fields = {
+            'customer_name': 'Asha', 'phone_number': '9999999999', 'email': 'asha@example.com',
+            'delivery_type': 'delivery', 'delivery_address': '1 Main St',
+            'delivery_date': '', 'delivery_time': '', 'special_instructions': 'Less spicy',
+        }
+        fields.update({f'items[{dish.id}]': '0' for dish in self.dishes})
+        response = self.client.post(self.url, fields)
+        self.assertContains(response, 'The cart is empty.')
+        self.assertFalse(Order.objects.exists())
+
+        fields[f'items[{self.dishes[0].id}]'] = '2'
+        fields[f'items[{self.dishes[1].id}]'] = '1'
+        response = self.client.post(self.url, fields)
+        self.assertRedirects(response, reverse('restaurant:my_orders'), fetch_redirect_response=False)
+        order = Order.objects.get()
+        self.assertEqual((order.total_amount, order.delivery_type), (Decimal('301.00'), 'delivery'))
+        self.assertEqual(order.orderitem_set.count(), 2)
+
+
+@override_settings(KITCHEN={'BUCKET_MINUTES': 15, 'STATIONS': 2, 'HORIZON_HOURS': 2, 'MAX_LEAD_MINUTES': 60})
+class KitchenQueueTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('chef', password='secret', is_staff=True)
+        category = DishCategory.objects.create(name='Mains')
+        self.biryani = Dish.objects.create(name='Biryani', description='...', price=300, category=category,
+                                           food_type='rice', preparation_time=20)
+        self.naan = Dish.objects.create(name='Naan', description='...', price=40, category=category,
+                                        food_type='bread', preparation_time=5)
+        self.now = timezone.now()
+
+    def order(self, *lines, status='pending'):
+        order = Order.objects.create(user=self.user, total_amount=0, delivery_type='pickup', phone_number='1')
+        for dish, quantity in lines:
+            OrderItem.objects.create(order=order, menu_item=dish, quantity=quantity, price=dish.price)
+        if status != order.status:
+            order.status = status
+            order.save()
+        return order
+
+    def booked(self):
+        return sum(KitchenSlot.objects.values_list('load_minutes', flat=True)), \
+            sum(KitchenSlot.objects.values_list('orders', flat=True))
+
+    def test_open_orders_book_and_release_kitchen_time(self):
+        order = self.order((self.biryani, 1), (self.naan, 2))
+        self.assertEqual(self.booked(), (0, 0))
+
+        order.status = 'confirmed'
+        order.save()
+        self.assertEqual(self.booked(), (30, 1))
+        self.assertEqual(order.prep_minutes, 30)
+        # The biryani alone takes 20 minutes
+        self.assertGreaterEqual(order.ready_at, self.now + timedelta(minutes=20))
+
+        order.status = 'preparing'
+        order.save()
+        self.assertEqual(self.booked(), (30, 1))
+
+        # Reloaded instances know their stored status too
+        order = Order.objects.get(pk=order.pk)
+        order.status = 'ready'
+        with self.assertNumQueries(2):
+            order.save()
+        self.assertEqual(self.booked(), (0, 0))
+
+        self.order((self.naan, 1), status='confirmed').delete()
+        self.assertEqual(self.booked(), (0, 0))
+
+    def test_busy_kitchen_pushes_ready_time_back(self):
+        # Two stations get through 30 cook-minutes per 15 minute bucket, so
+        # 60 cook-minutes take two buckets and the next 60 two more
+        start = kitchen.bucket_start(self.now)
+        first = self.order((self.naan, 12), status='confirmed')
+        second = self.order((self.naan, 12), status='confirmed')
+        self.assertEqual(first.ready_at, start + timedelta(minutes=30))
+        self.assertEqual(second.ready_at, start + timedelta(minutes=60))
+
+        small, _ = kitchen.estimate_ready(5, 5)
+        self.assertGreater(small, first.ready_at)
+
+    def test_placement_quotes_ready_time_and_throttles(self):
+        self.client.force_login(self.user)
+        url = reverse('restaurant:place_order')
+        response = self.client.post(url, json.dumps({
+            'cart': [{'id': self.biryani.id}], 'delivery_type': 'pickup', 'phone_number': '1',
+        }), content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertIsNotNone(Order.objects.get().ready_at)
+
+        # 600 cook-minutes cannot be ready within the hour
+        response = self.client.post(url, json.dumps({
+            'cart': [{'id': self.biryani.id, 'quantity': 30}], 'delivery_type': 'pickup', 'phone_number': '1',
+        }), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('fully booked', response.json()['errors']['cart'][0])
+
+    def test_dashboard_reads_only_the_slots(self):
+        self.order((self.biryani, 2), status='confirmed')
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            load = kitchen.kitchen_load(hours=1)
+        self.assertEqual(len(queries), 4)
+        self.assertEqual(load['open_orders'], 1)
+        self.assertEqual(sum(bucket['load_minutes'] for bucket in load['buckets']), 40)
+        self.assertEqual(self.client.get(reverse('restaurant:kitchen_dashboard')).status_code, 200)
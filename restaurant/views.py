@@ -1,14 +1,29 @@
+import json
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.exceptions import ValidationError
 from django.http import JsonResponse
-from .models import MenuItem, Order
+from django.utils import timezone
+from .models import Order
 from .forms import OrderForm
+from .kitchen import kitchen_load
+from .orders import create_order
+from core.catalog import catalog_items, filter_catalog, get_menu_catalog, request_filters
 from core.models import CateringPackage
 
 def menu(request):
-    menu_items = MenuItem.objects.filter(is_available=True).order_by('category', 'order')
-    return render(request, 'restaurant/menu.html', {'menu_items': menu_items})
+    catalog = filter_catalog(get_menu_catalog('restaurant'), **request_filters(request))
+    return render(request, 'restaurant/menu.html', {
+        'categories': catalog['categories'],
+        'menu_items': catalog_items(catalog),
+    })
+
+def menu_api(request):
+    catalog = filter_catalog(get_menu_catalog('restaurant'), **request_filters(request))
+    return JsonResponse(catalog)
 
 def catering(request):
     catering_packages = CateringPackage.objects.filter(is_active=True)
@@ -24,17 +39,66 @@ def order_detail(request, order_id):
     order = get_object_or_404(Order, id=order_id, user=request.user)
     return render(request, 'restaurant/order_detail.html', {'order': order})
 
+def _form_cart(data):
+    """Cart lines from the order page's items[<menu item id>] quantity inputs"""
+    lines = []
+    for name, quantity in data.items():
+        if name.startswith('items[') and name.endswith(']') and quantity.strip() not in ('', '0'):
+            lines.append({'id': name[len('items['):-1], 'quantity': quantity})
+    return lines
+
+def _order_payload(request):
+    """Form data, or the decoded body of a JSON request (cart as a list)"""
+    if request.content_type != 'application/json':
+        if 'cart' in request.POST:
+            return request.POST, False
+        data = request.POST.copy()
+        data['cart'] = json.dumps(_form_cart(request.POST))
+        return data, False
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        data = {}
+    if not isinstance(data, dict):
+        data = {}
+    if not isinstance(data.get('cart'), str):
+        data['cart'] = json.dumps(data.get('cart'))
+    return data, True
+
 @login_required
 def place_order(request):
     if request.method == 'POST':
-        form = OrderForm(request.POST)
+        data, wants_json = _order_payload(request)
+        form = OrderForm(data)
         if form.is_valid():
             order = form.save(commit=False)
             order.user = request.user
-            order.save()
-            messages.success(request, 'Order placed successfully!')
-            return redirect('restaurant:my_orders')
+            try:
+                create_order(order, form.cleaned_data['cart'])
+            except ValidationError as error:
+                form.add_error('cart', error)
+            else:
+                if wants_json:
+                    return JsonResponse({
+                        'id': order.id,
+                        'order_number': order.order_number,
+                        'total_amount': order.total_amount,
+                        'ready_at': order.ready_at,
+                    }, status=201)
+                ready_at = timezone.localtime(order.ready_at)
+                messages.success(request, f'Order placed successfully! Estimated ready by {ready_at:%H:%M}.')
+                return redirect('restaurant:my_orders')
+        if wants_json:
+            return JsonResponse({'errors': form.errors}, status=400)
     else:
         form = OrderForm()
     
-    return render(request, 'restaurant/place_order.html', {'form': form})
+    return render(request, 'restaurant/place_order.html', {
+        'form': form,
+        'categories': get_menu_catalog('restaurant')['categories'],
+    })
+
+@staff_member_required
+def kitchen_dashboard(request):
+    """Booked kitchen time per bucket for the coming hours"""
+    return render(request, 'restaurant/kitchen.html', {'load': kitchen_load(hours=4)})
@@ -91,10 +91,14 @@ document.addEventListener('DOMContentLoaded', function() {
             dateInput.addEventListener('change', updatePricing);
         }
         
-        const venueSelect = bookingForm.querySelector('select[name="venue"]');
-        if (venueSelect) {
-            venueSelect.addEventListener('change', updatePricing);
-        }
+        // Field names are BookingForm's; venue values are bookings.Venue ids
+        ['select[name="venue"]', 'input[name="number_of_guests"]',
+         'input[name="start_time"]', 'input[name="end_time"]'].forEach(selector => {
+            const field = bookingForm.querySelector(selector);
+            if (field) {
+                field.addEventListener('change', updatePricing);
+            }
+        });
     }
     
     // Restaurant menu enhancement
@@ -112,40 +116,52 @@ document.addEventListener('DOMContentLoaded', function() {
 
 // Update pricing function
 function updatePricing() {
-    const dateInput = document.querySelector('input[type="date"]');
+    const dateInput = document.querySelector('input[name="event_date"]');
     const venueSelect = document.querySelector('select[name="venue"]');
-    const guestInput = document.querySelector('input[name="guests"]');
+    const guestInput = document.querySelector('input[name="number_of_guests"]');
+    const startInput = document.querySelector('input[name="start_time"]');
+    const endInput = document.querySelector('input[name="end_time"]');
     const priceDisplay = document.querySelector('.price-display');
     
     if (dateInput && venueSelect && guestInput && priceDisplay) {
-        const selectedDate = new Date(dateInput.value);
-        const selectedVenue = venueSelect.value;
         const guestCount = parseInt(guestInput.value) || 0;
-        
-        // Base prices (you can make this dynamic from backend)
-        const basePrices = {
-            'hall': 50000,
-            'lawn': 35000,
-            'restaurant': 25000
-        };
-        
-        let basePrice = basePrices[selectedVenue] || 0;
-        
-        // Weekend premium (Friday, Saturday, Sunday)
-        const dayOfWeek = selectedDate.getDay();
-        if (dayOfWeek === 5 || dayOfWeek === 6 || dayOfWeek === 0) {
-            basePrice *= 1.2; // 20% premium
+        if (!dateInput.value || !venueSelect.value || guestCount < 1) {
+            return;
         }
         
-        // Guest count adjustment
-        const totalPrice = basePrice + (guestCount * 500);
-        
-        priceDisplay.innerHTML = `
-            <div class="alert alert-info">
-                <strong>Estimated Total:</strong> ₹${totalPrice.toLocaleString()}
-                <br><small>Base: ₹${basePrice.toLocaleString()} + ₹500 per guest</small>
-            </div>
-        `;
+        // Prices, premiums and promotions are computed by the server
+        const params = new URLSearchParams({
+            venues: venueSelect.value,
+            dates: dateInput.value,
+            guests: guestCount
+        });
+        // Same duration create_booking prices with
+        if (startInput && endInput && startInput.value && endInput.value) {
+            const [startHour, startMinute] = startInput.value.split(':').map(Number);
+            const [endHour, endMinute] = endInput.value.split(':').map(Number);
+            const hours = (endHour * 60 + endMinute - startHour * 60 - startMinute) / 60;
+            if (hours > 0) {
+                params.set('hours', hours);
+            }
+        }
+        fetch(`/bookings/api/quote/?${params}`)
+            .then(response => response.ok ? response.json() : Promise.reject(response))
+            .then(data => {
+                if (!data.venues.length) {
+                    priceDisplay.innerHTML = '';
+                    return;
+                }
+                const totalPrice = Number(data.venues[0].totals[0][0]);
+                priceDisplay.innerHTML = `
+                    <div class="alert alert-info">
+                        <strong>Estimated Total:</strong> ₹${totalPrice.toLocaleString()}
+                        <br><small>Includes weekend premiums and current offers</small>
+                    </div>
+                `;
+            })
+            .catch(() => {
+                priceDisplay.innerHTML = '';
+            });
     }
 }
 